@@ -0,0 +1,152 @@
+"""
+Throughput benchmark: threaded capture + OCR workers (current design) versus a
+capture process feeding worker processes through SharedFrameRing.
+
+The per-frame workload mixes numpy/OpenCV calls with a pure-Python loop, which
+is roughly how RapidOCR's pre/post-processing behaves under the GIL.
+
+    python benchmarks/bench_frame_ring.py --workers 2 --seconds 5
+"""
+
+import argparse
+import multiprocessing as mp
+import os
+import queue
+import sys
+import threading
+import time
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
+
+from capture.shm_ring import SharedFrameRing  # noqa: E402
+
+FRAME_SHAPE = (768, 1024, 3)
+PY_LOOP = 20000
+
+
+def make_frames(n=8):
+    rng = np.random.default_rng(0)
+    return [rng.integers(0, 255, FRAME_SHAPE, dtype=np.uint8) for _ in range(n)]
+
+
+def workload(frame):
+    """Stand-in for one OCR pass: grayscale + threshold, then Python-side post-processing."""
+    gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+    _, binary = cv2.threshold(gray, 128, 255, cv2.THRESH_BINARY)
+    total = 0
+    for i in range(PY_LOOP):
+        total += i & 7
+    return int(binary[::64, ::64].sum()) + total
+
+
+# --- Threaded design (one process, frames copied into a queue) ---
+
+def run_threaded(workers, seconds):
+    frames = make_frames()
+    frame_queue = queue.Queue(maxsize=workers * 2)
+    stop = threading.Event()
+    counts = {"captured": 0, "processed": 0}
+    lock = threading.Lock()
+
+    def capture():
+        i = 0
+        while not stop.is_set():
+            frame = frames[i % len(frames)].copy()
+            i += 1
+            counts["captured"] += 1
+            try:
+                frame_queue.put_nowait(frame)
+            except queue.Full:
+                pass  # Latest-wins: drop when workers are behind
+
+    def worker():
+        while not stop.is_set():
+            try:
+                frame = frame_queue.get(timeout=0.1)
+            except queue.Empty:
+                continue
+            workload(frame.copy())
+            with lock:
+                counts["processed"] += 1
+
+    threads = [threading.Thread(target=capture, daemon=True)]
+    threads += [threading.Thread(target=worker, daemon=True) for _ in range(workers)]
+    for t in threads:
+        t.start()
+    time.sleep(seconds)
+    stop.set()
+    for t in threads:
+        t.join()
+    return counts["captured"], counts["processed"]
+
+
+# --- Shared-memory design (capture process + worker processes) ---
+
+def _ring_capture(name, stop, captured):
+    ring = SharedFrameRing.attach(name)
+    frames = make_frames()
+    i = 0
+    while not stop.is_set():
+        ring.write(frames[i % len(frames)])
+        i += 1
+    captured.value = i
+    ring.close()
+
+
+def _ring_worker(name, stop, processed):
+    ring = SharedFrameRing.attach(name)
+    last = 0
+    done = 0
+    while not stop.is_set():
+        seq = ring.wait_next(last, timeout=0.1)
+        if seq is None:
+            continue
+        item = ring.read(seq)
+        if item is None:
+            continue
+        last, _, view = item
+        workload(view)
+        if ring.is_valid(last):
+            done += 1
+    with processed.get_lock():
+        processed.value += done
+    ring.close()
+
+
+def run_shared_memory(workers, seconds):
+    ring = SharedFrameRing.create(FRAME_SHAPE, slots=max(4, workers * 2))
+    stop = mp.Event()
+    captured = mp.Value("q", 0)
+    processed = mp.Value("q", 0)
+    procs = [mp.Process(target=_ring_capture, args=(ring.name, stop, captured))]
+    procs += [mp.Process(target=_ring_worker, args=(ring.name, stop, processed)) for _ in range(workers)]
+    try:
+        for p in procs:
+            p.start()
+        time.sleep(seconds)
+        stop.set()
+        for p in procs:
+            p.join()
+    finally:
+        ring.close()
+        ring.unlink()
+    return captured.value, processed.value
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--seconds", type=float, default=5.0)
+    args = parser.parse_args()
+
+    for label, fn in (("threads", run_threaded), ("shm ring", run_shared_memory)):
+        captured, processed = fn(args.workers, args.seconds)
+        print(f"{label:>9}: capture {captured / args.seconds:8.1f} fps | "
+              f"processed {processed / args.seconds:7.1f} fps ({args.workers} workers)")
+
+
+if __name__ == "__main__":
+    main()
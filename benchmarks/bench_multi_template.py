@@ -0,0 +1,88 @@
+"""
+Map-template scanning cost: one full-ROI matchTemplate per priority map (the
+old SCANNING fast path) versus MultiTemplateMatcher restricted to the
+segmented text rows, for 5, 15 and 40 cached map templates.
+
+    python benchmarks/bench_multi_template.py --repeat 20
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
+
+from vision.row_segmenter import segment_rows  # noqa: E402
+from vision.template_matcher import MultiTemplateMatcher, best_match  # noqa: E402
+
+ROW_PITCH = 26
+VISIBLE_ROWS = 11
+ROI_SHAPE = (300, 550)
+MAP_COUNTS = (5, 15, 40)
+BASE_NAMES = ["Dolina Orkow", "Gora Sohan", "Pustynia", "Loch Pajakow", "Czerwony Las", "Grota Wygnancow",
+              "Mroczna Krypta", "Wieza Demonow", "Smocze Gniazdo", "Zaklete Miasto"]
+
+
+def render_row(name):
+    row = np.full((ROW_PITCH, ROI_SHAPE[1]), 25, dtype=np.uint8)
+    cv2.putText(row, name, (10, 18), cv2.FONT_HERSHEY_SIMPLEX, 0.5, 200, 1)
+    cv2.putText(row, "Dostepny", (330, 18), cv2.FONT_HERSHEY_SIMPLEX, 0.5, 200, 1)
+    return row
+
+
+def build(count):
+    names = [f"{BASE_NAMES[i % len(BASE_NAMES)]} V{i // len(BASE_NAMES) + 1}" for i in range(count)]
+    templates = {}
+    for name in names:
+        row = render_row(name)
+        # Cut like the worker does from an OCR box: the text extent plus 2 px
+        (tw, th), base = cv2.getTextSize(name, cv2.FONT_HERSHEY_SIMPLEX, 0.5, 1)
+        templates[f"map:{name}"] = row[18 - th - 2:18 + base + 2, 10 - 2:10 + tw + 2].copy()
+    # The list shows the last VISIBLE_ROWS maps (scrolled down), so low priorities are visible
+    roi = np.full(ROI_SHAPE, 25, dtype=np.uint8)
+    for i, name in enumerate(names[-VISIBLE_ROWS:]):
+        roi[8 + i * ROW_PITCH:8 + (i + 1) * ROW_PITCH] = render_row(name)
+    clahe = cv2.createCLAHE(clipLimit=3.0, tileGridSize=(8, 8))
+    return clahe.apply(roi), {k: clahe.apply(np.pad(t, 8, constant_values=25))[8:-8, 8:-8]
+                              for k, t in templates.items()}
+
+
+def per_map(roi, templates):
+    hits = []
+    for key, template in templates.items():
+        rect, quality = best_match(roi, template)
+        if quality >= 0.85:
+            hits.append((key, rect, quality))
+    return hits
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    matcher = MultiTemplateMatcher()
+    for count in MAP_COUNTS:
+        roi, templates = build(count)
+
+        start = time.perf_counter()
+        for _ in range(args.repeat):
+            old_hits = per_map(roi, templates)
+        old_ms = (time.perf_counter() - start) * 1000.0 / args.repeat
+
+        start = time.perf_counter()
+        for _ in range(args.repeat):
+            new_hits = matcher.match(roi, templates, 0.85, segment_rows(roi))
+        new_ms = (time.perf_counter() - start) * 1000.0 / args.repeat
+
+        same = {k for k, _, _ in old_hits} == {k for k, _, _ in new_hits}
+        print(f"{count:3d} maps: per-map full ROI {old_ms:7.2f} ms | multi on rows {new_ms:7.2f} ms "
+              f"| x{old_ms / new_ms:4.1f} | hits {len(new_hits)} (same as per-map: {same})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""
+Main-loop tick jitter with OCR running in-process (OcrExecutor threads)
+versus in dedicated processes (OcrProcessExecutor).
+
+A 60 Hz loop preprocesses a synthetic summon-window ROI (grayscale + CLAHE,
+like the worker) and submits it to OCR every OCR_INTERVAL. The spread of the
+tick intervals shows how much OCR disturbs frame pacing.
+
+    python benchmarks/bench_ocr_jitter.py --workers 1 --seconds 10
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
+
+from ocr.executor import OcrExecutor  # noqa: E402
+from ocr.pipeline import build_ocr_pipeline  # noqa: E402
+from ocr.process_service import OcrProcessExecutor  # noqa: E402
+
+TICK = 1.0 / 60.0
+OCR_INTERVAL = 0.35
+ROI_SHAPE = (300, 550)
+CONFIG = {"ocr_backend": "CPU", "ocr_cache_size": 0}
+
+
+def make_roi():
+    img = np.full(ROI_SHAPE + (3,), 25, dtype=np.uint8)
+    for i in range(10):
+        y = 24 + i * 27
+        cv2.putText(img, f"Mroczna Krypta V{i + 1}", (10, y), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (210, 210, 210), 1)
+        cv2.putText(img, "Dostepny" if i % 3 else "12m 30s", (330, y), cv2.FONT_HERSHEY_SIMPLEX, 0.6,
+                    (210, 210, 210), 1)
+    return img
+
+
+def run_loop(executor, seconds):
+    roi = make_roi()
+    clahe = cv2.createCLAHE(clipLimit=3.0, tileGridSize=(8, 8))
+    intervals = []
+    results = 0
+    last_submit = 0.0
+    next_tick = time.perf_counter()
+    last_tick = None
+    end = next_tick + seconds
+    while True:
+        now = time.perf_counter()
+        if now >= end:
+            break
+        if last_tick is not None:
+            intervals.append((now - last_tick) * 1000.0)
+        last_tick = now
+
+        noisy = cv2.add(roi, np.full_like(roi, int(now * 10) % 3))
+        processed = clahe.apply(cv2.cvtColor(noisy, cv2.COLOR_BGR2GRAY))
+        if executor is not None and now - last_submit >= OCR_INTERVAL:
+            executor.submit(processed)
+            last_submit = now
+        if executor is not None and executor.poll() is not None:
+            results += 1
+
+        next_tick += TICK
+        delay = next_tick - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+        else:
+            next_tick = time.perf_counter()
+    return np.array(intervals), results
+
+
+def report(label, intervals, results, seconds):
+    p50, p95, p99 = np.percentile(intervals, [50, 95, 99])
+    print(f"{label:>12}: tick p50 {p50:5.1f} p95 {p95:5.1f} p99 {p99:5.1f} max {intervals.max():6.1f} ms | "
+          f"std {intervals.std():5.2f} ms | {results / seconds:4.1f} OCR results/s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--seconds", type=float, default=10.0)
+    args = parser.parse_args()
+
+    from vision.engines import get_ocr_engine
+    engine = get_ocr_engine(CONFIG["ocr_backend"])
+    pipeline, _, _ = build_ocr_pipeline(engine, CONFIG)
+
+    intervals, _ = run_loop(None, args.seconds)
+    report("no OCR", intervals, 0, args.seconds)
+
+    for label, executor in (("in-process", OcrExecutor(pipeline, workers=args.workers)),
+                            ("out-of-proc", OcrProcessExecutor(CONFIG, workers=args.workers))):
+        executor.start()
+        # Warm up: the service processes load their models first
+        executor.submit(make_roi())
+        while executor.poll() is None:
+            time.sleep(0.05)
+        try:
+            intervals, results = run_loop(executor, args.seconds)
+        finally:
+            executor.shutdown()
+        report(label, intervals, results, args.seconds)
+
+
+if __name__ == "__main__":
+    main()
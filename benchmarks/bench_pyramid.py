@@ -0,0 +1,71 @@
+"""
+Full-resolution versus coarse-to-fine (pyramid) template search over the
+whole processed ROI, for map:* and status:* templates. Reports time per
+lookup and whether the full-resolution match (rect and quality) is unchanged.
+
+    python benchmarks/bench_pyramid.py --repeat 50
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
+
+from vision.template_matcher import best_match, pyramid_match  # noqa: E402
+
+ROI_SHAPE = (300, 550)
+NAMES = ["Dolina Orkow", "Gora Sohan V2", "Pustynia", "Loch Pajakow", "Czerwony Las", "Grota Wygnancow V3",
+         "Mroczna Krypta V1", "Mroczna Krypta V4", "Wieza Demonow", "Smocze Gniazdo"]
+
+
+def make_roi(seed=0):
+    rng = np.random.default_rng(seed)
+    roi = np.full(ROI_SHAPE, 25, dtype=np.uint8)
+    for i, name in enumerate(NAMES):
+        y = 26 + i * 27
+        cv2.putText(roi, name, (10, y), cv2.FONT_HERSHEY_SIMPLEX, 0.55, 200, 1)
+        cv2.putText(roi, "Dostepny" if i % 3 else "12m 30s", (330, y), cv2.FONT_HERSHEY_SIMPLEX, 0.55, 200, 1)
+    roi = cv2.add(roi, rng.integers(0, 6, ROI_SHAPE, dtype=np.uint8))
+    return cv2.createCLAHE(clipLimit=3.0, tileGridSize=(8, 8)).apply(roi)
+
+
+def cut(roi, text, x, y):
+    (w, h), base = cv2.getTextSize(text, cv2.FONT_HERSHEY_SIMPLEX, 0.55, 1)
+    return roi[y - h - 2:y + base + 2, x - 2:x + w + 2].copy()
+
+
+def timed(fn, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = fn()
+    return (time.perf_counter() - start) * 1000.0 / repeat, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    template_roi = make_roi(seed=1)  # Templates come from an earlier frame (different noise)
+    roi = make_roi(seed=2)
+    templates = {f"map:{NAMES[i]}": cut(template_roi, NAMES[i], 10, 26 + i * 27) for i in (0, 5, 6)}
+    templates["status:dostepny"] = cut(template_roi, "Dostepny", 330, 26 + 27)
+
+    for key, template in templates.items():
+        full_ms, full = timed(lambda: best_match(roi, template), args.repeat)
+        line = f"{key:>24} {template.shape[1]:3d}x{template.shape[0]:2d}: full {full_ms:5.2f} ms"
+        for level in (1, 2):
+            ms, result = timed(lambda: pyramid_match(roi, template, level, cache={}), args.repeat)
+            # status:* has several identical rows, so an equally good match elsewhere is fine
+            line += (f" | L{level} {ms:5.2f} ms x{full_ms / ms:3.1f} same rect={result[0] == full[0]} "
+                     f"dq={full[1] - result[1]:.4f}")
+        print(line + f" (q={full[1]:.3f})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,4 @@
+"""
+Screen capture module for KoniuBot.
+Contains frame sources and helpers shared by the vision workers.
+"""
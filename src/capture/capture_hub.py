@@ -0,0 +1,263 @@
+"""
+Capture hub - one thread owns the capture device and publishes full-window
+frames to every subscriber, so concurrent workers share a single grab per tick.
+
+A private hub with a target FPS doubles as the streaming capture mode: the
+producer paces itself, keeps only the latest frame and consumers block on
+Subscription.get() instead of polling the backend.
+"""
+
+import collections
+import threading
+import time
+
+from capture.frame_source import create_frame_source
+
+# Backend for shared hubs when the config does not name one. Independent of the
+# consumer so that workers with different direct-mode defaults share one hub.
+HUB_DEFAULT_BACKEND = "dxcam"
+
+DEFAULT_STREAM_FPS = 30.0
+
+IDLE_SLEEP = 0.05      # No subscribers or no game window
+POLL_SLEEP = 0.005     # Backend returned no new frame (unpaced hubs only)
+FPS_WINDOW = 2.0       # Seconds of publish history used for achieved FPS
+
+
+class Subscription:
+    """A consumer of hub frames with its own crop region and drop counter."""
+
+    def __init__(self, hub, name, region=None):
+        self.hub = hub
+        self.name = name
+        self.region = region
+        self.received = 0
+        self.dropped = 0
+        self.last = None
+        self._pending = None
+
+    def set_region(self, region):
+        """Window-relative crop region {"left", "top", "width", "height"} or None for the full frame."""
+        self.region = region
+
+    def get(self, timeout=1.0):
+        """Block until a frame newer than the last consumed one is published. Returns WindowFrame or None."""
+        with self.hub._cond:
+            if self._pending is None:
+                self.hub._cond.wait_for(lambda: self._pending is not None or not self.hub.running, timeout)
+            frame = self._pending
+            self._pending = None
+        if frame is not None:
+            self.received += 1
+            self.last = frame
+        return frame
+
+    def get_or_last(self, timeout=1.0):
+        """
+        Like get(), but on timeout returns the last delivered frame (or the hub's
+        latest). The hub publishes nothing while the screen is static, so
+        consumers that must keep ticking reuse the previous frame.
+        """
+        frame = self.get(timeout)
+        if frame is None:
+            frame = self.last or self.hub.latest
+        return frame
+
+    def view(self, frame):
+        """Read-only view of this subscriber's region inside a published frame."""
+        if self.region is None:
+            return frame.image
+        return frame.crop(self.region)
+
+    def close(self):
+        self.hub.unsubscribe(self)
+
+
+class CaptureHub(threading.Thread):
+    """Publishes timestamped, read-only WindowFrames from a single FrameSource."""
+
+    _shared = {}
+    _shared_lock = threading.Lock()
+
+    def __init__(self, source, target_fps=None):
+        super().__init__(daemon=True, name=f"CaptureHub-{source.name}")
+        self.source = source
+        self.target_fps = target_fps
+        self.running = False
+        self.seq = 0
+        self.latest = None
+        self.last_error = None
+        self._subscribers = []
+        self._cond = threading.Condition()
+        self._refcount = 0
+        self._key = None
+        self._stop_event = threading.Event()
+        self._publish_times = collections.deque()
+
+    # --- Shared instances ---
+
+    @classmethod
+    def acquire(cls, config=None):
+        """Return the running hub for the configured backend and client, starting it on first use."""
+        config = config or {}
+        key = (str(config.get("capture_backend") or HUB_DEFAULT_BACKEND).lower(), config.get("client_id"))
+        with cls._shared_lock:
+            hub = cls._shared.get(key)
+            if hub is None:
+                hub = cls(create_frame_source(config, default=HUB_DEFAULT_BACKEND), config.get("target_fps"))
+                hub._key = key
+                hub.start()
+                cls._shared[key] = hub
+            hub._refcount += 1
+            return hub
+
+    @classmethod
+    def stream(cls, config=None, default=HUB_DEFAULT_BACKEND):
+        """
+        Start a private hub for one worker (capture_mode "stream"), paced at
+        config["target_fps"]. Release it like a shared hub.
+        """
+        config = config or {}
+        hub = cls(create_frame_source(config, default=default), config.get("target_fps", DEFAULT_STREAM_FPS))
+        hub._refcount = 1
+        hub.start()
+        return hub
+
+    @classmethod
+    def get_running(cls, client_id=None):
+        """A running shared hub of the given client, else None (for one-shot consumers)."""
+        with cls._shared_lock:
+            for (_, hub_client), hub in cls._shared.items():
+                if hub.running and hub_client == client_id:
+                    return hub
+        return None
+
+    def release(self):
+        """Drop one reference; the last release stops the hub and frees the device."""
+        with self._shared_lock:
+            self._refcount -= 1
+            if self._refcount > 0:
+                return
+            if self._shared.get(self._key) is self:
+                del self._shared[self._key]
+        self.stop()
+
+    # --- Subscribers ---
+
+    def subscribe(self, name, region=None):
+        sub = Subscription(self, name, region)
+        with self._cond:
+            self._subscribers.append(sub)
+        return sub
+
+    def unsubscribe(self, sub):
+        with self._cond:
+            if sub in self._subscribers:
+                self._subscribers.remove(sub)
+
+    def snapshot(self, timeout=1.0):
+        """Latest published frame, waiting up to timeout for the first one."""
+        with self._cond:
+            if self.latest is None:
+                self._cond.wait_for(lambda: self.latest is not None or not self.running, timeout)
+            return self.latest
+
+    def stats(self):
+        """Per-subscriber delivery counters: {name: {"received", "dropped"}}."""
+        with self._cond:
+            return {s.name: {"received": s.received, "dropped": s.dropped} for s in self._subscribers}
+
+    def fps_stats(self):
+        """{"target_fps", "achieved_fps"}; achieved counts new frames published over the last FPS_WINDOW s."""
+        with self._cond:
+            times = list(self._publish_times)
+        achieved = 0.0
+        if len(times) > 1 and time.perf_counter() - times[-1] < FPS_WINDOW:
+            achieved = (len(times) - 1) / max(1e-6, times[-1] - times[0])
+        return {"target_fps": self.target_fps, "achieved_fps": achieved}
+
+    # --- Producer ---
+
+    def start(self):
+        self.running = True
+        super().start()
+
+    def stop(self):
+        self.running = False
+        self._stop_event.set()
+        with self._cond:
+            self._cond.notify_all()
+        if self.is_alive() and threading.current_thread() is not self:
+            self.join(timeout=2.0)
+
+    def run(self):
+        try:
+            self.source.open()
+        except Exception as e:
+            print(f"CaptureHub: {self.source.name} init error: {e}")
+            self.last_error = e
+            self.running = False
+            with self._cond:
+                self._cond.notify_all()
+            return
+
+        interval = 1.0 / self.target_fps if self.target_fps else 0.0
+        next_tick = time.perf_counter()
+
+        while self.running:
+            if interval:
+                # Paced producer: a static screen waits for the next tick instead of spinning
+                delay = next_tick - time.perf_counter()
+                if delay > 0 and self._stop_event.wait(delay):
+                    break
+                next_tick = max(next_tick + interval, time.perf_counter())
+
+            with self._cond:
+                has_consumers = bool(self._subscribers)
+            if not has_consumers and self.latest is not None:
+                time.sleep(IDLE_SLEEP)
+                continue
+
+            rect = self.source.get_window_rect()
+            if not rect:
+                time.sleep(IDLE_SLEEP)
+                continue
+
+            try:
+                frame = self.source.grab_window(rect)
+            except Exception as e:
+                print(f"CaptureHub: grab error: {e}")
+                self.last_error = e
+                try:
+                    self.source.close()
+                    self.source.open()
+                except Exception as ee:
+                    print(f"CaptureHub: restart failed: {ee}")
+                    time.sleep(1.0)
+                continue
+
+            if frame is None:
+                if not interval:
+                    time.sleep(POLL_SLEEP)
+                continue
+
+            self._publish(frame)
+
+        self.source.close()
+
+    def _publish(self, frame):
+        # Subscribers share the same buffer, so nobody may write into it
+        frame.image.flags.writeable = False
+        now = time.perf_counter()
+        with self._cond:
+            self.seq += 1
+            frame.seq = self.seq
+            self._publish_times.append(now)
+            while self._publish_times and now - self._publish_times[0] > FPS_WINDOW:
+                self._publish_times.popleft()
+            for sub in self._subscribers:
+                if sub._pending is not None:
+                    sub.dropped += 1
+                sub._pending = frame
+            self.latest = frame
+            self._cond.notify_all()
@@ -0,0 +1,444 @@
+"""
+Pluggable frame sources - DXCam, mss and recorded-frame replay.
+
+Every worker grabs the game window through a FrameSource so the vision
+pipeline can be profiled away from a live Windows desktop.
+"""
+
+import bisect
+import collections
+import json
+import os
+import time
+
+import cv2
+import numpy as np
+
+from capture.window_frame import WindowFrame
+
+# Default backend per consumer is passed by the caller; this is the global fallback
+DEFAULT_BACKEND = "dxcam"
+
+# Frame rate assumed for recordings that carry no timestamps
+DEFAULT_REPLAY_FPS = 30.0
+
+REPLAY_IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".bmp")
+
+# Number of recent frames averaged by CaptureStats
+STATS_WINDOW = 120
+
+# Backends tried after the configured one fails (config["capture_fallbacks"] overrides)
+DEFAULT_FALLBACKS = {"dxcam": ["mss"]}
+
+
+class CaptureStats:
+    """Rolling per-stage capture timings (ms) and buffer allocation counter."""
+
+    def __init__(self, window=STATS_WINDOW):
+        self.window = window
+        self.frames = 0
+        self.allocations = 0
+        self._stages = {}
+
+    def record(self, stage, ms):
+        samples = self._stages.get(stage)
+        if samples is None:
+            samples = self._stages[stage] = collections.deque(maxlen=self.window)
+        samples.append(ms)
+
+    def snapshot(self):
+        """{"frames", "allocations", "<stage>_ms": rolling average, ...}"""
+        stats = {"frames": self.frames, "allocations": self.allocations}
+        for stage, samples in list(self._stages.items()):
+            stats[f"{stage}_ms"] = sum(samples) / len(samples) if samples else 0.0
+        return stats
+
+
+class FrameSource:
+    """Base class for capture backends. Frames are returned as BGR uint8 arrays."""
+
+    name = "base"
+
+    def __init__(self, context=None):
+        self.context = context
+        self.is_open = False
+        self.last_timestamp = None
+        self.stats = CaptureStats()
+
+    def open(self):
+        self.is_open = True
+
+    def close(self):
+        self.is_open = False
+
+    def _get_context(self):
+        if self.context is None:
+            from game_context import game_context
+            self.context = game_context
+        return self.context
+
+    def get_window_rect(self):
+        """Returns (left, top, right, bottom) of the game window or None"""
+        return self._get_context().get_window_rect()
+
+    @property
+    def geometry_version(self):
+        """Window geometry version of the tracked context (see GameContext.geometry_version)."""
+        return getattr(self._get_context(), "geometry_version", 0)
+
+    def grab(self, region):
+        """Grab (left, top, right, bottom) in screen coordinates. Returns a BGR frame or None."""
+        raise NotImplementedError
+
+    def grab_window(self, rect=None):
+        """Grab the whole game window once. Returns a WindowFrame (crop sub-regions from it) or None."""
+        rect = rect or self.get_window_rect()
+        if not rect:
+            return None
+        image = self.grab(rect)
+        if image is None:
+            return None
+        return WindowFrame(image, rect, self.last_timestamp or time.time(), geometry_version=self.geometry_version)
+
+    def __enter__(self):
+        self.open()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+
+class DXCamFrameSource(FrameSource):
+    """Desktop Duplication capture through DXCam (non-threaded grab() mode)."""
+
+    name = "dxcam"
+
+    def __init__(self, context=None):
+        super().__init__(context)
+        self.camera = None
+
+    def open(self):
+        import dxcam
+        self.camera = dxcam.create(output_color="BGR")
+        super().open()
+
+    def close(self):
+        if self.camera is not None:
+            try:
+                self.camera.stop()
+            except Exception:
+                pass
+            self.camera = None
+        super().close()
+
+    def grab(self, region):
+        if self.camera is None:
+            raise RuntimeError("DXCam not initialized")
+        start = time.perf_counter()
+        frame = self.camera.grab(region=tuple(int(v) for v in region))
+        if frame is not None:
+            self.last_timestamp = time.time()
+            self.stats.frames += 1
+            self.stats.record("grab", (time.perf_counter() - start) * 1000.0)
+        return frame
+
+
+class MssFrameSource(FrameSource):
+    """
+    GDI capture through a long-lived mss session.
+
+    The raw BGRA buffer is wrapped as a numpy view instead of copied. With
+    ``reuse_buffer`` the BGR conversion writes into one preallocated array, so a
+    grab allocates nothing after the first frame; the returned frame is then
+    only valid until the next grab().
+    """
+
+    name = "mss"
+
+    def __init__(self, context=None, reuse_buffer=False):
+        super().__init__(context)
+        self.sct = None
+        self.reuse_buffer = reuse_buffer
+        self._bgr = None
+
+    def open(self):
+        import mss
+        self.sct = mss.mss()
+        super().open()
+
+    def close(self):
+        if self.sct is not None:
+            try:
+                self.sct.close()
+            except Exception:
+                pass
+            self.sct = None
+        super().close()
+
+    def grab(self, region):
+        if self.sct is None:
+            raise RuntimeError("mss not initialized")
+        left, top, right, bottom = (int(v) for v in region)
+        monitor = {"left": left, "top": top, "width": right - left, "height": bottom - top}
+
+        start = time.perf_counter()
+        shot = self.sct.grab(monitor)
+        grabbed = time.perf_counter()
+
+        # Zero-copy view over the mss bytearray
+        bgra = np.frombuffer(shot.raw, dtype=np.uint8).reshape(shot.height, shot.width, 4)
+
+        if self.reuse_buffer:
+            if self._bgr is None or self._bgr.shape[:2] != bgra.shape[:2]:
+                self._bgr = np.empty((shot.height, shot.width, 3), dtype=np.uint8)
+                self.stats.allocations += 1
+            frame = cv2.cvtColor(bgra, cv2.COLOR_BGRA2BGR, dst=self._bgr)
+        else:
+            frame = cv2.cvtColor(bgra, cv2.COLOR_BGRA2BGR)
+            self.stats.allocations += 1
+        converted = time.perf_counter()
+
+        self.last_timestamp = time.time()
+        self.stats.frames += 1
+        self.stats.record("grab", (grabbed - start) * 1000.0)
+        self.stats.record("convert", (converted - grabbed) * 1000.0)
+        return frame
+
+
+class ReplayFrameSource(FrameSource):
+    """
+    Replays recorded game-window frames from a .npz file or a directory of images.
+
+    The .npz layout is ``frames`` (N, H, W, 3|4) plus optional ``timestamps`` (N,).
+    A directory holds image files in name order plus an optional
+    ``timestamps.json`` (list, or {filename: timestamp}); without it, numeric
+    file stems are used as timestamps, falling back to DEFAULT_REPLAY_FPS.
+
+    The recording stands in for the game window placed at ``origin``, so
+    get_window_rect() works without a live client. With ``realtime`` the
+    recorded pacing is honoured; otherwise every grab() serves the next frame
+    as fast as possible (useful for frames/sec benchmarks).
+    """
+
+    name = "replay"
+
+    def __init__(self, path, loop=True, realtime=False, origin=(0, 0), context=None):
+        super().__init__(context)
+        self.path = path
+        self.loop = loop
+        self.realtime = realtime
+        self.origin = origin
+        self.frames = []
+        self.timestamps = []
+        self.cursor = 0
+        self.started_at = 0.0
+        self.exhausted = False
+        self._cached_index = None
+        self._cached_frame = None
+
+    def open(self):
+        if os.path.isdir(self.path):
+            self._load_directory()
+        else:
+            self._load_npz()
+        if not self.frames:
+            raise ValueError(f"No recorded frames found in {self.path}")
+        self.cursor = 0
+        self.exhausted = False
+        self.started_at = time.time()
+        super().open()
+
+    def _load_npz(self):
+        with np.load(self.path) as data:
+            frames = data["frames"]
+            timestamps = data["timestamps"] if "timestamps" in data.files else None
+        self.frames = [_to_bgr(f) for f in frames]
+        if timestamps is None or len(timestamps) != len(self.frames):
+            timestamps = np.arange(len(self.frames)) / DEFAULT_REPLAY_FPS
+        self.timestamps = [float(t) for t in timestamps]
+
+    def _load_directory(self):
+        names = sorted(n for n in os.listdir(self.path) if n.lower().endswith(REPLAY_IMAGE_EXTENSIONS))
+        # Images are decoded lazily in _frame_at to keep long recordings off the heap
+        self.frames = [os.path.join(self.path, n) for n in names]
+
+        timestamps = None
+        index_path = os.path.join(self.path, "timestamps.json")
+        if os.path.exists(index_path):
+            with open(index_path, "r") as f:
+                index = json.load(f)
+            if isinstance(index, dict):
+                timestamps = [float(index[n]) for n in names]
+            else:
+                timestamps = [float(t) for t in index]
+        else:
+            try:
+                timestamps = [float(os.path.splitext(n)[0]) for n in names]
+            except ValueError:
+                timestamps = None
+
+        if timestamps is None or len(timestamps) != len(names):
+            timestamps = [i / DEFAULT_REPLAY_FPS for i in range(len(names))]
+        self.timestamps = timestamps
+
+    def _frame_at(self, index):
+        frame = self.frames[index]
+        if isinstance(frame, str):
+            if self._cached_index != index:
+                image = cv2.imread(frame, cv2.IMREAD_UNCHANGED)
+                if image is None:
+                    raise ValueError(f"Failed to read recorded frame {frame}")
+                self._cached_frame = _to_bgr(image)
+                self._cached_index = index
+            return self._cached_frame
+        return frame
+
+    def _next_index(self):
+        count = len(self.frames)
+        if self.realtime:
+            # Pick the frame that would be on screen right now
+            elapsed = time.time() - self.started_at
+            start = self.timestamps[0]
+            duration = self.timestamps[-1] - start
+            if elapsed > duration:
+                if not self.loop:
+                    return None
+                elapsed = elapsed % (duration + 1.0 / DEFAULT_REPLAY_FPS)
+            return max(0, bisect.bisect_right(self.timestamps, start + elapsed) - 1)
+
+        if self.cursor >= count:
+            if not self.loop:
+                return None
+            self.cursor = 0
+        index = self.cursor
+        self.cursor += 1
+        return index
+
+    @property
+    def geometry_version(self):
+        # The recorded window never moves
+        return 0
+
+    def get_window_rect(self):
+        if not self.frames:
+            return None
+        h, w = self._frame_at(0).shape[:2]
+        return (self.origin[0], self.origin[1], self.origin[0] + w, self.origin[1] + h)
+
+    def grab(self, region):
+        if not self.is_open:
+            raise RuntimeError("Replay source not opened")
+        start = time.perf_counter()
+        index = self._next_index()
+        if index is None:
+            self.exhausted = True
+            return None
+
+        frame = self._frame_at(index)
+        h, w = frame.shape[:2]
+        left, top, right, bottom = (int(v) for v in region)
+        x1 = min(max(0, left - self.origin[0]), w)
+        y1 = min(max(0, top - self.origin[1]), h)
+        x2 = min(max(x1, right - self.origin[0]), w)
+        y2 = min(max(y1, bottom - self.origin[1]), h)
+        if x2 <= x1 or y2 <= y1:
+            return None
+
+        self.last_timestamp = self.timestamps[index]
+        # Copy so consumers can draw on the frame like on a live grab
+        frame = frame[y1:y2, x1:x2].copy()
+        self.stats.frames += 1
+        self.stats.allocations += 1
+        self.stats.record("grab", (time.perf_counter() - start) * 1000.0)
+        return frame
+
+
+def _to_bgr(image):
+    if image.ndim == 2:
+        return cv2.cvtColor(image, cv2.COLOR_GRAY2BGR)
+    if image.shape[2] == 4:
+        return cv2.cvtColor(image, cv2.COLOR_BGRA2BGR)
+    return image
+
+
+def save_recording(path, frames, timestamps=None):
+    """Store BGR frames (and capture timestamps) as a replayable .npz recording."""
+    frames = np.stack([_to_bgr(f) for f in frames])
+    if timestamps is None:
+        timestamps = np.arange(len(frames)) / DEFAULT_REPLAY_FPS
+    np.savez_compressed(path, frames=frames, timestamps=np.asarray(timestamps, dtype=np.float64))
+
+
+def default_capture_config():
+    """
+    Capture settings taken from the environment so headless benchmark runs
+    can switch backend without touching the GUI:
+    TROYANEYES_CAPTURE_BACKEND, TROYANEYES_CAPTURE_MODE, TROYANEYES_TARGET_FPS,
+    TROYANEYES_REPLAY_PATH, TROYANEYES_REPLAY_REALTIME.
+    """
+    config = {}
+    backend = os.environ.get("TROYANEYES_CAPTURE_BACKEND")
+    if backend:
+        config["capture_backend"] = backend
+    mode = os.environ.get("TROYANEYES_CAPTURE_MODE")
+    if mode:
+        config["capture_mode"] = mode
+    target_fps = os.environ.get("TROYANEYES_TARGET_FPS")
+    if target_fps:
+        config["target_fps"] = float(target_fps)
+    replay_path = os.environ.get("TROYANEYES_REPLAY_PATH")
+    if replay_path:
+        config["replay_path"] = replay_path
+    if os.environ.get("TROYANEYES_REPLAY_REALTIME"):
+        config["replay_realtime"] = os.environ["TROYANEYES_REPLAY_REALTIME"] not in ("0", "false", "False")
+    return config
+
+
+def create_frame_source(config=None, default=DEFAULT_BACKEND, context=None):
+    """
+    Build the frame source named by config["capture_backend"] (or the consumer
+    default) for the window of config["client_id"] (default client if unset),
+    wrapped in a CaptureSupervisor that reinitializes it with backoff
+    and fails over to config["capture_fallbacks"]. Set config["capture_supervised"]
+    to False for the bare backend.
+    """
+    config = config or {}
+    backend = str(config.get("capture_backend") or default).lower()
+    if context is None and config.get("client_id"):
+        # Bind to one game client of a multi-client session
+        from game_context import game_contexts
+        context = game_contexts.get(config["client_id"])
+    source = _create_backend(backend, config, context)
+    if not config.get("capture_supervised", True):
+        return source
+
+    from capture.supervisor import CaptureSupervisor
+
+    fallbacks = config.get("capture_fallbacks")
+    if fallbacks is None:
+        fallbacks = DEFAULT_FALLBACKS.get(backend, [])
+    backends = [source]
+    for name in fallbacks:
+        name = str(name).lower()
+        if name != backend:
+            backends.append(_create_backend(name, config, context))
+    return CaptureSupervisor(backends, context)
+
+
+def _create_backend(backend, config, context):
+    if backend == "dxcam":
+        return DXCamFrameSource(context)
+    if backend == "mss":
+        return MssFrameSource(context, reuse_buffer=config.get("reuse_buffer", False))
+    if backend == "replay":
+        path = config.get("replay_path")
+        if not path:
+            raise ValueError("Replay capture requires 'replay_path'")
+        return ReplayFrameSource(
+            path,
+            loop=config.get("replay_loop", True),
+            realtime=config.get("replay_realtime", False),
+            context=context,
+        )
+    raise ValueError(f"Unknown capture backend: {backend}")
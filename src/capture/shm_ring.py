@@ -0,0 +1,192 @@
+"""
+Cross-process frame ring buffer in shared memory.
+
+A capture process writes frames into fixed-size slots; OCR/inference worker
+processes attach by name and read numpy views straight out of the shared
+block, without pickling or copying. Every slot carries a sequence number
+that works as a seqlock: a reader checks is_valid(seq) after using a view to
+learn whether the writer lapped it in the meantime.
+"""
+
+import time
+from multiprocessing import shared_memory
+
+import numpy as np
+
+DEFAULT_SLOTS = 4
+HEADER_FIELDS = 8          # slots, max_h, max_w, channels, latest_seq, reserved...
+SLOT_FIELDS = 4            # seq, timestamp, height, width
+DATA_ALIGN = 64
+
+# Header field indices
+_SLOTS, _MAX_H, _MAX_W, _CHANNELS, _LATEST = range(5)
+# Slot field indices
+_SEQ, _TS, _H, _W = range(SLOT_FIELDS)
+
+WRITING = -1               # Slot seq while a write is in progress
+
+
+def slot_shape_from_rect(rect, channels=3):
+    """(height, width, channels) for a (left, top, right, bottom) window rect."""
+    left, top, right, bottom = rect
+    return (int(bottom - top), int(right - left), channels)
+
+
+class SharedFrameRing:
+    """Fixed-size frame slots with sequence numbers in a SharedMemory block."""
+
+    def __init__(self, shm, owner=False):
+        self.shm = shm
+        self.owner = owner
+        self.name = shm.name
+
+        header = np.ndarray((HEADER_FIELDS,), dtype=np.int64, buffer=shm.buf)
+        self._header = header
+        self.slots = int(header[_SLOTS])
+        self.max_shape = (int(header[_MAX_H]), int(header[_MAX_W]), int(header[_CHANNELS]))
+
+        meta_offset = HEADER_FIELDS * 8
+        self._meta = np.ndarray((self.slots, SLOT_FIELDS), dtype=np.int64, buffer=shm.buf, offset=meta_offset)
+        # Timestamps share the meta rows, viewed as float64
+        self._meta_f = np.ndarray((self.slots, SLOT_FIELDS), dtype=np.float64, buffer=shm.buf, offset=meta_offset)
+
+        self.slot_bytes = _align(int(np.prod(self.max_shape)))
+        data_offset = _align(meta_offset + self.slots * SLOT_FIELDS * 8)
+        self._data = np.ndarray((self.slots, self.slot_bytes), dtype=np.uint8, buffer=shm.buf, offset=data_offset)
+
+    # --- Construction ---
+
+    @classmethod
+    def create(cls, max_shape, slots=DEFAULT_SLOTS, name=None):
+        """Allocate a new ring able to hold frames up to max_shape (h, w, c)."""
+        h, w, c = (int(v) for v in max_shape)
+        size = _align(HEADER_FIELDS * 8 + slots * SLOT_FIELDS * 8) + slots * _align(h * w * c)
+        shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+        header = np.ndarray((HEADER_FIELDS,), dtype=np.int64, buffer=shm.buf)
+        header[:] = 0
+        header[_SLOTS], header[_MAX_H], header[_MAX_W], header[_CHANNELS] = slots, h, w, c
+        ring = cls(shm, owner=True)
+        ring._meta[:] = 0
+        return ring
+
+    @classmethod
+    def for_window(cls, rect=None, slots=DEFAULT_SLOTS, channels=3, context=None, name=None):
+        """Ring whose slot size matches the current game window (game_context.get_window_rect())."""
+        if rect is None:
+            if context is None:
+                from game_context import game_context
+                context = game_context
+            rect = context.get_window_rect()
+            if not rect:
+                raise RuntimeError("Game window not found; cannot size frame ring")
+        return cls.create(slot_shape_from_rect(rect, channels), slots=slots, name=name)
+
+    @classmethod
+    def attach(cls, name):
+        """Open an existing ring created by another process."""
+        return cls(shared_memory.SharedMemory(name=name), owner=False)
+
+    # --- Writer ---
+
+    def write(self, frame, timestamp=None):
+        """Copy frame into the next slot. Returns its sequence number."""
+        h, w = frame.shape[:2]
+        c = frame.shape[2] if frame.ndim == 3 else 1
+        if h > self.max_shape[0] or w > self.max_shape[1] or c != self.max_shape[2]:
+            raise ValueError(f"Frame {frame.shape} does not fit ring slot {self.max_shape}")
+
+        seq = int(self._header[_LATEST]) + 1
+        slot = (seq - 1) % self.slots
+        meta = self._meta[slot]
+
+        meta[_SEQ] = WRITING
+        dst = self._data[slot, :h * w * c].reshape(h, w, c) if c > 1 else self._data[slot, :h * w].reshape(h, w)
+        np.copyto(dst, frame)
+        meta[_H], meta[_W] = h, w
+        self._meta_f[slot, _TS] = time.time() if timestamp is None else timestamp
+        meta[_SEQ] = seq
+        self._header[_LATEST] = seq
+        return seq
+
+    # --- Readers ---
+
+    def latest_seq(self):
+        return int(self._header[_LATEST])
+
+    def read(self, seq=None):
+        """
+        Read-only view of frame `seq` (latest if None) as (seq, timestamp, view),
+        or None if the slot was overwritten or is being written.
+        """
+        if seq is None:
+            seq = self.latest_seq()
+        if seq <= 0:
+            return None
+        slot = (seq - 1) % self.slots
+        meta = self._meta[slot]
+        if int(meta[_SEQ]) != seq:
+            return None
+        h, w = int(meta[_H]), int(meta[_W])
+        c = self.max_shape[2]
+        timestamp = float(self._meta_f[slot, _TS])
+        if c > 1:
+            view = self._data[slot, :h * w * c].reshape(h, w, c)
+        else:
+            view = self._data[slot, :h * w].reshape(h, w)
+        view = view.view()
+        view.flags.writeable = False
+        if int(meta[_SEQ]) != seq:
+            return None
+        return seq, timestamp, view
+
+    def is_valid(self, seq):
+        """True while slot `seq` has not been overwritten (check after using a view)."""
+        return int(self._meta[(seq - 1) % self.slots, _SEQ]) == seq
+
+    def wait_next(self, last_seq, timeout=1.0, poll=0.001):
+        """Poll until a frame newer than last_seq is published. Returns its seq or None."""
+        deadline = time.perf_counter() + timeout
+        while True:
+            seq = self.latest_seq()
+            if seq > last_seq:
+                return seq
+            if time.perf_counter() >= deadline:
+                return None
+            time.sleep(poll)
+
+    # --- Lifetime ---
+
+    def close(self):
+        # Views must not outlive the mapping
+        self._header = self._meta = self._meta_f = self._data = None
+        self.shm.close()
+
+    def unlink(self):
+        if self.owner:
+            self.shm.unlink()
+
+
+def _align(n):
+    return (n + DATA_ALIGN - 1) // DATA_ALIGN * DATA_ALIGN
+
+
+def run_capture_process(ring_name, config, stop_event, default="dxcam"):
+    """
+    Capture process entry point: grab the game window through the configured
+    FrameSource and publish every frame into the ring until stop_event is set.
+    """
+    from capture.frame_source import create_frame_source
+
+    ring = SharedFrameRing.attach(ring_name)
+    source = create_frame_source(config, default=default)
+    try:
+        source.open()
+        while not stop_event.is_set():
+            window_frame = source.grab_window()
+            if window_frame is None:
+                time.sleep(0.005)
+                continue
+            ring.write(window_frame.image, window_frame.timestamp)
+    finally:
+        source.close()
+        ring.close()
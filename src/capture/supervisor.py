@@ -0,0 +1,186 @@
+"""
+Capture supervisor - keeps a FrameSource alive across device errors.
+
+Grab exceptions no longer propagate to the workers: the failing backend is
+closed and reopened after an exponential backoff, and when it keeps failing
+the supervisor fails over to the next configured backend (e.g. DXCam -> mss).
+While a backend is backing off, grab() returns None like a backend with no
+new frame, so callers keep their normal short sleep.
+"""
+
+import collections
+import time
+
+from capture.frame_source import FrameSource
+
+BACKOFF_BASE = 0.25        # First reinit delay (s), doubled per failure since the last good frame
+BACKOFF_MAX = 8.0
+FAILURE_WINDOW = 30.0      # Seconds of failure history used for the failure rate
+FAILOVER_THRESHOLD = 3     # Failures within FAILURE_WINDOW before switching backend
+
+
+class CaptureSupervisor(FrameSource):
+    """FrameSource wrapper with failure tracking, backoff and backend failover."""
+
+    def __init__(self, backends, context=None, backoff_base=BACKOFF_BASE, backoff_max=BACKOFF_MAX,
+                 failure_window=FAILURE_WINDOW, failover_threshold=FAILOVER_THRESHOLD):
+        if not backends:
+            raise ValueError("CaptureSupervisor needs at least one backend")
+        # FrameSource.__init__ is skipped: stats and last_timestamp come from the active backend
+        self.context = context
+        self.backends = list(backends)
+        self.index = 0
+        self.is_open = False
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.failure_window = failure_window
+        self.failover_threshold = failover_threshold
+
+        self.last_error = None
+        self.consecutive_failures = 0   # Active backend, reset on failover
+        self.chain_failures = 0         # Whole chain, reset only by a successful grab
+        self.reinit_count = 0
+        self.failover_count = 0
+        self.time_to_first_frame = None
+        self._failures = collections.deque()
+        self._failed_backends = set()
+        self._retry_at = 0.0
+        self._opened_at = None
+
+    @property
+    def active(self):
+        return self.backends[self.index]
+
+    @property
+    def name(self):
+        return self.active.name
+
+    @property
+    def stats(self):
+        return self.active.stats
+
+    @property
+    def last_timestamp(self):
+        return self.active.last_timestamp
+
+    # --- Lifetime ---
+
+    def open(self):
+        """Open the first backend that works. Raises if none of them does."""
+        errors = []
+        for _ in range(len(self.backends)):
+            try:
+                self._open_active()
+                self.is_open = True
+                return
+            except Exception as e:
+                print(f"CaptureSupervisor: {self.active.name} init error: {e}")
+                errors.append(f"{self.active.name}: {e}")
+                self.last_error = e
+                self._failover()
+        raise RuntimeError("No capture backend available (" + "; ".join(errors) + ")")
+
+    def close(self):
+        for backend in self.backends:
+            if backend.is_open:
+                backend.close()
+        self.is_open = False
+
+    def get_window_rect(self):
+        return self.active.get_window_rect()
+
+    @property
+    def geometry_version(self):
+        return self.active.geometry_version
+
+    # --- Grabs ---
+
+    def grab(self, region):
+        return self._call(lambda: self.active.grab(region))
+
+    def grab_window(self, rect=None):
+        return self._call(lambda: self.active.grab_window(rect))
+
+    def _call(self, grab):
+        if not self._ensure_open():
+            return None
+        try:
+            frame = grab()
+        except Exception as e:
+            self._on_failure(e)
+            return None
+        if frame is not None:
+            self.consecutive_failures = 0
+            self.chain_failures = 0
+            self._failed_backends.clear()
+            if self._opened_at is not None:
+                self.time_to_first_frame = time.monotonic() - self._opened_at
+                self._opened_at = None
+        return frame
+
+    def _ensure_open(self):
+        if self.active.is_open:
+            return True
+        if time.monotonic() < self._retry_at:
+            return False
+        try:
+            self._open_active()
+            self.reinit_count += 1
+            print(f"CaptureSupervisor: {self.active.name} reinitialized")
+            return True
+        except Exception as e:
+            self._on_failure(e)
+            return False
+
+    def _open_active(self):
+        self.active.open()
+        self._opened_at = time.monotonic()
+
+    def _on_failure(self, error):
+        now = time.monotonic()
+        print(f"CaptureSupervisor: {self.active.name} error: {error}")
+        self.last_error = error
+        self.consecutive_failures += 1
+        self.chain_failures += 1
+        self._failed_backends.add(self.index)
+        self._failures.append(now)
+        while self._failures and now - self._failures[0] > self.failure_window:
+            self._failures.popleft()
+
+        try:
+            self.active.close()
+        except Exception:
+            pass
+
+        # Backoff grows across failovers, so a chain where every backend fails still reaches backoff_max
+        delay = min(self.backoff_max, self.backoff_base * 2 ** (self.chain_failures - 1))
+        if len(self.backends) > 1 and len(self._failures) >= self.failover_threshold:
+            self._failover()
+            if self.index not in self._failed_backends:
+                delay = 0.0     # Backend not yet tried since the last good frame: switch right away
+        self._retry_at = now + delay
+
+    def _failover(self):
+        if len(self.backends) < 2:
+            return
+        previous = self.active.name
+        self.index = (self.index + 1) % len(self.backends)
+        self.failover_count += 1
+        self.consecutive_failures = 0
+        self._failures.clear()
+        print(f"CaptureSupervisor: failing over {previous} -> {self.active.name}")
+
+    # --- Health ---
+
+    def health(self):
+        """{"backend", "reinit_count", "failover_count", "time_to_first_frame", "failure_rate", "backoff"}"""
+        now = time.monotonic()
+        recent = [t for t in self._failures if now - t <= self.failure_window]
+        return {
+            "backend": self.active.name,
+            "reinit_count": self.reinit_count,
+            "failover_count": self.failover_count,
+            "time_to_first_frame": self.time_to_first_frame,
+            "failure_rate": len(recent) / self.failure_window * 60.0,  # failures per minute
+            "backoff": max(0.0, self._retry_at - now) if not self.active.is_open else 0.0,
+        }
@@ -0,0 +1,31 @@
+"""
+Full game-window capture shared between consumers.
+"""
+
+
+class WindowFrame:
+    """A full-window BGR capture together with the window rect it was taken at."""
+
+    __slots__ = ("image", "window_rect", "timestamp", "seq", "geometry_version")
+
+    def __init__(self, image, window_rect, timestamp, seq=0, geometry_version=0):
+        self.image = image
+        self.window_rect = window_rect
+        self.timestamp = timestamp
+        self.seq = seq
+        # GameContext.geometry_version at grab time; changes on window move/resize
+        self.geometry_version = geometry_version
+
+    def crop(self, region):
+        """
+        Zero-copy view of a window-relative region {"left", "top", "width", "height"}.
+        The region is clamped to the frame; returns None if nothing is left.
+        """
+        h, w = self.image.shape[:2]
+        x1 = min(max(0, int(region["left"])), w)
+        y1 = min(max(0, int(region["top"])), h)
+        x2 = min(max(x1, int(region["left"] + region["width"])), w)
+        y2 = min(max(y1, int(region["top"] + region["height"])), h)
+        if x2 <= x1 or y2 <= y1:
+            return None
+        return self.image[y1:y2, x1:x2]
@@ -1,66 +1,248 @@
-import ctypes
-import ctypes.wintypes
 import threading
 import time
 
-user32 = ctypes.windll.user32
-kernel32 = ctypes.windll.kernel32
+# Seconds a window rect is served from cache before the OS is asked again
+DEFAULT_GEOMETRY_TTL = 0.1
 
-class GameContext:
-    _instance = None
-    _lock = threading.Lock()
+# Client tracked by the module-level game_context (single-client setups)
+DEFAULT_CLIENT_ID = "default"
 
-    def __new__(cls):
-        with cls._lock:
-            if cls._instance is None:
-                cls._instance = super(GameContext, cls).__new__(cls)
-                cls._instance.pid = None
-                cls._instance.hwnd = None
-        return cls._instance
+# Windows' 100% UI scale
+DEFAULT_DPI = 96
 
-    def set_process(self, pid):
-        self.pid = pid
-        self.hwnd = None
-        # Try to find the window immediately, but it might take a moment to appear
-        self._find_window()
 
-    def _find_window(self):
-        if self.pid is None:
-            return None
-        
+class WindowBackend:
+    """OS window queries used by GameContext. Replace with a fake in tests."""
+
+    def find_window(self, pid):
+        """Visible top-level window handle of the process, or None"""
+        raise NotImplementedError
+
+    def is_window(self, hwnd):
+        raise NotImplementedError
+
+    def get_window_rect(self, hwnd):
+        """Returns (left, top, right, bottom) or None"""
+        raise NotImplementedError
+
+    def get_window_dpi(self, hwnd):
+        """DPI of the monitor/UI scale the window is rendered at"""
+        return DEFAULT_DPI
+
+
+class Win32WindowBackend(WindowBackend):
+    """user32 calls through ctypes (Windows only, loaded on first use)."""
+
+    def __init__(self):
+        import ctypes
+        import ctypes.wintypes
+        self.ctypes = ctypes
+        self.user32 = ctypes.windll.user32
+        self.kernel32 = ctypes.windll.kernel32
+        self.WNDENUMPROC = ctypes.WINFUNCTYPE(ctypes.c_bool, ctypes.wintypes.HWND, ctypes.wintypes.LPARAM)
+
+    def find_window(self, pid):
+        ctypes = self.ctypes
+        user32 = self.user32
         found_hwnd = None
-        
+
         def callback(hwnd, _):
             nonlocal found_hwnd
             lpdw_process_id = ctypes.c_ulong()
             user32.GetWindowThreadProcessId(hwnd, ctypes.byref(lpdw_process_id))
-            if lpdw_process_id.value == self.pid:
+            if lpdw_process_id.value == pid:
                 # Check if it's a visible window (not a background worker)
                 if user32.IsWindowVisible(hwnd):
                     found_hwnd = hwnd
                     return False # Stop enumeration
             return True
 
-        WNDENUMPROC = ctypes.WINFUNCTYPE(ctypes.c_bool, ctypes.wintypes.HWND, ctypes.wintypes.LPARAM)
-        user32.EnumWindows(WNDENUMPROC(callback), 0)
-        
-        self.hwnd = found_hwnd
+        user32.EnumWindows(self.WNDENUMPROC(callback), 0)
+        return found_hwnd
+
+    def is_window(self, hwnd):
+        return bool(self.user32.IsWindow(hwnd))
+
+    def get_window_rect(self, hwnd):
+        rect = self.ctypes.wintypes.RECT()
+        if self.user32.GetWindowRect(hwnd, self.ctypes.byref(rect)):
+            return (rect.left, rect.top, rect.right, rect.bottom)
+        return None
+
+    def get_window_dpi(self, hwnd):
+        # GetDpiForWindow exists from Windows 10 1607; 0 means an invalid window
+        get_dpi = getattr(self.user32, "GetDpiForWindow", None)
+        dpi = get_dpi(hwnd) if get_dpi is not None else 0
+        return dpi or DEFAULT_DPI
+
+
+class GameContext:
+    """
+    Tracks the game process window. get_window_rect() is served from a cache
+    refreshed at most every geometry_ttl seconds (or after invalidate());
+    geometry_version increments whenever the rect actually changes, so
+    downstream caches only need to be dropped on real moves or resizes.
+    dpi is re-read on every such change (moving to another monitor resizes the window).
+    """
+
+    def __init__(self, backend=None, geometry_ttl=DEFAULT_GEOMETRY_TTL, client_id=DEFAULT_CLIENT_ID):
+        self.client_id = client_id
+        self.pid = None
+        self.hwnd = None
+        self.geometry_ttl = geometry_ttl
+        self.geometry_version = 0
+        self.dpi = DEFAULT_DPI
+        self._backend = backend
+        self._rect = None
+        self._rect_time = None
+        self._lock = threading.Lock()
+        self._listeners = []
+
+    @property
+    def backend(self):
+        if self._backend is None:
+            self._backend = Win32WindowBackend()
+        return self._backend
+
+    def set_process(self, pid):
+        self.pid = pid
+        self.hwnd = None
+        self.invalidate()
+        # Try to find the window immediately, but it might take a moment to appear
+        self._find_window()
+
+    def _find_window(self):
+        if self.pid is None:
+            return None
+        self.hwnd = self.backend.find_window(self.pid)
         return self.hwnd
 
     def get_window_rect(self):
         """Returns (left, top, right, bottom) or None"""
+        now = time.monotonic()
+        with self._lock:
+            if self._rect_time is not None and now - self._rect_time < self.geometry_ttl:
+                return self._rect
+        return self.refresh()
+
+    def refresh(self):
+        """Query the OS now, update the cache and notify listeners if the rect changed."""
+        rect = self._query_rect()
+        with self._lock:
+            changed = rect != self._rect
+            self._rect = rect
+            self._rect_time = time.monotonic()
+            if changed:
+                self.geometry_version += 1
+            version = self.geometry_version
+            listeners = list(self._listeners) if changed else []
+        if changed and rect is not None:
+            try:
+                self.dpi = self.backend.get_window_dpi(self.hwnd)
+            except Exception as e:
+                print(f"GameContext: DPI query failed: {e}")
+        for listener in listeners:
+            try:
+                listener(rect, version)
+            except Exception as e:
+                print(f"GameContext: geometry listener error: {e}")
+        return rect
+
+    def _query_rect(self):
         if self.hwnd is None:
             if not self._find_window():
                 return None
-        
+
         # Verify window is still valid
-        if not user32.IsWindow(self.hwnd):
+        if not self.backend.is_window(self.hwnd):
             self.hwnd = None
             return None
 
-        rect = ctypes.wintypes.RECT()
-        if user32.GetWindowRect(self.hwnd, ctypes.byref(rect)):
-            return (rect.left, rect.top, rect.right, rect.bottom)
+        return self.backend.get_window_rect(self.hwnd)
+
+    def invalidate(self):
+        """Drop the cached rect; the next get_window_rect() asks the OS (e.g. after a move/resize event)."""
+        with self._lock:
+            self._rect_time = None
+
+    def add_geometry_listener(self, callback):
+        """callback(rect, geometry_version) is called after every real rect change."""
+        with self._lock:
+            self._listeners.append(callback)
+
+    def remove_geometry_listener(self, callback):
+        with self._lock:
+            if callback in self._listeners:
+                self._listeners.remove(callback)
+
+
+class GameContextRegistry:
+    """One GameContext per game client, keyed by client id, so one process can drive several windows."""
+
+    def __init__(self, backend=None, geometry_ttl=DEFAULT_GEOMETRY_TTL):
+        self.backend = backend
+        self.geometry_ttl = geometry_ttl
+        self._contexts = {}
+        self._next_id = 1
+        self._lock = threading.Lock()
+
+    def get(self, client_id=None):
+        """Context of client_id (the default client if None), created on first use."""
+        client_id = client_id or DEFAULT_CLIENT_ID
+        with self._lock:
+            context = self._contexts.get(client_id)
+            if context is None:
+                context = GameContext(self.backend, self.geometry_ttl, client_id=client_id)
+                self._contexts[client_id] = context
+            return context
+
+    def register(self, pid, client_id=None):
+        """
+        Track the window of process pid under a new (or given) client id. Returns
+        the client id; a pid that is already registered keeps its existing id.
+        """
+        if client_id is None:
+            with self._lock:
+                existing = self._find_client(pid=pid)
+                if existing is not None:
+                    return existing
+                while f"client{self._next_id}" in self._contexts:
+                    self._next_id += 1
+                client_id = f"client{self._next_id}"
+                self._next_id += 1
+        self.get(client_id).set_process(pid)
+        return client_id
+
+    def resolve(self, client_id=None):
+        """
+        Registered client driving the same window as client_id. The default
+        context usually follows the latest launch, so it resolves to that
+        clientN; two workers then never drive one window. Returns client_id
+        unchanged when no other client matches.
+        """
+        with self._lock:
+            context = self._contexts.get(client_id or DEFAULT_CLIENT_ID)
+            if context is None or (context.pid is None and context.hwnd is None):
+                return client_id
+            match = self._find_client(context.pid, context.hwnd, exclude=context.client_id)
+        return match if match is not None else client_id
+
+    def _find_client(self, pid=None, hwnd=None, exclude=None):
+        # Caller holds self._lock; the default context is an alias and never a match
+        for client_id, context in self._contexts.items():
+            if client_id in (DEFAULT_CLIENT_ID, exclude):
+                continue
+            if (pid is not None and context.pid == pid) or (hwnd is not None and context.hwnd == hwnd):
+                return client_id
         return None
 
-game_context = GameContext()
+    def remove(self, client_id):
+        with self._lock:
+            self._contexts.pop(client_id, None)
+
+    def client_ids(self):
+        with self._lock:
+            return list(self._contexts)
+
+game_contexts = GameContextRegistry()
+game_context = game_contexts.get(DEFAULT_CLIENT_ID)
@@ -1,19 +1,21 @@
 from PySide6.QtCore import QObject, Signal
 from gui.controllers.boss_tab_worker import BossTabWorker
+from capture.frame_source import default_capture_config
 
 class BossTabManager(QObject):
     frame_update = Signal(object)
     status_update = Signal(str)
 
-    def __init__(self):
+    def __init__(self, config=None):
         super().__init__()
+        self.config = config if config is not None else default_capture_config()
         self.worker = None
 
     def start_detection(self):
         if self.worker is not None and self.worker.isRunning():
             return
 
-        self.worker = BossTabWorker()
+        self.worker = BossTabWorker(self.config)
         self.worker.frame_processed.connect(self.handle_frame)
         self.worker.status_update.connect(self.handle_status)
         self.worker.start()
@@ -1,11 +1,11 @@
 import os
 import cv2
 import numpy as np
-import mss
 import time
 from PySide6.QtCore import QThread, Signal, QObject
-from ultralytics import YOLO
-from game_context import game_context
+from capture.frame_source import create_frame_source
+from capture.capture_hub import CaptureHub
+from vision.engines import get_yolo_model
 
 class BossTabWorker(QThread):
     frame_processed = Signal(np.ndarray)
@@ -15,10 +15,18 @@ class BossTabWorker(QThread):
     CONF_THRESHOLD = 0.45
     IOU_THRESHOLD = 0.45
     
-    def __init__(self):
+    def __init__(self, config=None):
         super().__init__()
+        self.config = config or {}
         self.running = False
         self.model = None
+        # Capture backend (mss unless config["capture_backend"] says otherwise)
+        # capture_mode "hub" shares the CaptureHub with the other workers,
+        # "stream" runs a private producer at config["target_fps"]
+        self.capture_mode = self.config.get("capture_mode", "direct")
+        self.frame_source = None
+        self.capture_hub = None
+        self.capture_sub = None
         self.load_model()
 
     def load_model(self):
@@ -28,7 +36,7 @@ class BossTabWorker(QThread):
             model_path = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', 'data', 'weights', 'boss_detector.pt'))
             
             if os.path.exists(model_path):
-                self.model = YOLO(model_path)
+                self.model = get_yolo_model(model_path)
                 self.status_update.emit(f"Model loaded: {os.path.basename(model_path)}")
             else:
                 self.status_update.emit(f"Model not found: {model_path}")
@@ -39,6 +47,25 @@ class BossTabWorker(QThread):
 
     def run(self):
         self.running = True
+
+        try:
+            if self.capture_mode in ("hub", "stream"):
+                if self.capture_mode == "hub":
+                    self.capture_hub = CaptureHub.acquire(self.config)
+                else:
+                    self.capture_hub = CaptureHub.stream(self.config, default="mss")
+                self.capture_sub = self.capture_hub.subscribe("boss_tab")
+            else:
+                # One long-lived grabber; frames are consumed before the next grab,
+                # so the BGR conversion can reuse a single preallocated buffer
+                self.frame_source = create_frame_source(dict(self.config, reuse_buffer=True), default="mss")
+                self.frame_source.open()
+        except Exception as e:
+            self.status_update.emit(f"Capture error: {e}")
+            print(f"BossTabWorker: Capture init error: {e}")
+            self.running = False
+            return
+
         self.status_update.emit("Detection started")
         
         while self.running:
@@ -47,31 +74,32 @@ class BossTabWorker(QThread):
                     time.sleep(1)
                     continue
 
-                # Get game window coordinates
-                rect = game_context.get_window_rect()
-                if not rect:
-                    self.status_update.emit("Game window not found")
-                    time.sleep(1)
-                    continue
-                
-                left, top, right, bottom = rect
-                w = right - left
-                h = bottom - top
-                
-                monitor = {"top": top, "left": left, "width": w, "height": h}
-                
-                # Capture frame
-                with mss.mss() as sct:
-                    img = np.array(sct.grab(monitor))
+                if self.capture_sub is not None:
+                    # Read-only full-window view shared with the other hub subscribers
+                    window_frame = self.capture_sub.get(timeout=0.5)
+                    if window_frame is None:
+                        continue
+                    frame = self.capture_sub.view(window_frame)
+                else:
+                    # Get game window coordinates
+                    rect = self.frame_source.get_window_rect()
+                    if not rect:
+                        self.status_update.emit("Game window not found")
+                        time.sleep(1)
+                        continue
                     
-                # Convert to BGR for OpenCV/YOLO
-                frame = cv2.cvtColor(img, cv2.COLOR_BGRA2BGR)
+                    # Capture frame (already BGR for OpenCV/YOLO)
+                    frame = self.frame_source.grab(rect)
+                    if frame is None:
+                        time.sleep(0.01)
+                        continue
                 
                 # Run inference
                 results = self.model(frame, verbose=False, conf=self.CONF_THRESHOLD, iou=self.IOU_THRESHOLD)
                 
                 # Annotate frame
                 annotated_frame = results[0].plot()
+                self._draw_capture_stats(annotated_frame)
                 
                 # Emit processed frame for preview
                 self.frame_processed.emit(annotated_frame)
@@ -87,8 +115,33 @@ class BossTabWorker(QThread):
                 print(f"BossTabWorker Error: {e}")
                 time.sleep(1)
         
+        if self.capture_hub is not None:
+            self.capture_sub.close()
+            self.capture_hub.release()
+        if self.frame_source is not None:
+            self.frame_source.close()
         self.status_update.emit("Detection stopped")
 
+    def capture_stats(self):
+        """Capture-stage timings of the active backend (see CaptureStats.snapshot)."""
+        source = self.capture_hub.source if self.capture_hub is not None else self.frame_source
+        if source is None:
+            return {}
+        return source.stats.snapshot()
+
+    def _draw_capture_stats(self, frame):
+        stats = self.capture_stats()
+        if not stats:
+            return
+        text = f"Capture: grab {stats.get('grab_ms', 0.0):.1f}ms"
+        if "convert_ms" in stats:
+            text += f", convert {stats['convert_ms']:.1f}ms"
+        text += f", allocs {stats['allocations']}/{stats['frames']}"
+        if self.capture_hub is not None and self.capture_hub.target_fps:
+            fps = self.capture_hub.fps_stats()
+            text += f", {fps['achieved_fps']:.1f}/{fps['target_fps']:.0f} FPS"
+        cv2.putText(frame, text, (10, 20), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0, 255, 0), 1)
+
     def stop(self):
         self.running = False
         self.wait()
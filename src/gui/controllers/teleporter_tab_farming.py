@@ -5,35 +5,41 @@ Legacy logic removed.
 
 from typing import Optional, Any
 from PySide6.QtCore import QObject
+from capture.frame_source import default_capture_config
+from game_context import game_contexts
 
 class BossFarmingConfig:
     """Configuration manager skeleton."""
     
     def __init__(self):
-        self.config = {"boss": {}, "metin": {}}
+        self.config = {"boss": {}, "metin": {}, "capture": default_capture_config()}
 
     def get_boss_config(self):
         return self.config["boss"]
 
     def get_metin_config(self):
         return self.config["metin"]
+
+    def get_capture_config(self):
+        return self.config["capture"]
         
     def update_boss_config(self, updates):
         pass
 
 class BossFarmingManager(QObject):
-    """Manager skeleton."""
+    """Manager skeleton. Runs one BossDetectionWorker per game client."""
 
     def __init__(self):
         super().__init__()
         self.config_manager = BossFarmingConfig()
-        self.boss_worker = None
+        self.workers = {}  # {client_id (None = default client): BossDetectionWorker}
+        self.boss_worker = None  # Most recently started worker
         self.hotkey_listener = None
         # Template persistence is now handled by worker (Issue 8)
 
-    def start_boss_farming(self, priority_list=None, click_enabled=True, num_channels=1, ocr_backend="CPU", pelerynka_key="F1", show_preview=True, channel_hotkeys=None, ignore_stuck=True, stuck_timeout=30) -> Optional[Any]:
+    def start_boss_farming(self, priority_list=None, click_enabled=True, num_channels=1, ocr_backend="CPU", pelerynka_key="F1", show_preview=True, channel_hotkeys=None, ignore_stuck=True, stuck_timeout=30, client_id=None) -> Optional[Any]:
         from gui.controllers.teleporter_tab_worker import BossDetectionWorker
-        config = {}
+        config = dict(self.config_manager.get_capture_config())
         if priority_list:
             config["map_priority"] = priority_list
         config["click_enabled"] = click_enabled
@@ -45,28 +51,61 @@ class BossFarmingManager(QObject):
         config["ignore_stuck"] = ignore_stuck
         config["stuck_timeout"] = stuck_timeout
         # Note: Worker handles template loading from disk automatically
-            
-        self.boss_worker = BossDetectionWorker(config)
-        self.boss_worker.start()
-        return self.boss_worker
-
-    def stop_boss_farming(self):
-        if self.boss_worker:
-            # Worker handles template persistence internally now
-            self.boss_worker.stop()
+
+        # One worker per client; restarting a client replaces only its own worker
+        client_id = game_contexts.resolve(client_id)
+        self.stop_client_farming(client_id)
+        if client_id:
+            config["client_id"] = client_id
+        worker = BossDetectionWorker(config)
+        self.workers[client_id] = worker
+        self.boss_worker = worker
+        worker.start()
+        return worker
+
+    def _worker_key(self, client_id):
+        # Workers are keyed by the resolved client; a worker started before the
+        # default context was aliased to a launched client keeps its own key
+        resolved = game_contexts.resolve(client_id)
+        return resolved if resolved in self.workers else client_id
+
+    def _selected(self, client_id):
+        if client_id is None:
+            return list(self.workers.values())
+        worker = self.workers.get(self._worker_key(client_id))
+        return [worker] if worker else []
+
+    def is_client_running(self, client_id):
+        """Whether a worker is running for client_id (None = the default client)."""
+        worker = self.workers.get(self._worker_key(client_id))
+        return worker is not None and worker.isRunning()
+
+    def stop_client_farming(self, client_id):
+        """Stop the worker of exactly client_id (None = the default client's worker)."""
+        worker = self.workers.pop(self._worker_key(client_id), None)
+        if worker is None:
+            return
+        # Worker handles template persistence internally now
+        worker.stop()
+        if worker is self.boss_worker:
             self.boss_worker = None
 
-    def pause_boss_farming(self):
-        if self.boss_worker:
-            self.boss_worker.pause()
+    def stop_boss_farming(self, client_id=None):
+        """Stop the worker of client_id, or every worker if None."""
+        for cid in ([client_id] if client_id is not None else list(self.workers)):
+            self.stop_client_farming(cid)
+
+    def pause_boss_farming(self, client_id=None):
+        for worker in self._selected(client_id):
+            worker.pause()
 
-    def resume_boss_farming(self):
-        if self.boss_worker:
-            self.boss_worker.resume()
+    def resume_boss_farming(self, client_id=None):
+        for worker in self._selected(client_id):
+            worker.resume()
 
-    def reset_boss_farming(self):
-        if self.boss_worker:
-            self.boss_worker.reset()
+    def reset_boss_farming(self, client_id=None):
+        for worker in self._selected(client_id):
+            worker.reset()
 
     def switch_to_channel(self, channel_index: int):
         pass
@@ -75,4 +114,4 @@ class BossFarmingManager(QObject):
         return self.config_manager
         
     def cleanup(self):
-        self.stop_boss_farming()
\ No newline at end of file
+        self.stop_boss_farming()
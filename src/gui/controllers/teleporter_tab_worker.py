@@ -1,16 +1,30 @@
 """
-Boss detection worker - DXCam + GameContext + CPU Optimization.
+Boss detection worker - FrameSource (DXCam by default) + GameContext + CPU Optimization.
 """
 
 from PySide6.QtCore import QThread, Signal
+import functools
 import time
 import cv2
 import numpy as np
-import dxcam
 import threading
-from game_context import game_context
-from rapidocr_onnxruntime import RapidOCR
-from ultralytics import YOLO
+from capture.frame_source import create_frame_source
+from capture.capture_hub import CaptureHub
+from vision.change_detector import ChangeDetector
+from vision.engines import get_ocr_engine, get_yolo_model
+from ocr.executor import OcrExecutor, DEFAULT_OCR_WORKERS
+from ocr.process_service import OcrProcessExecutor
+from ocr.pipeline import build_ocr_pipeline
+from ocr.cache import OcrCache, DEFAULT_CACHE_SIZE
+from ocr.verify import verify_crops
+from ocr.map_matcher import MapNameMatcher
+from vision.result_bus import ResultBus
+from vision.row_segmenter import segment_rows, row_bands
+from vision.template_matcher import (LocationPredictor, MultiTemplateMatcher, PyramidLevels, estimate_scale,
+                                     pyramid_match, rescale)
+from vision.template_store import (TemplateStore, open_template_store, MAX_TEMPLATES, MAX_BYTES, partition_key,
+                                   parse_partition)
+from game_context import game_contexts
 import os
 import pyautogui
 import Levenshtein
@@ -29,10 +43,18 @@ RELATIVE_ROI = {
 }
 
 OCR_INTERVAL = 0.35        # Run OCR every 350ms
+OCR_MAX_AGE_FRAMES = 30    # OCR results from older (changed) frames are not acted on
 SCALE_FACTOR = 1.0         # 1.0 = no scaling
 ENABLE_CLAHE = True        # Better for dark backgrounds
 CLAHE_CLIP_LIMIT = 3.0     
 CLAHE_GRID_SIZE = 8        
+SCROLL_STRIP_MARGIN = 40   # px around the calibrated scroll icon column
+MAX_TEMPLATE_HITS = 8      # "Dostępny" rows verified per frame
+TEMPLATE_PYRAMID = {"map:*": 1}  # Pyramid level per template key pattern; status:* stays full resolution
+VERIFY_CACHE_TTL = 2.0     # Seconds a "Dostępny" accept/reject decision is reused for identical pixels
+TEMPLATE_MULTISCALE = False  # Rescale templates of another window size / DPI instead of re-learning them via OCR
+SCALE_RETRY_INTERVAL = 2.0   # Seconds between scale estimation attempts that found no match
+SCALE_PROBES = 2             # Templates tried per estimation attempt (most used first)
 
 class BossDetectionWorker(QThread):
     frame_captured = Signal(object)
@@ -42,30 +64,16 @@ class BossDetectionWorker(QThread):
         super().__init__()
         self.config = config
         self.map_priority = config.get("map_priority", [])
+        self.map_matcher = MapNameMatcher(self.map_priority)
         # click_enabled is now always True
         self.click_enabled = True
         self.ocr_backend = config.get("ocr_backend", "CPU")
         self.show_preview = config.get("show_preview", True)
-        
-        if self.ocr_backend == "GPU (CUDA)":
-            print("Initializing OCR with GPU (CUDA)...")
-            try:
-                self.ocr = RapidOCR(det_use_cuda=True, cls_use_cuda=True, rec_use_cuda=True)
-            except Exception as e:
-                print(f"Failed to init GPU (CUDA) OCR: {e}. Falling back to CPU.")
-                self.ocr = RapidOCR()
-        elif self.ocr_backend == "GPU (DirectML)":
-            print("Initializing OCR with GPU (DirectML)...")
-            try:
-                # DirectML is often enabled via det_use_dml=True in recent versions
-                # If not supported by installed version, it might throw or ignore.
-                self.ocr = RapidOCR(det_use_dml=True, cls_use_dml=True, rec_use_dml=True)
-            except Exception as e:
-                print(f"Failed to init GPU (DirectML) OCR: {e}. Falling back to CPU.")
-                self.ocr = RapidOCR()
-        else:
-            print("Initializing OCR with CPU...")
-            self.ocr = RapidOCR()
+        # Game client this worker drives (see game_context.game_contexts); None = default client
+        self.client_id = config.get("client_id")
+
+        # One RapidOCR per backend is shared by the workers of all clients
+        self.ocr = get_ocr_engine(self.ocr_backend)
             
         self.should_stop = False
         self.paused = False
@@ -99,23 +107,67 @@ class BossDetectionWorker(QThread):
         self.pelerynka_key = config.get("pelerynka_key", "F1")
         self.space_held = False
 
-        # DXCam instance
-        self.camera = None
+        # Capture backend (DXCam unless config["capture_backend"] says otherwise)
+        # capture_mode: "direct" grabs ROI/full window separately, "window" grabs the
+        # full window once per tick and crops every region from it, "hub" shares the CaptureHub,
+        # "stream" runs a private producer at config["target_fps"] keeping only the latest frame
+        self.capture_mode = config.get("capture_mode", "direct")
+        self.frame_source = None
+        self.capture_hub = None
+        self.capture_sub = None
+        self.capture_name = None
 
         # OCR state
         self.last_ocr_time = 0
         self.latest_ocr_result = None
+        self.latest_ocr_version = None
         self.ocr_lock = threading.Lock()
+        # OCR pipeline (ocr_mode, ocr_row_source, ocr_cache_size/ttl; see ocr.pipeline). With
+        # ocr_process it runs in dedicated service processes instead of threads of this one
+        self.ocr_mode = config.get("ocr_mode", "full")
+        self.ocr_process = config.get("ocr_process", False)
+        ocr_workers = config.get("ocr_workers", DEFAULT_OCR_WORKERS)
+        if self.ocr_process:
+            self.layout_ocr = None
+            self.ocr_cache = None
+            self.ocr_executor = OcrProcessExecutor(config, workers=ocr_workers)
+        else:
+            ocr_engine, self.layout_ocr, self.ocr_cache = build_ocr_pipeline(self.ocr, config)
+            # Persistent OCR workers; a frame still waiting is replaced by the newer one
+            self.ocr_executor = OcrExecutor(ocr_engine, workers=ocr_workers)
+
+        # "Dostępny" verification decisions per crop; an unchanged row is not re-read
+        verify_ttl = config.get("verify_cache_ttl", VERIFY_CACHE_TTL)
+        self.verify_cache = OcrCache(DEFAULT_CACHE_SIZE, verify_ttl) if verify_ttl else None
+
+        # Results (OCR, YOLO ROI, template matches) tagged with the frame they came from
+        self.result_bus = ResultBus()
+        self.frame_id = 0               # Incremented for every captured frame
+        self.last_change_frame_id = 0   # Last frame whose ROI pixels changed
+        self.current_roi = None
+        self.ocr_max_age_frames = config.get("ocr_max_age_frames", OCR_MAX_AGE_FRAMES)
         
         # Template Cache
-        self.dynamic_templates = config.get("initial_templates", {}).copy()
         self.template_lock = threading.Lock()
         
-        # Template Persistence (Issue 8)
+        # Template Persistence (Issue 8): one memory-mapped .npy per template + index.json,
+        # loaded lazily and evicted LRU; provided initial templates stay in memory only
         self.template_cache_dir = os.path.join(os.getcwd(), "data", "templates", "cache")
-        os.makedirs(self.template_cache_dir, exist_ok=True)
-        if not config.get("initial_templates"):  # Only load if not provided
+        initial_templates = config.get("initial_templates")
+        if initial_templates:
+            self.dynamic_templates = TemplateStore(None)
+            for key, template in initial_templates.items():
+                self.dynamic_templates[key] = template
+        else:
+            # Shared with the workers of the other clients (one writer per store root)
+            self.dynamic_templates = open_template_store(os.path.join(os.getcwd(), "data", "templates", "store"),
+                                                         max_templates=config.get("template_store_max", MAX_TEMPLATES),
+                                                         max_bytes=config.get("template_store_bytes", MAX_BYTES))
             self._load_cached_templates()
+        # Templates are partitioned by window size / DPI; with multi-scale matching a missing
+        # template is rescaled from another partition (scale estimated once per geometry)
+        self.template_multiscale = config.get("template_multiscale", TEMPLATE_MULTISCALE)
+        self.scale_attempts = {}        # source partition -> time of the last failed estimation
         
         # OCR Cycle Control (Issue 3)
         self.ocr_disabled_until_cycle_end = False
@@ -147,6 +199,30 @@ class BossDetectionWorker(QThread):
         else:
             self.clahe = None
 
+        # Frame-change detection: static ROI frames reuse the last preprocessing,
+        # template matches and OCR result instead of recomputing them
+        self.change_detector = ChangeDetector() if config.get("change_detection", True) else None
+
+        # Text rows of the processed ROI (projection profiles), recomputed once per frame generation
+        self.row_segmentation = config.get("row_segmentation", True)
+        self.row_boxes = None
+        self.row_boxes_generation = -1
+        self.frame_generation = 0       # Bumped whenever the ROI pixels change
+        self.last_processed = None
+        self.match_cache = {}           # {(key, threshold, shape, data ptr): (template, result)}
+        # Coarse-to-fine matching per key pattern, e.g. {"map:*": 1, "status:*": 0} (0 = full resolution)
+        self.pyramid_levels = PyramidLevels(config.get("template_pyramid", TEMPLATE_PYRAMID))
+        self.pyramid_images = (-1, {})  # (generation, {factor: downsampled processed ROI})
+        # Last match location per (key, geometry version); lookups try that spot before the full ROI
+        self.location_predictor = LocationPredictor()
+        self.template_matcher = MultiTemplateMatcher(self.pyramid_levels, self.location_predictor)
+        self.map_hits_cache = None      # (generation, threshold, templates, hits)
+        self.scroll_match_cache = None  # (generation, match location or None)
+        self.ocr_result_generation = -1
+        self.skipped_work = {"preprocess": 0, "match": 0, "ocr": 0}
+        self.geometry_version = None    # GameContext geometry the caches above were built for
+        self.window_size = None
+
         # Initialize YOLO Model for ROI detection
         self.model = None
         self.detected_roi = None
@@ -166,10 +242,10 @@ class BossDetectionWorker(QThread):
             bundled_model_path = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', 'data', 'weights', 'summon_window.pt'))
             
             if os.path.exists(external_model_path):
-                self.model = YOLO(external_model_path)
+                self.model = get_yolo_model(external_model_path)
                 print(f"YOLO model loaded from EXTERNAL path: {external_model_path}")
             elif os.path.exists(bundled_model_path):
-                self.model = YOLO(bundled_model_path)
+                self.model = get_yolo_model(bundled_model_path)
                 print(f"YOLO model loaded from BUNDLED path: {bundled_model_path}")
             else:
                 print(f"YOLO model not found. Checked:\n - {external_model_path}\n - {bundled_model_path}")
@@ -178,6 +254,7 @@ class BossDetectionWorker(QThread):
 
         # Load Scroll Icon Template (Issue 7: Prioritize user-calibrated version)
         self.scroll_template = None
+        template_dir = None
         try:
             # Priority 1: User-calibrated template in current directory
             user_template_path = os.path.join(os.getcwd(), "data", "templates", "scroll_icon_user.png")
@@ -186,20 +263,23 @@ class BossDetectionWorker(QThread):
             
             if os.path.exists(user_template_path):
                 self.scroll_template = cv2.imread(user_template_path, cv2.IMREAD_COLOR)
+                template_dir = os.path.dirname(user_template_path)
                 print(f"Scroll template loaded from USER CALIBRATION: {user_template_path}")
             elif os.path.exists(template_path):
                 self.scroll_template = cv2.imread(template_path, cv2.IMREAD_COLOR)
+                template_dir = os.path.dirname(template_path)
                 print(f"Scroll template loaded from: {template_path}")
             else:
                 print(f"Scroll template not found at:\\n - {user_template_path}\\n - {template_path}")
         except Exception as e:
             print(f"Failed to load scroll template: {e}")
 
-        # Load Scroll Icon Position
+        # Load Scroll Icon Position, saved next to the template it was calibrated with
+        # (combat_page "Setup Scroll Icon" writes both to cwd/data/templates)
         self.scroll_pos = None
         try:
-            pos_path = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', 'data', 'templates', 'scroll_icon_pos.json'))
-            if os.path.exists(pos_path):
+            pos_path = os.path.join(template_dir, "scroll_icon_pos.json") if template_dir else None
+            if pos_path and os.path.exists(pos_path):
                 import json
                 with open(pos_path, 'r') as f:
                     self.scroll_pos = json.load(f)
@@ -233,16 +313,29 @@ class BossDetectionWorker(QThread):
     def run(self):
         self.status_changed.emit("Worker started")
         
-        # Initialize DXCam (non-threaded, stable)
+        # Initialize capture backend (DXCam grab() mode unless configured otherwise)
         try:
-            self.camera = dxcam.create(output_color="BGR")
-            print("DXCam initialized using grab() mode.")
+            if self.capture_mode in ("hub", "stream"):
+                if self.capture_mode == "hub":
+                    self.capture_hub = CaptureHub.acquire(self.config)
+                else:
+                    self.capture_hub = CaptureHub.stream(self.config, default="dxcam")
+                self.capture_sub = self.capture_hub.subscribe("boss_detection")
+                self.capture_name = f"{self.capture_mode}:{self.capture_hub.source.name}"
+            else:
+                self.frame_source = create_frame_source(self.config, default="dxcam")
+                self.frame_source.open()
+                self.capture_name = self.frame_source.name
+            if self.client_id:
+                self.capture_name = f"{self.client_id}, {self.capture_name}"
+            print(f"Capture initialized using {self.capture_name} backend.")
         except Exception as e:
-            print(f"DXCam init error: {e}")
-            self.status_changed.emit(f"DXCam Error: {e}")
+            print(f"Capture init error: {e}")
+            self.status_changed.emit(f"Capture Error: {e}")
             return
 
-        print("DXCam initialized. Waiting for game window...")
+        print("Capture initialized. Waiting for game window...")
+        self.ocr_executor.start()
 
         while not self.should_stop:
             if self.paused:
@@ -251,33 +344,52 @@ class BossDetectionWorker(QThread):
 
             frame_start = time.time()
 
-            # 0. Ensure Camera is Ready
-            if self.camera is None:
-                try:
-                    # print("DXCam initializing...")
-                    self.camera = dxcam.create(output_color="BGR")
-                except Exception as e:
-                    print(f"DXCam init error: {e}")
-                    time.sleep(1.0)
-                    continue
-
             # 1. Get Game Window Location
-            rect = game_context.get_window_rect()
+            window_frame = None
+            if self.capture_sub is not None:
+                # Full-window frame published by the hub; a static screen publishes nothing,
+                # so after the timeout the tick runs on the last frame
+                window_frame = self.capture_sub.get_or_last(timeout=0.5)
+                if window_frame is None:
+                    continue
+                rect = window_frame.window_rect
+            else:
+                rect = self.frame_source.get_window_rect()
             if not rect:
                 # Window not found yet
                 time.sleep(0.5)
                 # print("Waiting for game window...")
                 continue
+
+            # 1.2 Single full-window grab per tick; ROI, YOLO input and scroll strip are views of it
+            # Grab errors are handled by the CaptureSupervisor (backoff + failover) and show up as None
+            if self.capture_mode == "window":
+                window_frame = self.frame_source.grab_window(rect)
+                if window_frame is None:
+                    time.sleep(0.005)
+                    continue
             
             win_left, win_top, win_right, win_bottom = rect
 
+            # 1.3 Window moved or resized: drop caches tied to the old geometry
+            if window_frame is not None:
+                geometry_version = window_frame.geometry_version
+            else:
+                geometry_version = self.frame_source.geometry_version
+            if geometry_version != self.geometry_version:
+                self._on_geometry_changed(geometry_version, rect)
+            self.frame_id += 1
+
             # 1.5 Dynamic ROI Detection
             now = time.time()
             if self.model and (self.detected_roi is None or now - self.last_roi_update_time > self.ROI_UPDATE_INTERVAL):
                 try:
                     # Capture full game window to find the ROI
-                    full_region = (win_left, win_top, win_right, win_bottom)
-                    full_frame = self.camera.grab(region=full_region)
+                    if window_frame is not None:
+                        full_frame = window_frame.image
+                    else:
+                        full_region = (win_left, win_top, win_right, win_bottom)
+                        full_frame = self.frame_source.grab(full_region)
                     
                     if full_frame is not None:
                         # Run inference
@@ -290,17 +402,22 @@ class BossDetectionWorker(QThread):
                                 best_box = max(boxes, key=lambda x: x.conf[0])
                                 x1, y1, x2, y2 = best_box.xyxy[0].cpu().numpy()
                                 
-                                self.detected_roi = {
+                                new_roi = {
                                     "left": int(x1),
                                     "top": int(y1),
                                     "width": int(x2 - x1),
                                     "height": int(y2 - y1)
                                 }
+                                if new_roi != self.detected_roi:
+                                    self._invalidate_ocr_layout()
+                                    self.location_predictor.forget()
+                                self.detected_roi = new_roi
                                 self.last_roi_update_time = now
+                                self.result_bus.publish("roi", self.detected_roi, self.frame_id, self.geometry_version)
                                 # print(f"ROI updated: {self.detected_roi}")
                 except Exception as e:
                     # Skip ROI update on error, use fallback
-                    # Don't restart camera here since it will be restarted in the main capture loop if needed
+                    # Don't restart capture here since it will be restarted in the main capture loop if needed
                     pass
             
             # Use detected ROI if available, else fallback
@@ -314,50 +431,52 @@ class BossDetectionWorker(QThread):
 
             region = (abs_left, abs_top, abs_right, abs_bottom)
 
-            # 2. Stable capture via grab(region)
-            try:
-                if self.camera is None:
-                    raise Exception("Camera not initialized")
-                frame = self.camera.grab(region=region)
-            except Exception as e:
-                print(f"DXCam grab error: {e}")
-                try:
-                    # Don't delete, just set to None to avoid AttributeError in other threads
-                    if hasattr(self, 'camera'):
-                        self.camera = None
-                    print("DXCam restarting...")
-                    self.camera = dxcam.create(output_color="BGR")
-                except Exception as ee:
-                    print(f"DXCam restart failed: {ee}")
-                    self.camera = None
-                    time.sleep(1.0)
-                continue
+            # 2. Stable capture via grab(region), or a view of this tick's window frame
+            if window_frame is not None:
+                frame = window_frame.crop(current_roi)
+            else:
+                frame = self.frame_source.grab(region)
 
             if frame is None:
                 time.sleep(0.005)
                 continue
+            self.current_roi = current_roi
 
-            # frame is already BGR because we set output_color="BGR"
-            
-            # 3. Convert to grayscale
-            gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-
-            # 4. Optional scaling
-            if SCALE_FACTOR != 1.0:
-                width = int(gray.shape[1] * SCALE_FACTOR)
-                height = int(gray.shape[0] * SCALE_FACTOR)
-                gray = cv2.resize(gray, (width, height), interpolation=cv2.INTER_LINEAR)
-
-            # 5. Preprocessing
-            if ENABLE_CLAHE:
-                processed = self.clahe.apply(gray)
+            # frame is already BGR (every FrameSource returns BGR)
+
+            # 2.5 Change detection: unchanged ROI pixels reuse the previous preprocessing
+            frame_changed = True
+            if self.change_detector is not None:
+                frame_changed = self.change_detector.update(frame)
+
+            if not frame_changed and self.last_processed is not None:
+                processed = self.last_processed
+                self.skipped_work["preprocess"] += 1
             else:
-                processed = cv2.adaptiveThreshold(
-                    gray, 255,
-                    cv2.ADAPTIVE_THRESH_GAUSSIAN_C,
-                    cv2.THRESH_BINARY,
-                    11, 2
-                )
+                # 3. Convert to grayscale
+                gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+
+                # 4. Optional scaling
+                if SCALE_FACTOR != 1.0:
+                    width = int(gray.shape[1] * SCALE_FACTOR)
+                    height = int(gray.shape[0] * SCALE_FACTOR)
+                    gray = cv2.resize(gray, (width, height), interpolation=cv2.INTER_LINEAR)
+
+                # 5. Preprocessing
+                if ENABLE_CLAHE:
+                    processed = self.clahe.apply(gray)
+                else:
+                    processed = cv2.adaptiveThreshold(
+                        gray, 255,
+                        cv2.ADAPTIVE_THRESH_GAUSSIAN_C,
+                        cv2.THRESH_BINARY,
+                        11, 2
+                    )
+
+                self.last_processed = processed
+                self.last_change_frame_id = self.frame_id
+                self.frame_generation += 1
+                self.match_cache.clear()
 
             # 6. Trigger OCR asynchronously
             # OPTIMIZATION: Only run OCR if we are missing templates for selected maps or "Dostępny"
@@ -378,6 +497,9 @@ class BossDetectionWorker(QThread):
                 cached_keys = set(self.dynamic_templates.keys())
                 
             missing_templates = required_templates - cached_keys
+            if missing_templates and self.template_multiscale:
+                # Reuse templates of another window size / DPI before falling back to OCR
+                missing_templates -= self._adapt_templates(missing_templates, processed)
             ocr_needed = len(missing_templates) > 0
             
             # OCR Cycle Control (Issue 3): Disable OCR after entering map
@@ -400,12 +522,28 @@ class BossDetectionWorker(QThread):
                     ocr_needed = True
 
             if ocr_needed and (now - self.last_ocr_time >= OCR_INTERVAL):
-                threading.Thread(
-                    target=self._run_ocr,
-                    args=(processed.copy(), now),
-                    daemon=True
-                ).start()
+                if self.ocr_result_generation == self.frame_generation:
+                    # The latest OCR result was read from these exact pixels; treat it as fresh
+                    self.skipped_work["ocr"] += 1
+                else:
+                    # processed is never written after this point, so the executor can read it without a copy
+                    self.ocr_executor.submit(processed, (now, self.frame_generation, self.frame_id,
+                                                         self.geometry_version, dict(current_roi)))
                 self.last_ocr_time = now
+
+            ocr_job = self.ocr_executor.poll()
+            if ocr_job is not None:
+                self._apply_ocr_result(ocr_job)
+
+            # 6.4 OCR result for this frame: None if too old, boxes shifted if the ROI moved since
+            ocr_entry = self.result_bus.latest(
+                "ocr", self.frame_id, max_age_frames=self.ocr_max_age_frames,
+                unchanged_since=self.last_change_frame_id, geometry_version=self.geometry_version,
+                roi=current_roi, scale=SCALE_FACTOR)
+            with self.ocr_lock:
+                self.latest_ocr_result = ocr_entry.value if ocr_entry is not None else None
+                # Same source frame = same texts, so map matches are memoized on it
+                self.latest_ocr_version = ocr_entry.frame_id if ocr_entry is not None else None
             
             # 6.5 State Machine Logic
             if self.latest_ocr_result and self.map_priority:
@@ -420,6 +558,9 @@ class BossDetectionWorker(QThread):
 
                     found_target = False
                     found_priority_index = None
+
+                    # All cached map templates scored in one pass over the text rows
+                    map_hits = self._match_map_templates(processed, threshold=0.85)
                     
                     # Iterate through priority list in order
                     for idx, priority_map in enumerate(self.map_priority):
@@ -430,7 +571,7 @@ class BossDetectionWorker(QThread):
                         # --- FAST PATH: Template Matching ---
                         # Check if we have a cached template for this map
                         template_key = f"map:{priority_map}"
-                        rect, conf = self._find_with_template(processed, template_key, threshold=0.85)
+                        rect, conf = map_hits.get(priority_map, (None, 0.0))
                         
                         if rect:
                             # Map Priority Verification (Issue 6): Check if any higher-priority maps are visible
@@ -440,8 +581,7 @@ class BossDetectionWorker(QThread):
                                 if higher_priority_map in self.checked_maps:
                                     continue  # Already checked, skip
                                 
-                                higher_key = f"map:{higher_priority_map}"
-                                higher_rect, higher_conf = self._find_with_template(processed, higher_key, threshold=0.85)
+                                higher_rect, higher_conf = map_hits.get(higher_priority_map, (None, 0.0))
                                 
                                 if higher_rect:
                                     print(f"Found higher-priority map '{higher_priority_map}' (priority {higher_idx}), skipping '{priority_map}' (priority {idx})")
@@ -486,79 +626,65 @@ class BossDetectionWorker(QThread):
                             break
 
                         # --- SLOW PATH: OCR ---
-                        for box, text, conf in self.latest_ocr_result:
-                            ratio = Levenshtein.ratio(text.lower(), priority_map.lower())
-                            
-                            if ratio > 0.6:
-                                # Improved version/number matching
-                                import re
-                                text_nums = re.findall(r'\d+', text)
-                                map_nums = re.findall(r'\d+', priority_map)
-                                
-                                if map_nums:
-                                    if not text_nums: continue
-                                    if text_nums[-1] != map_nums[-1]: continue
-                                
-                                # Found a valid match
-                                if found_priority_index is None or idx < found_priority_index:
-                                    found_priority_index = idx
-                                    found_target = True
-                                    self.last_target_found_time = time.time()
-                                    print(f"Target map '{priority_map}' found at priority {idx} (matched OCR: '{text}')")
+                        for box, text, conf, ratio in self.map_matcher.find(priority_map, self.latest_ocr_result,
+                                                                             self.latest_ocr_version, 0.6):
+                            # Found a valid match (trigram candidates, version numbers already agree)
+                            if found_priority_index is None or idx < found_priority_index:
+                                found_priority_index = idx
+                                found_target = True
+                                self.last_target_found_time = time.time()
+                                print(f"Target map '{priority_map}' found at priority {idx} (matched OCR: '{text}')")
                                     
-                                    # --- CACHE UPDATE ---
-                                    # Extract and save template
-                                    try:
-                                        # box is [[x1, y1], [x2, y2], [x3, y3], [x4, y4]]
-                                        xs = [p[0] for p in box]
-                                        ys = [p[1] for p in box]
-                                        min_x, max_x = int(min(xs)), int(max(xs))
-                                        min_y, max_y = int(min(ys)), int(max(ys))
+                                # --- CACHE UPDATE ---
+                                # Extract and save template
+                                try:
+                                    # box is [[x1, y1], [x2, y2], [x3, y3], [x4, y4]]
+                                    xs = [p[0] for p in box]
+                                    ys = [p[1] for p in box]
+                                    min_x, max_x = int(min(xs)), int(max(xs))
+                                    min_y, max_y = int(min(ys)), int(max(ys))
                                         
-                                        # Add some padding
-                                        pad = 2
-                                        min_x = max(0, min_x - pad)
-                                        min_y = max(0, min_y - pad)
-                                        max_x = min(processed.shape[1], max_x + pad)
-                                        max_y = min(processed.shape[0], max_y + pad)
+                                    # Add some padding
+                                    pad = 2
+                                    min_x = max(0, min_x - pad)
+                                    min_y = max(0, min_y - pad)
+                                    max_x = min(processed.shape[1], max_x + pad)
+                                    max_y = min(processed.shape[0], max_y + pad)
                                         
-                                        template_img = processed[min_y:max_y, min_x:max_x].copy()
-                                        with self.template_lock:
-                                            self.dynamic_templates[template_key] = template_img
-                                        # print(f"Cached template for {priority_map}")
-                                    except Exception as e:
-                                        print(f"Failed to cache template: {e}")
-                                    
-                                    except Exception as e:
-                                        print(f"Failed to cache template: {e}")
+                                    template_img = processed[min_y:max_y, min_x:max_x].copy()
+                                    with self.template_lock:
+                                        self.dynamic_templates.put(template_key, template_img, self.window_size)
+                                    # print(f"Cached template for {priority_map}")
+                                except Exception as e:
+                                    print(f"Failed to cache template: {e}")
                                     
-                                    try:
-                                        # Click logic
-                                        center_x = int(np.mean([p[0] for p in box]))
-                                        center_y = int(np.mean([p[1] for p in box]))
+                                try:
+                                    # Click logic
+                                    center_x = int(np.mean([p[0] for p in box]))
+                                    center_y = int(np.mean([p[1] for p in box]))
                                         
-                                        if SCALE_FACTOR != 1.0:
-                                            center_x = int(center_x / SCALE_FACTOR)
-                                            center_y = int(center_y / SCALE_FACTOR)
+                                    if SCALE_FACTOR != 1.0:
+                                        center_x = int(center_x / SCALE_FACTOR)
+                                        center_y = int(center_y / SCALE_FACTOR)
                                             
-                                        click_x = region[0] + center_x
-                                        click_y = region[1] + center_y
+                                    click_x = region[0] + center_x
+                                    click_y = region[1] + center_y
                                         
-                                        print(f"Clicking on map '{priority_map}' at ({click_x}, {click_y})")
-                                        pyautogui.moveTo(click_x, click_y)
-                                        time.sleep(np.random.uniform(0.02, 0.03))
-                                        pyautogui.click()
+                                    print(f"Clicking on map '{priority_map}' at ({click_x}, {click_y})")
+                                    pyautogui.moveTo(click_x, click_y)
+                                    time.sleep(np.random.uniform(0.02, 0.03))
+                                    pyautogui.click()
                                         
-                                        # Update state
-                                        self.checked_maps[priority_map] = now
-                                        self.current_map_name = priority_map
-                                        self.state = "WAITING_FOR_BOSS_LIST"
-                                        self.state_timer = now
-                                        self.current_channel = 1
-                                        self.is_initial_check = True
-                                    except Exception as e:
-                                        print(f"Click error: {e}")
-                                break
+                                    # Update state
+                                    self.checked_maps[priority_map] = now
+                                    self.current_map_name = priority_map
+                                    self.state = "WAITING_FOR_BOSS_LIST"
+                                    self.state_timer = now
+                                    self.current_channel = 1
+                                    self.is_initial_check = True
+                                except Exception as e:
+                                    print(f"Click error: {e}")
+                            break
                         
                         if found_target:
                             break
@@ -566,66 +692,59 @@ class BossDetectionWorker(QThread):
                     # Scroll logic (only if we didn't find a target to click)
                     if not found_target and (now - self.last_target_found_time > 2.0) and self.scroll_template is not None:
                         try:
-                            search_img = frame
-                            res = cv2.matchTemplate(search_img, self.scroll_template, cv2.TM_CCOEFF_NORMED)
-                            threshold = 0.7
-                            locations = np.where(res >= threshold)
-                            
-                            if len(locations[0]) > 0:
-                                matches = list(zip(*locations[::-1]))
-                                if matches:
-                                    leftmost_match = min(matches, key=lambda loc: loc[0])
-                                    max_loc = leftmost_match
-                                    
-                                    local_x = max_loc[0] + self.scroll_template.shape[1] // 2
-                                    local_y = max_loc[1] + self.scroll_template.shape[0] // 2
-                                    icon_x = region[0] + local_x
-                                    icon_y = region[1] + local_y
+                            max_loc = self._find_scroll_icon(frame)
+                            if max_loc is not None:
+                                local_x = max_loc[0] + self.scroll_template.shape[1] // 2
+                                local_y = max_loc[1] + self.scroll_template.shape[0] // 2
+                                icon_x = region[0] + local_x
+                                icon_y = region[1] + local_y
                                     
-                                    # Check if scrollbar is at the bottom or top of the ROI
-                                    # region is (abs_left, abs_top, abs_right, abs_bottom)
-                                    # local_y is relative to region top
-                                    roi_height = region[3] - region[1]
+                                # Check if scrollbar is at the bottom or top of the ROI
+                                # region is (abs_left, abs_top, abs_right, abs_bottom)
+                                # local_y is relative to region top
+                                roi_height = region[3] - region[1]
                                     
-                                    is_at_bottom = local_y > (roi_height * 0.9)
-                                    is_at_top = local_y < (roi_height * 0.1)
+                                is_at_bottom = local_y > (roi_height * 0.9)
+                                is_at_top = local_y < (roi_height * 0.1)
                                     
-                                    if is_at_bottom and self.scroll_direction == 1:
-                                        print("Scrollbar at bottom, reversing to UP.")
-                                        self.scroll_direction = -1
-                                        self.scroll_count = 0
-                                    elif is_at_top and self.scroll_direction == -1:
-                                        print("Scrollbar at top, reversing to DOWN.")
-                                        self.scroll_direction = 1
-                                        self.scroll_count = 0
+                                if is_at_bottom and self.scroll_direction == 1:
+                                    print("Scrollbar at bottom, reversing to UP.")
+                                    self.scroll_direction = -1
+                                    self.scroll_count = 0
+                                elif is_at_top and self.scroll_direction == -1:
+                                    print("Scrollbar at top, reversing to DOWN.")
+                                    self.scroll_direction = 1
+                                    self.scroll_count = 0
                                     
-                                    elif now - self.last_scroll_time > 1.0:
-                                        # Remove the arbitrary 8-scroll reversal if we rely on visual detection
-                                        # But keep a failsafe if needed, or just rely on boundaries.
-                                        # For now, let's trust the visual boundaries more.
+                                elif now - self.last_scroll_time > 1.0:
+                                    # Remove the arbitrary 8-scroll reversal if we rely on visual detection
+                                    # But keep a failsafe if needed, or just rely on boundaries.
+                                    # For now, let's trust the visual boundaries more.
                                         
-                                        scroll_distance = 35 * self.scroll_direction
+                                    scroll_distance = 35 * self.scroll_direction
                                         
-                                        # Double check boundaries before scrolling
-                                        if is_at_bottom and scroll_distance > 0:
-                                            self.scroll_direction = -1
-                                            scroll_distance = -35
-                                            print("Boundary check: Bottom reached, forcing UP.")
-                                        elif is_at_top and scroll_distance < 0:
-                                            self.scroll_direction = 1
-                                            scroll_distance = 35
-                                            print("Boundary check: Top reached, forcing DOWN.")
+                                    # Double check boundaries before scrolling
+                                    if is_at_bottom and scroll_distance > 0:
+                                        self.scroll_direction = -1
+                                        scroll_distance = -35
+                                        print("Boundary check: Bottom reached, forcing UP.")
+                                    elif is_at_top and scroll_distance < 0:
+                                        self.scroll_direction = 1
+                                        scroll_distance = 35
+                                        print("Boundary check: Top reached, forcing DOWN.")
                                         
-                                        print(f"Scrolling... ({scroll_distance})")
-                                        pyautogui.moveTo(icon_x, icon_y)
-                                        pyautogui.dragRel(0, scroll_distance, duration=0.5, button='left')
-                                        self.last_scroll_time = now
-                                        self.last_scroll_finish_time = time.time()
-                                        self.latest_ocr_result = None
-                                        self.scroll_count += 1
-                        except Exception as e:
-                            print(f"Scroll logic error: {e}")
-
+                                    print(f"Scrolling... ({scroll_distance})")
+                                    pyautogui.moveTo(icon_x, icon_y)
+                                    pyautogui.dragRel(0, scroll_distance, duration=0.5, button='left')
+                                    self.last_scroll_time = now
+                                    self.last_scroll_finish_time = time.time()
+                                    self.latest_ocr_result = None
+                                    self.result_bus.clear("ocr")
+                                    self._invalidate_ocr_layout()
+                                    # Rows moved: the remembered spots now hold neighbouring maps
+                                    self.location_predictor.forget()
+                                    self.ocr_result_generation = -1
+                                    self.scroll_count += 1
                         except Exception as e:
                             print(f"Scroll logic error: {e}")
 
@@ -664,31 +783,31 @@ class BossDetectionWorker(QThread):
                             
                     # 2. OCR Match (if template failed)
                     if not found_target and self.latest_ocr_result:
-                        for box, text, conf in self.latest_ocr_result:
-                            # Strict match for reselection
-                            if Levenshtein.ratio(text.lower(), priority_map.lower()) > 0.8:
-                                # Click logic
-                                xs = [p[0] for p in box]
-                                ys = [p[1] for p in box]
-                                center_x = int(np.mean(xs))
-                                center_y = int(np.mean(ys))
-                                if SCALE_FACTOR != 1.0:
-                                    center_x = int(center_x / SCALE_FACTOR)
-                                    center_y = int(center_y / SCALE_FACTOR)
-                                click_x = region[0] + center_x
-                                click_y = region[1] + center_y
+                        # Strict match for reselection
+                        for box, text, conf, ratio in self.map_matcher.find(priority_map, self.latest_ocr_result,
+                                                                             self.latest_ocr_version, 0.8):
+                            # Click logic
+                            xs = [p[0] for p in box]
+                            ys = [p[1] for p in box]
+                            center_x = int(np.mean(xs))
+                            center_y = int(np.mean(ys))
+                            if SCALE_FACTOR != 1.0:
+                                center_x = int(center_x / SCALE_FACTOR)
+                                center_y = int(center_y / SCALE_FACTOR)
+                            click_x = region[0] + center_x
+                            click_y = region[1] + center_y
                                 
-                                print(f"Reselecting map '{priority_map}' via OCR")
-                                try:
-                                    pyautogui.moveTo(click_x, click_y)
-                                    time.sleep(np.random.uniform(0.02, 0.03))
-                                    pyautogui.click()
-                                    self.state = "WAITING_FOR_BOSS_LIST"
-                                    self.state_timer = time.time()
-                                    found_target = True
-                                except Exception as e:
-                                    print(f"Click error: {e}")
-                                break
+                            print(f"Reselecting map '{priority_map}' via OCR")
+                            try:
+                                pyautogui.moveTo(click_x, click_y)
+                                time.sleep(np.random.uniform(0.02, 0.03))
+                                pyautogui.click()
+                                self.state = "WAITING_FOR_BOSS_LIST"
+                                self.state_timer = time.time()
+                                found_target = True
+                            except Exception as e:
+                                print(f"Click error: {e}")
+                            break
                     
                     # Timeout
                     if not found_target and (time.time() - self.state_timer > 5.0):
@@ -706,55 +825,29 @@ class BossDetectionWorker(QThread):
                 elif self.state == "CHECKING_BOSSES":
                     
                     # --- FAST PATH: Template Matching for "Dostępny" ---
+                    # Every hit in the frame is verified with one batched recognition call
                     template_key = "status:dostepny"
-                    rect, conf = self._find_with_template(processed, template_key, threshold=0.90)  # Strict threshold
-                    
-                    # Strict verification: Ensure it's actually "Dostępny"
-                    if rect:
-                        x, y, w, h = rect
-                        
-                        # Blacklist Check
-                        if self._is_blacklisted(x, y, w, h):
-                            print(f"Skipping blacklisted boss at ({x}, {y})")
-                            rect = None
-                        else:
-                            # Extract text from detected region for verification
-                            text_roi = processed[y:y+h, x:x+w]
-                        
-                        import re
-                        is_valid = False
-                        try:
-                            ocr_check, _ = self.ocr(text_roi)
-                            if ocr_check and len(ocr_check) > 0:
-                                detected_text = ocr_check[0][1].lower().strip()
-                                
-                                # Reject timers (digits + m/s/:)
-                                if re.search(r'\d+[ms:]', detected_text):
-                                    print(f"Rejected timer text: {detected_text}")
-                                    rect = None
-                                # Strict verification: Must be "Dostępny"
-                                # We do NOT use a rejection list anymore, just strict positive matching.
-                                
-                                # 1. Exact match (ignoring case/whitespace)
-                                if detected_text == "dostępny":
-                                    is_valid = True
-                                    
-                                # 2. High Levenshtein ratio (> 0.85)
-                                elif Levenshtein.ratio(detected_text, "dostępny") > 0.85:
-                                    is_valid = True
-                                    
-                                # 3. Contains "dostępny" (e.g. "status: dostępny")
-                                elif "dostępny" in detected_text:
-                                    is_valid = True
-                                    
-                                else:
-                                    print(f"Rejected text (not 'Dostępny'): {detected_text}")
-                                    rect = None
-                        except:
-                            # If OCR fails, reject the match for safety
-                            rect = None
-                        
+                    hits = self._find_all_with_template(processed, template_key, threshold=0.90)  # Strict threshold
+                    rect, conf = None, 0.0
+
+                    if hits:
+                        candidates = []
+                        for hit_rect, hit_conf in hits:
+                            # Blacklist Check
+                            if self._is_blacklisted(*hit_rect):
+                                print(f"Skipping blacklisted boss at ({hit_rect[0]}, {hit_rect[1]})")
+                            else:
+                                candidates.append((hit_rect, hit_conf))
+
+                        # Strict verification: Ensure it's actually "Dostępny"
+                        verified = self._verify_status_crops(processed, [r for r, _ in candidates])
+                        for (hit_rect, hit_conf), is_valid in zip(candidates, verified):
+                            if is_valid:
+                                rect, conf = hit_rect, hit_conf
+                                break
+
                         if rect:  # Only proceed if verification passed
+                            x, y, w, h = rect
                             # Calculate click position (Right edge + 20px)
                             target_x = int(x + w + 20)
                             target_y = int(y + h // 2)
@@ -830,7 +923,7 @@ class BossDetectionWorker(QThread):
                                         
                                         template_img = processed[t_min_y:t_max_y, t_min_x:t_max_x].copy()
                                         with self.template_lock:
-                                            self.dynamic_templates[template_key] = template_img
+                                            self.dynamic_templates.put(template_key, template_img, self.window_size)
                                         # print("Cached template for 'Dostępny'")
                                     except Exception as e:
                                         print(f"Failed to cache 'Dostępny' template: {e}")
@@ -1077,6 +1170,8 @@ class BossDetectionWorker(QThread):
                         
                         # Wait for channel switch (usually takes a moment)
                         time.sleep(3.0)
+                        # The summon list may come back reset or scrolled
+                        self.location_predictor.forget()
                         
                         print(f"Switched to channel {self.current_channel}")
                         
@@ -1111,11 +1206,56 @@ class BossDetectionWorker(QThread):
                     if is_stale:
                         status_text += " [Results Stale]"
                 else:
-                    status_text = f"OCR: Active ({self.last_ocr_fps:.1f} FPS)"
+                    ocr_stats = self.ocr_executor.metrics()
+                    status_text = (f"OCR: Active ({self.last_ocr_fps:.1f} FPS, p50/p95 "
+                                   f"{ocr_stats['p50_ms']:.0f}/{ocr_stats['p95_ms']:.0f}ms, "
+                                   f"q{ocr_stats['queue_depth']}, dropped {ocr_stats['dropped']}, "
+                                   f"age {ocr_stats['age_p50_ms']:.0f}ms)")
+                    if self.ocr_process:
+                        status_text += f" [process, restarts {ocr_stats['restarts']}]"
+                    if self.layout_ocr is not None:
+                        layout_stats = self.layout_ocr.stats()
+                        status_text += f" rec-only {layout_stats['rec_only_rate'] * 100:.0f}%"
+                        if "row_reuse_rate" in layout_stats:
+                            status_text += f" rows reused {layout_stats['row_reuse_rate'] * 100:.0f}%"
+                    if self.ocr_cache is not None:
+                        status_text += (f" cache {self.ocr_cache.hit_rate * 100:.0f}%, "
+                                        f"saved {self.ocr_cache.saved_ms / 1000.0:.1f}s")
+                    if self.verify_cache is not None and self.verify_cache.hits + self.verify_cache.misses:
+                        status_text += f" verify {self.verify_cache.hit_rate * 100:.0f}%"
                 
                 cv2.putText(display_frame, status_text,
                             (10, 60), cv2.FONT_HERSHEY_SIMPLEX, 0.7, status_color, 2)
 
+                if self.capture_sub is not None:
+                    capture_text = f"Hub: {self.capture_sub.received} frames, {self.capture_sub.dropped} dropped"
+                    fps = self.capture_hub.fps_stats()
+                    if fps["target_fps"]:
+                        capture_text += f", {fps['achieved_fps']:.1f}/{fps['target_fps']:.0f} FPS"
+                    cv2.putText(display_frame, capture_text,
+                                (10, 85), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (200, 200, 200), 1)
+
+                source = self.capture_hub.source if self.capture_hub is not None else self.frame_source
+                if hasattr(source, "health"):
+                    health = source.health()
+                    if health["reinit_count"] or health["failover_count"]:
+                        health_text = (f"Capture: {health['backend']} | reinit {health['reinit_count']}, "
+                                       f"failover {health['failover_count']}")
+                        if health["backoff"]:
+                            health_text += f", backoff {health['backoff']:.1f}s"
+                        cv2.putText(display_frame, health_text,
+                                    (10, 125), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0, 165, 255), 1)
+
+                if self.change_detector is not None:
+                    skip_text = (f"Static: {self.change_detector.hit_rate * 100:.0f}% | skipped "
+                                 f"prep {self.skipped_work['preprocess']}, match {self.skipped_work['match']}, "
+                                 f"OCR {self.skipped_work['ocr']} | predicted "
+                                 f"{self.location_predictor.hit_rate * 100:.0f}%, "
+                                 f"saved {self.location_predictor.saved_px / 1e6:.1f}M px | "
+                                 f"templates {self.dynamic_templates.partition} ({len(self.dynamic_templates)})")
+                    cv2.putText(display_frame, skip_text,
+                                (10, 105), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (200, 200, 200), 1)
+
                 # Draw OCR results
                 with self.ocr_lock:
                     if self.latest_ocr_result:
@@ -1138,7 +1278,7 @@ class BossDetectionWorker(QThread):
                 with self.template_lock:
                     y_offset = display_frame.shape[0] - 60
                     x_offset = 10
-                    for key, tmpl in self.dynamic_templates.items():
+                    for key, tmpl in self.dynamic_templates.loaded_items():
                         try:
                             # Resize for thumbnail
                             h, w = tmpl.shape[:2]
@@ -1160,65 +1300,124 @@ class BossDetectionWorker(QThread):
                         except:
                             pass
 
-                cv2.imshow("OCR Live Preview (DXCam)", display_frame)
+                cv2.imshow(f"OCR Live Preview ({self.capture_name})", display_frame)
                 
                 if cv2.waitKey(1) & 0xFF == ord('q'):
                     break
             else:
                 # If preview disabled, sleep briefly to prevent CPU starvation
-                # This allows the OCR thread and DXCam background thread to run smoothly
+                # This allows the OCR thread and capture backend to run smoothly
                 time.sleep(0.01)
 
         self.status_changed.emit("Worker stopped")
-        if getattr(self, 'camera', None):
-            try:
-                self.camera.stop()
-            except:
-                pass
-            self.camera = None
+        self.ocr_executor.shutdown()
+        if self.capture_hub is not None:
+            self.capture_sub.close()
+            self.capture_hub.release()
+            self.capture_hub = None
+            self.capture_sub = None
+        if self.frame_source is not None:
+            self.frame_source.close()
         cv2.destroyAllWindows()
 
-    def _run_ocr(self, img, timestamp):
-        ocr_start = time.time()
-        try:
-            result, _ = self.ocr(img)
-        except Exception as e:
-            print(f"OCR error: {e}")
-            return
+    def _on_geometry_changed(self, version, rect):
+        """Invalidate ROI-derived caches after the game window geometry changed."""
+        self.geometry_version = version
+        size = (rect[2] - rect[0], rect[3] - rect[1])
+        if size != self.window_size:
+            # ROI coordinates are window-relative, so they only go stale on a resize
+            if self.window_size is not None:
+                print(f"Game window resized {self.window_size} -> {size}, re-detecting ROI")
+            self.window_size = size
+            self.detected_roi = None
+        partition = partition_key(size, game_contexts.get(self.client_id).dpi)
+        if partition != self.dynamic_templates.partition:
+            with self.template_lock:
+                self.dynamic_templates.set_partition(partition)
+            self.scale_attempts.clear()
+            print(f"Template partition {partition}: {len(self.dynamic_templates)} templates")
+        if self.change_detector is not None:
+            self.change_detector.reset()
+        self._invalidate_ocr_layout("all")
+        if self.verify_cache is not None:
+            self.verify_cache.invalidate()
+        self.last_processed = None
+        self.match_cache.clear()
+        self.map_hits_cache = None
+        # Locations of the old geometry version can never be looked up again
+        self.location_predictor.forget()
+        self.scroll_match_cache = None
+        self.ocr_result_generation = -1
 
-        elapsed = time.time() - ocr_start
-        ocr_fps = 1.0 / max(0.00001, elapsed)
-        ocr_ms = elapsed * 1000.0
+    def _invalidate_ocr_layout(self, scope="layout"):
+        """Cached text layout is stale (ROI moved, list scrolled); "all" also drops cached OCR results."""
+        if self.layout_ocr is not None:
+            self.layout_ocr.invalidate()
+        if scope == "all" and self.ocr_cache is not None:
+            self.ocr_cache.invalidate()
+        if self.ocr_process:
+            self.ocr_executor.invalidate(scope)
 
-        if result:
-            # print(f"\n=== OCR Results ({ocr_fps:.2f} FPS, {ocr_ms:.0f}ms) ===")
-            for box, text, conf in result:
-                # print(f"  [{int(box[0][0])},{int(box[0][1])}] \"{text}\" (conf: {float(conf):.3f})")
-                pass
-        else:
-            # print(f"OCR: No text found ({ocr_fps:.2f} FPS, {ocr_ms:.0f}ms)")
-            pass
+    def _scroll_strip(self, frame):
+        """
+        View of the ROI column holding the scroll icon, based on the calibrated
+        scroll position. Returns (view, x_offset); the whole ROI if uncalibrated.
+        """
+        if not self.scroll_pos:
+            return frame, 0
+        t_h, t_w = self.scroll_template.shape[:2]
+        x1 = max(0, int(self.scroll_pos["x"]) - SCROLL_STRIP_MARGIN)
+        x2 = min(frame.shape[1], int(self.scroll_pos["x"] + self.scroll_pos["w"]) + SCROLL_STRIP_MARGIN)
+        if x2 - x1 < t_w or frame.shape[0] < t_h:
+            return frame, 0
+        return frame[:, x1:x2], x1
 
-        self.last_ocr_fps = ocr_fps
+    def _match_scroll_icon(self, search_img, x_offset):
+        """Leftmost scroll-icon match (x + x_offset, y) in search_img, or None."""
+        res = cv2.matchTemplate(search_img, self.scroll_template, cv2.TM_CCOEFF_NORMED)
+        threshold = 0.7
+        locations = np.where(res >= threshold)
+        if len(locations[0]) == 0:
+            return None
+        # Leftmost match
+        idx = int(np.argmin(locations[1]))
+        return (x_offset + int(locations[1][idx]), int(locations[0][idx]))
+
+    def _find_scroll_icon(self, frame):
+        """Leftmost scroll-icon match (x, y) in ROI coordinates or None, memoized per frame generation."""
+        if self.scroll_match_cache is not None and self.scroll_match_cache[0] == self.frame_generation:
+            self.skipped_work["match"] += 1
+            return self.scroll_match_cache[1]
+
+        search_img, strip_x = self._scroll_strip(frame)
+        match = self._match_scroll_icon(search_img, strip_x)
+        if match is None and search_img is not frame:
+            # Icon outside the calibrated column (ROI re-detected, recalibrated): search the whole ROI
+            match = self._match_scroll_icon(frame, 0)
+
+        self.scroll_match_cache = (self.frame_generation, match)
+        return match
+
+    def _apply_ocr_result(self, job):
+        """Publish a finished OcrExecutor job on the result bus (worker thread)."""
+        timestamp, generation, frame_id, geometry_version, roi = job.tag
+        ocr_ms = job.run_ms
+        self.last_ocr_fps = 1000.0 / max(0.01, ocr_ms)
         self.last_ocr_ms = ocr_ms
 
-        with self.ocr_lock:
-            if timestamp > self.last_scroll_finish_time:
-                self.latest_ocr_result = result
-            else:
-                # print("Discarding stale OCR result from before scroll")
-                pass
+        if timestamp > self.last_scroll_finish_time:
+            self.result_bus.publish("ocr", job.result, frame_id, geometry_version, roi)
+            self.ocr_result_generation = generation
+        else:
+            # print("Discarding stale OCR result from before scroll")
+            pass
 
     def stop(self):
         # Save templates before stopping (Issue 8)
         self._save_cached_templates()
         
+        # The capture backend is closed by run() once the loop exits
         self.should_stop = True
-        if getattr(self, 'camera', None):
-            try:
-                self.camera.stop()
-            except:
-                pass
         
         # Release spacebar if held
         if self.space_held:
@@ -1252,54 +1451,247 @@ class BossDetectionWorker(QThread):
                 return None, 0.0
             template = self.dynamic_templates[template_key]
 
+        # Same pixels (frame generation) and same template -> same answer
+        cache_key = (template_key, threshold, image.shape, image.__array_interface__["data"][0])
+        cached = self.match_cache.get(cache_key)
+        if cached is not None and cached[0] is template:
+            self.skipped_work["match"] += 1
+            return cached[1]
+        result = self._match_template(image, template, threshold, template_key)
+        self.match_cache[cache_key] = (template, result)
+        if result[0] is not None:
+            self.dynamic_templates.record_hit(template_key, result[1])
+        if image is self.last_processed:
+            # Full-ROI matches are ROI-relative like OCR boxes
+            self.result_bus.publish(f"template:{template_key}", result, self.frame_id,
+                                    self.geometry_version, self.current_roi)
+        return result
+
+    def _find_all_with_template(self, image, template_key, threshold=0.8, max_hits=MAX_TEMPLATE_HITS):
+        """
+        All non-overlapping matches of a cached template, best first.
+        Returns [((x, y, w, h), confidence), ...] (empty if none reach threshold).
+        """
+        with self.template_lock:
+            template = self.dynamic_templates.get(template_key)
+        if template is None:
+            return []
+        search_img = image
+        if len(template.shape) == 2 and len(image.shape) == 3:
+            search_img = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+
+        h, w = template.shape[:2]
+        hits = []
+        # Only the bands around text rows are searched; the whole image if segmentation found none
+        for y0, y1 in self._row_bands(image, h) or [(0, image.shape[0])]:
+            try:
+                res = cv2.matchTemplate(search_img[y0:y1], template, cv2.TM_SQDIFF_NORMED)
+            except Exception as e:
+                continue
+            while len(hits) < max_hits:
+                min_val, _, min_loc, _ = cv2.minMaxLoc(res)
+                if 1.0 - min_val < threshold:
+                    break
+                x, y = min_loc
+                hits.append(((x, y + y0, w, h), 1.0 - min_val))
+                # Suppress this match so the next minimum is a different row
+                res[max(0, y - h // 2):y + h // 2 + 1, max(0, x - w // 2):x + w // 2 + 1] = 1.0
+        hits.sort(key=lambda hit: hit[1], reverse=True)
+        return hits[:max_hits]
+
+    def _match_map_templates(self, image, threshold=0.85):
+        """
+        {map name: ((x, y, w, h), confidence)} for every unchecked priority map whose
+        cached template is visible, from one MultiTemplateMatcher pass (memoized per frame generation).
+        """
+        with self.template_lock:
+            templates = {f"map:{m}": self.dynamic_templates[f"map:{m}"] for m in self.map_priority
+                         if m not in self.checked_maps and f"map:{m}" in self.dynamic_templates}
+        identity = tuple((key, id(t)) for key, t in templates.items())
+        cached = self.map_hits_cache
+        if cached is not None and cached[:3] == (self.frame_generation, threshold, identity) \
+                and image is self.last_processed:
+            self.skipped_work["match"] += 1
+            return cached[3]
+
+        hits = self.template_matcher.match(image, templates, threshold, self._segment_rows(image),
+                                           self.geometry_version)
+        map_hits = {key[len("map:"):]: (rect, conf) for key, rect, conf in hits}
+        for key, _, conf in hits:
+            self.dynamic_templates.record_hit(key, conf)
+        if image is self.last_processed:
+            self.map_hits_cache = (self.frame_generation, threshold, identity, map_hits)
+            for key, rect, conf in hits:
+                self.result_bus.publish(f"template:{key}", (rect, conf), self.frame_id,
+                                        self.geometry_version, self.current_roi)
+        return map_hits
+
+    def _pyramid_cache(self, image):
+        """Downsampled copies of the processed ROI shared by all lookups of one frame generation."""
+        if image is not self.last_processed:
+            return None
+        if self.pyramid_images[0] != self.frame_generation:
+            self.pyramid_images = (self.frame_generation, {})
+        return self.pyramid_images[1]
+
+    def _segment_rows(self, image):
+        """Row boxes of the processed ROI, cached per frame generation. None if not applicable."""
+        if not self.row_segmentation or image is not self.last_processed:
+            return None
+        if self.row_boxes_generation != self.frame_generation:
+            self.row_boxes = segment_rows(image)
+            self.row_boxes_generation = self.frame_generation
+        return self.row_boxes
+
+    def _row_bands(self, image, template_h):
+        """Merged (y0, y1) bands around segmented rows, each tall enough for a template_h match."""
+        rows = self._segment_rows(image)
+        if not rows:
+            return None
+        return row_bands(rows, template_h, image.shape[0])
+
+    def _verify_status_crops(self, image, rects):
+        """Recognize every candidate "Dostępny" crop in one batch. Returns [bool] per rect."""
+        if not rects:
+            return []
+        crops = [image[y:y+h, x:x+w] for x, y, w, h in rects]
+        return verify_crops(self.ocr, crops, self._is_available_text, self.verify_cache)
+
+    def _is_available_text(self, text):
+        """Strict positive match for "Dostępny"; timers are rejected."""
+        import re
+        detected_text = text.lower().strip()
+        if not detected_text:
+            return False
+
+        # Reject timers (digits + m/s/:)
+        if re.search(r'\d+[ms:]', detected_text):
+            print(f"Rejected timer text: {detected_text}")
+            return False
+
+        # 1. Exact match (ignoring case/whitespace)
+        if detected_text == "dostępny":
+            return True
+        # 2. High Levenshtein ratio (> 0.85)
+        if Levenshtein.ratio(detected_text, "dostępny") > 0.85:
+            return True
+        # 3. Contains "dostępny" (e.g. "status: dostępny")
+        if "dostępny" in detected_text:
+            return True
+
+        print(f"Rejected text (not 'Dostępny'): {detected_text}")
+        return False
+
+    def _match_template(self, image, template, threshold, template_key=None):
         try:
             # Ensure image is grayscale if template is grayscale
             if len(template.shape) == 2 and len(image.shape) == 3:
                 search_img = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+                pyramid_cache = None
             else:
                 search_img = image
+                pyramid_cache = self._pyramid_cache(image)
 
-            # Template matching - SQDIFF_NORMED is often faster and robust
-            res = cv2.matchTemplate(search_img, template, cv2.TM_SQDIFF_NORMED)
-            min_val, max_val, min_loc, max_loc = cv2.minMaxLoc(res)
+            # Template matching - SQDIFF_NORMED is often faster and robust; keys configured in
+            # template_pyramid are searched coarse-to-fine, scored at full resolution
+            level = self.pyramid_levels(template_key) if template_key else 0
+            full_search = functools.partial(pyramid_match, search_img, template, level, cache=pyramid_cache)
+            if template_key:
+                rect, match_quality = self.location_predictor.match(
+                    search_img, template, template_key, self.geometry_version, threshold, full_search)
+            else:
+                rect, match_quality = full_search()
 
             # For SQDIFF, smaller value means better match (0.0 is perfect)
             # Threshold needs to be inverted: 0.8 confidence -> 0.2 diff
-            match_quality = 1.0 - min_val
-            
-            if match_quality >= threshold:
-                h, w = template.shape[:2]
-                return (min_loc[0], min_loc[1], w, h), match_quality
+            if rect is not None and match_quality >= threshold:
+                return rect, match_quality
             
             return None, match_quality
         except Exception as e:
             # print(f"Template match error for {template_key}: {e}")
             return None, 0.0
     
+    def _adapt_templates(self, keys, image):
+        """
+        Fill keys missing from the active template partition by rescaling them from another
+        partition. The scale per source partition is estimated once (against whichever of the
+        templates is visible) and cached in the store. Returns the set of keys added.
+        """
+        store = self.dynamic_templates
+        with self.template_lock:
+            sources = {key: store.source_partition(key) for key in keys}
+        by_source = {}
+        for key, source in sources.items():
+            if source is not None:
+                by_source.setdefault(source, []).append(key)
+
+        added = set()
+        for source, source_keys in by_source.items():
+            scale = store.scale(source)
+            if scale is None:
+                scale = self._estimate_partition_scale(source, source_keys, image)
+            if scale is None:
+                continue
+            for key in source_keys:
+                try:
+                    with self.template_lock:
+                        template = rescale(store.get_in(source, key), scale)
+                        store.put(key, template, self.window_size, derived_from=source, scale=scale)
+                    added.add(key)
+                except Exception as e:
+                    print(f"Failed to rescale template {key}: {e}")
+        if added:
+            print(f"Rescaled {len(added)} templates into partition {store.partition}")
+        return added
+
+    def _estimate_partition_scale(self, source, keys, image):
+        """Scale from partition source to the active one, or None (retried after SCALE_RETRY_INTERVAL)."""
+        store = self.dynamic_templates
+        now = time.time()
+        if now - self.scale_attempts.get(source, 0.0) < SCALE_RETRY_INTERVAL:
+            return None
+        (src_size, src_dpi), (size, dpi) = parse_partition(source), parse_partition(store.partition)
+        hints = []
+        if src_size and size:
+            hints = [size[1] / src_size[1], size[0] / src_size[0], dpi / src_dpi]
+
+        # Most used templates first: they are the most likely to be on screen
+        with self.template_lock:
+            probes = sorted(keys, key=lambda k: -store.metadata(k, source)["hits"])[:SCALE_PROBES]
+        start = time.perf_counter()
+        for key in probes:
+            with self.template_lock:
+                template = store.get_in(source, key)
+            threshold = 0.90 if key.startswith("status:") else 0.85
+            scale, quality = estimate_scale(image, template, threshold, hints)
+            if scale is not None:
+                with self.template_lock:
+                    store.set_scale(source, scale)
+                print(f"Template scale {source} -> {store.partition}: {scale:.2f} "
+                      f"(via {key}, q {quality:.2f}, {(time.perf_counter() - start) * 1000:.0f} ms)")
+                return scale
+        self.scale_attempts[source] = now
+        return None
+
     def _load_cached_templates(self):
-        """Load previously cached templates from disk (Issue 8)."""
+        """Migrate the legacy pickle cache into the template store (Issue 8). Templates load lazily."""
         try:
             cache_file = os.path.join(self.template_cache_dir, "dynamic_templates.pkl")
-            if os.path.exists(cache_file):
-                import pickle
-                with open(cache_file, 'rb') as f:
-                    loaded_templates = pickle.load(f)
-                with self.template_lock:
-                    self.dynamic_templates.update(loaded_templates)
-                print(f"Loaded {len(loaded_templates)} cached templates from disk")
+            with self.template_lock:
+                migrated = self.dynamic_templates.migrate_pickle(cache_file)
+            if migrated:
+                print(f"Migrated {migrated} templates from {cache_file}")
+            print(f"Template store: {len(self.dynamic_templates)} templates indexed")
         except Exception as e:
             print(f"Failed to load cached templates: {e}")
     
     def _save_cached_templates(self):
-        """Save cached templates to disk for persistence (Issue 8)."""
+        """Write the template store index (hit counts, confidences) to disk (Issue 8)."""
         try:
-            cache_file = os.path.join(self.template_cache_dir, "dynamic_templates.pkl")
-            import pickle
             with self.template_lock:
-                templates_to_save = self.dynamic_templates.copy()
-            with open(cache_file, 'wb') as f:
-                pickle.dump(templates_to_save, f)
-            print(f"Saved {len(templates_to_save)} templates to cache")
+                self.dynamic_templates.flush()
+            print(f"Saved template index ({len(self.dynamic_templates)} templates)")
         except Exception as e:
             print(f"Failed to save cached templates: {e}")
     
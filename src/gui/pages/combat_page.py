@@ -12,17 +12,15 @@ from PySide6.QtGui import QPixmap, QImage
 from gui.controllers.teleporter_tab_farming import BossFarmingManager
 from gui.controllers.teleporter_tab_worker import RELATIVE_ROI
 from gui.widgets.draggable_list import DraggableListWidget
+from capture.frame_source import create_frame_source
+from capture.capture_hub import CaptureHub
+from ocr.map_matcher import MapNameMatcher
 
-import Levenshtein
 from rapidocr_onnxruntime import RapidOCR
 import cv2
 import numpy as np
-import dxcam
 import os
 import json
-import mss
-
-from game_context import game_context
 
 
 ##############################################
@@ -122,6 +120,7 @@ class TeleporterTab(QWidget):
             "Mroczna Krypta V4", 
             "Mroczna Krypta V5"
         ]
+        self.map_matcher = MapNameMatcher(self.known_maps)
         
         self.num_channels = 1
 
@@ -154,6 +153,22 @@ class TeleporterTab(QWidget):
         btn_select_icon = QPushButton("Setup Scroll Icon")
         btn_select_icon.clicked.connect(self.setup_scroll_icon)
         row1.addWidget(btn_select_icon)
+
+        # Game client the worker is bound to (clients are registered by "Run" on the main window)
+        row1.addWidget(QLabel("Client:"))
+        self.client_combo = QComboBox()
+        self.client_combo.setStyleSheet("""
+            QComboBox {
+                background: #2b2b2b;
+                color: white;
+                padding: 5px;
+                border: none;
+                border-radius: 4px;
+                min-width: 80px;
+            }
+        """)
+        row1.addWidget(self.client_combo)
+        self._refresh_clients()
         controls_layout.addLayout(row1)
 
         # Row 2: Settings
@@ -214,13 +229,41 @@ class TeleporterTab(QWidget):
         self.toggle_btn.setStyleSheet("background-color: #2ecc71; color: white; font-weight: bold; font-size: 14px; padding: 10px;")
         self.toggle_btn.clicked.connect(self.toggle_farming)
         controls_layout.addWidget(self.toggle_btn)
+        # Start/stop acts on the selected client; the button follows its state
+        self.client_combo.currentIndexChanged.connect(self._update_toggle)
 
         layout.addLayout(controls_layout)
         layout.addStretch()
         self.setLayout(layout)
 
+    def _refresh_clients(self):
+        """Fill the client selector with the default client and every registered game client."""
+        from game_context import game_contexts, DEFAULT_CLIENT_ID
+        current = self.client_combo.currentData()
+        self.client_combo.clear()
+        self.client_combo.addItem("Default", None)
+        for client_id in game_contexts.client_ids():
+            if client_id != DEFAULT_CLIENT_ID:
+                self.client_combo.addItem(client_id, client_id)
+        index = self.client_combo.findData(current)
+        self.client_combo.setCurrentIndex(max(0, index))
+
+    def _update_toggle(self):
+        """Show Start or Stop for the selected client."""
+        client_id = self.client_combo.currentData()
+        running = self.manager.is_client_running(client_id)
+        if running:
+            self.toggle_btn.setText("Stop Detection")
+            self.toggle_btn.setStyleSheet("background-color: #e74c3c; color: white; font-weight: bold; font-size: 14px; padding: 10px;")
+        else:
+            self.toggle_btn.setText("Start Detection")
+            self.toggle_btn.setStyleSheet("background-color: #2ecc71; color: white; font-weight: bold; font-size: 14px; padding: 10px;")
+        self.status_label.setText(f"Status: {'Running' if running else 'Stopped'} ({self.client_combo.currentText()})")
+
     def toggle_farming(self):
-        if self.toggle_btn.text() == "Start Detection":
+        self._refresh_clients()
+        client_id = self.client_combo.currentData()
+        if not self.manager.is_client_running(client_id):
             priority_list = self.map_list.get_checked_items()
             # click_enabled is now always True
             click_enabled = True
@@ -238,17 +281,13 @@ class TeleporterTab(QWidget):
             ignore_stuck = self.ignore_stuck_checkbox.isChecked()
             stuck_timeout = self.stuck_timeout_spin.value()
             
-            print(f"Starting with priority: {priority_list}, click_enabled: {click_enabled}, channels: {num_channels}, key: {pelerynka_key}, preview: {show_preview}, hotkeys: {channel_hotkeys}, ignore_stuck: {ignore_stuck}, timeout: {stuck_timeout}")
+            print(f"Starting (client: {client_id or 'default'}) with priority: {priority_list}, click_enabled: {click_enabled}, channels: {num_channels}, key: {pelerynka_key}, preview: {show_preview}, hotkeys: {channel_hotkeys}, ignore_stuck: {ignore_stuck}, timeout: {stuck_timeout}")
             
-            self.manager.start_boss_farming(priority_list, click_enabled=click_enabled, num_channels=num_channels, pelerynka_key=pelerynka_key, show_preview=show_preview, channel_hotkeys=channel_hotkeys, ignore_stuck=ignore_stuck, stuck_timeout=stuck_timeout)
-            self.toggle_btn.setText("Stop Detection")
-            self.toggle_btn.setStyleSheet("background-color: #e74c3c; color: white; font-weight: bold; font-size: 14px; padding: 10px;")
-            self.status_label.setText("Status: Running")
+            self.manager.start_boss_farming(priority_list, click_enabled=click_enabled, num_channels=num_channels, pelerynka_key=pelerynka_key, show_preview=show_preview, channel_hotkeys=channel_hotkeys, ignore_stuck=ignore_stuck, stuck_timeout=stuck_timeout, client_id=client_id)
         else:
-            self.manager.stop_boss_farming()
-            self.toggle_btn.setText("Start Detection")
-            self.toggle_btn.setStyleSheet("background-color: #2ecc71; color: white; font-weight: bold; font-size: 14px; padding: 10px;")
-            self.status_label.setText("Status: Stopped")
+            # Only the selected client; workers of other clients keep running
+            self.manager.stop_client_farming(client_id)
+        self._update_toggle()
     
     def stop_detection(self):
         if self.manager:
@@ -262,10 +301,30 @@ class TeleporterTab(QWidget):
     # FIXED OCR SCAN LOGIC
     ##############################################
 
+    def _capture_window(self):
+        """
+        One-shot full-window capture. Reuses the latest frame of a running
+        CaptureHub, otherwise grabs once through the configured backend (mss by default).
+        Returns (win_rect, full_frame) or (None, None).
+        """
+        hub = CaptureHub.get_running()
+        if hub is not None:
+            window_frame = hub.snapshot(timeout=1.0)
+            if window_frame is not None:
+                return window_frame.window_rect, window_frame.image
+
+        config = self.manager.config_manager.get_capture_config()
+        with create_frame_source(config, default="mss") as source:
+            window_frame = source.grab_window()
+        if window_frame is None:
+            return None, None
+        return window_frame.window_rect, window_frame.image
+
     def scan_maps(self):
         try:
-            win_rect = game_context.get_window_rect()
-            if not win_rect:
+            # Capture full game window
+            win_rect, full_frame = self._capture_window()
+            if not win_rect or full_frame is None:
                 QMessageBox.warning(self, "Error", "Game window not found.")
                 return
 
@@ -273,18 +332,6 @@ class TeleporterTab(QWidget):
             win_width = right - left
             win_height = bottom - top
 
-            # Capture full game window
-            full_region = {
-                "left": left,
-                "top": top,
-                "width": win_width,
-                "height": win_height
-            }
-
-            with mss.mss() as sct:
-                raw = np.array(sct.grab(full_region))
-            full_frame = cv2.cvtColor(raw, cv2.COLOR_BGRA2BGR)
-
             # Try YOLO detection first
             roi_frame = None
             
@@ -308,17 +355,13 @@ class TeleporterTab(QWidget):
                     print(f"YOLO detection error: {e}")
             
             # Fallback to RELATIVE_ROI if YOLO failed or not available
+            # (cropped from the same capture instead of grabbing again)
             if roi_frame is None:
-                roi_absolute = {
-                    "left": left + RELATIVE_ROI["left"],
-                    "top": top + RELATIVE_ROI["top"],
-                    "width": RELATIVE_ROI["width"],
-                    "height": RELATIVE_ROI["height"]
-                }
-                
-                with mss.mss() as sct:
-                    raw = np.array(sct.grab(roi_absolute))
-                roi_frame = cv2.cvtColor(raw, cv2.COLOR_BGRA2BGR)
+                r_x = max(0, int(RELATIVE_ROI["left"]))
+                r_y = max(0, int(RELATIVE_ROI["top"]))
+                r_w = min(win_width - r_x, int(RELATIVE_ROI["width"]))
+                r_h = min(win_height - r_y, int(RELATIVE_ROI["height"]))
+                roi_frame = full_frame[r_y:r_y+r_h, r_x:r_x+r_w]
                 print("Using fallback RELATIVE_ROI for scanning")
 
             # OCR inference on ROI
@@ -327,13 +370,7 @@ class TeleporterTab(QWidget):
             found_maps = set()
 
             for box, text, conf in result:
-                best_match = None
-                best_score = 0.0
-                for known in self.known_maps:
-                    score = Levenshtein.ratio(text.lower(), known.lower())
-                    if score > 0.6 and score > best_score:
-                        best_score = score
-                        best_match = known
+                best_match, _ = self.map_matcher.best(text)
                 if best_match:
                     found_maps.add(best_match)
 
@@ -358,8 +395,14 @@ class TeleporterTab(QWidget):
     ##############################################
 
     def setup_scroll_icon(self):
-        win_rect = game_context.get_window_rect()
-        if not win_rect:
+        try:
+            # Capture full game window
+            win_rect, full_frame = self._capture_window()
+        except Exception as e:
+            QMessageBox.critical(self, "Error", f"Failed to capture game window:\n{e}")
+            return
+
+        if not win_rect or full_frame is None:
             QMessageBox.warning(self, "Error", "Game window not found.")
             return
 
@@ -368,18 +411,6 @@ class TeleporterTab(QWidget):
             win_width = win_right - win_left
             win_height = win_bottom - win_top
 
-            # Capture full game window
-            full_region = {
-                "left": win_left,
-                "top": win_top,
-                "width": win_width,
-                "height": win_height
-            }
-
-            with mss.mss() as sct:
-                raw = np.array(sct.grab(full_region))
-            full_frame = cv2.cvtColor(raw, cv2.COLOR_BGRA2BGR)
-
             roi_frame = None
             
             # Try YOLO detection first
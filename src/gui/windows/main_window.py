@@ -50,6 +50,7 @@ class MainPage(QWidget):
         self.main_window = main_window
         self.profile_manager = ProfileManager()
         self.process = None
+        self.processes = {}  # {client_id: Popen} for every launched client
         self.initUI()
 
     def initUI(self):
@@ -308,11 +309,13 @@ class MainPage(QWidget):
         try:
             self.process = subprocess.Popen(path, cwd=os.path.dirname(path))
             
-            # Register the process with GameContext
-            from game_context import game_context
+            # Register the process as a new client; the default context follows the latest launch
+            from game_context import game_context, game_contexts
+            client_id = game_contexts.register(self.process.pid)
             game_context.set_process(self.process.pid)
+            self.processes[client_id] = self.process
             
-            print(f"Launched: {path} (PID: {self.process.pid})")
+            print(f"Launched: {path} (PID: {self.process.pid}, client: {client_id})")
             
             # Trigger autologin if configured
             if self.main_window and hasattr(self.main_window, 'settings_page'):
@@ -321,17 +324,20 @@ class MainPage(QWidget):
             QMessageBox.critical(self, "Error", f"Could not run file:\n{e}")
 
     def cleanup(self):
-        """Terminates the attached process if it exists."""
-        if self.process:
+        """Terminates every launched process."""
+        from game_context import game_contexts
+        for client_id, process in list(self.processes.items()):
             try:
-                self.process.terminate()
-                self.process.wait(timeout=2)
+                process.terminate()
+                process.wait(timeout=2)
             except Exception:
                 try:
-                    self.process.kill()
+                    process.kill()
                 except Exception:
                     pass
-            self.process = None
+            game_contexts.remove(client_id)
+        self.processes = {}
+        self.process = None
 
 
 # --------------------------
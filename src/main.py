@@ -1,5 +1,6 @@
 # src/main.py
 
+import multiprocessing
 import sys
 import os
 from pathlib import Path
@@ -17,11 +18,13 @@ if getattr(sys, 'frozen', False):
     # Add bundled paths to sys.path and keep temporary extraction stable
     base_path = sys._MEIPASS
     sys.path.append(base_path)
-    
-TEMP_DIR = initialize_temp_dir()
-os.environ.setdefault("PYTHONPYCACHEPREFIX", str(Path(TEMP_DIR) / "__pycache__"))
+
 
 def main():
+    # Not at import time: OCR service processes (spawn) re-import this module as __mp_main__
+    temp_dir = initialize_temp_dir()
+    os.environ.setdefault("PYTHONPYCACHEPREFIX", str(Path(temp_dir) / "__pycache__"))
+
     app = QApplication(sys.argv)
     
     # Import MainWindow AFTER QApplication to avoid DPI context conflicts (e.g. with OpenCV)
@@ -36,4 +39,6 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    # Frozen (PyInstaller) child processes must stop here instead of opening another GUI
+    multiprocessing.freeze_support()
+    main()
@@ -0,0 +1,4 @@
+"""
+OCR module for KoniuBot.
+Contains the OCR execution and caching layers used by the detection workers.
+"""
@@ -0,0 +1,105 @@
+"""
+OCR result cache keyed by a perceptual hash of the preprocessed input.
+
+The hash is a block-mean thumbnail quantized to a few intensity levels, so
+sensor noise and anti-aliasing flicker map to the same key while any changed
+glyph does not. Channel cycling on the same map shows the same summon window
+again and again; those frames are served from the cache instead of RapidOCR.
+"""
+
+import collections
+import hashlib
+import threading
+import time
+
+import cv2
+import numpy as np
+
+DEFAULT_CACHE_SIZE = 64
+DEFAULT_CACHE_TTL = 10.0   # Seconds a cached result stays valid
+HASH_CELL = 4              # px per thumbnail cell
+HASH_SHIFT = 4             # Drop the low 4 bits -> 16 intensity levels
+
+
+def perceptual_hash(image, cell=HASH_CELL, shift=HASH_SHIFT):
+    """Stable key for an image that ignores sub-quantization noise."""
+    h, w = image.shape[:2]
+    thumb = cv2.resize(image, (max(1, w // cell), max(1, h // cell)), interpolation=cv2.INTER_AREA)
+    quantized = np.ascontiguousarray(thumb >> shift)
+    digest = hashlib.blake2b(quantized.tobytes(), digest_size=16).digest()
+    return (image.shape, digest)
+
+
+class OcrCache:
+    """LRU + TTL cache of OCR results with hit-rate and saved-time accounting."""
+
+    def __init__(self, size=DEFAULT_CACHE_SIZE, ttl=DEFAULT_CACHE_TTL):
+        self.size = size
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.saved_ms = 0.0
+        self._entries = collections.OrderedDict()  # key -> (result, cost_ms, stored_at)
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """Cached result for key, or None on a miss (also for expired entries)."""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and now - entry[2] > self.ttl:
+                del self._entries[key]
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            self.saved_ms += entry[1]
+            return entry[0]
+
+    def put(self, key, result, cost_ms):
+        """Store result together with what computing it cost (credited on every later hit)."""
+        with self._lock:
+            self._entries[key] = (result, cost_ms, time.monotonic())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.size:
+                self._entries.popitem(last=False)
+
+    def invalidate(self):
+        """Drop every entry (window geometry changed, so the pixels mean something else)."""
+        with self._lock:
+            self._entries.clear()
+
+    @property
+    def hit_rate(self):
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def stats(self):
+        with self._lock:
+            entries = len(self._entries)
+        return {"entries": entries, "hits": self.hits, "misses": self.misses,
+                "hit_rate": self.hit_rate, "saved_ms": self.saved_ms}
+
+
+class CachedOcr:
+    """Drop-in wrapper for a RapidOCR-style engine: engine(img) -> (result, elapse)."""
+
+    def __init__(self, engine, cache=None):
+        self.engine = engine
+        self.cache = cache if cache is not None else OcrCache()
+
+    def __call__(self, image, *args, **kwargs):
+        key = perceptual_hash(image)
+        cached = self.cache.get(key)
+        if cached is not None:
+            return cached, None
+        start = time.perf_counter()
+        result, elapse = self.engine(image, *args, **kwargs)
+        # Empty results are cached too: "no text here" is just as expensive to recompute
+        self.cache.put(key, result if result is not None else [], (time.perf_counter() - start) * 1000.0)
+        return result, elapse
+
+    def __getattr__(self, name):
+        return getattr(self.engine, name)
@@ -0,0 +1,175 @@
+"""
+Bounded OCR executor.
+
+A fixed pool of worker threads takes frames from a single latest-wins slot:
+submitting while a frame is still waiting replaces it (the superseded frame
+is counted as dropped), so OCR never queues up behind a slow CPU. Results
+are collected by the consumer with poll(); a result that finishes after a
+newer submission already published is discarded as out of order.
+"""
+
+import collections
+import threading
+import time
+
+import numpy as np
+
+DEFAULT_OCR_WORKERS = 1
+METRICS_WINDOW = 200       # Samples kept for the latency / age percentiles
+
+
+class OcrJob:
+    """One submitted frame and, once finished, its OCR output."""
+
+    __slots__ = ("seq", "image", "tag", "submitted", "started", "finished", "result", "error")
+
+    def __init__(self, seq, image, tag):
+        self.seq = seq
+        self.image = image
+        self.tag = tag
+        self.submitted = time.perf_counter()
+        self.started = None
+        self.finished = None
+        self.result = None
+        self.error = None
+
+    @property
+    def latency_ms(self):
+        """Submission to completion, including time spent waiting in the slot."""
+        return (self.finished - self.submitted) * 1000.0
+
+    @property
+    def run_ms(self):
+        return (self.finished - self.started) * 1000.0
+
+
+class OcrExecutor:
+    """Persistent OCR workers fed through a latest-wins single-slot queue."""
+
+    def __init__(self, engine, workers=DEFAULT_OCR_WORKERS, name="ocr"):
+        self.engine = engine
+        self.workers = max(1, int(workers))
+        self.name = name
+        self.running = False
+        self.submitted = 0
+        self.completed = 0
+        self.dropped = 0        # Superseded in the slot before a worker took them
+        self.discarded = 0      # Finished after a newer result was already published
+        self.errors = 0
+        self._seq = 0
+        self._slot = None
+        self._in_flight = 0
+        self._published_seq = 0
+        self._ready = None      # Newest finished job not yet polled
+        self._latency = collections.deque(maxlen=METRICS_WINDOW)
+        self._age = collections.deque(maxlen=METRICS_WINDOW)
+        self._cond = threading.Condition()
+        self._threads = []
+
+    def start(self):
+        if self.running:
+            return self
+        self.running = True
+        for i in range(self.workers):
+            t = threading.Thread(target=self._worker, args=(i,), daemon=True, name=f"{self.name}-{i}")
+            t.start()
+            self._threads.append(t)
+        return self
+
+    def shutdown(self, timeout=2.0):
+        with self._cond:
+            self.running = False
+            self._slot = None
+            self._cond.notify_all()
+        for t in self._threads:
+            if t is not threading.current_thread():
+                t.join(timeout)
+        self._threads = []
+
+    def submit(self, image, tag=None):
+        """
+        Queue image for OCR, replacing any frame still waiting. The image is
+        not copied: callers must not write into it afterwards. Returns the job seq.
+        """
+        with self._cond:
+            self._seq += 1
+            if self._slot is not None:
+                self.dropped += 1
+            self._slot = OcrJob(self._seq, image, tag)
+            self.submitted += 1
+            self._cond.notify()
+            return self._seq
+
+    def poll(self):
+        """Newest finished job not collected yet, or None. Records its age at consumption."""
+        with self._cond:
+            job = self._ready
+            self._ready = None
+        if job is not None:
+            self._age.append((time.perf_counter() - job.submitted) * 1000.0)
+        return job
+
+    def _run(self, index, job):
+        """OCR one job on worker `index`. Returns the RapidOCR result."""
+        result, _ = self.engine(job.image)
+        return result
+
+    def _worker(self, index):
+        while True:
+            with self._cond:
+                while self.running and self._slot is None:
+                    self._cond.wait()
+                if not self.running:
+                    return
+                job = self._slot
+                self._slot = None
+                self._in_flight += 1
+
+            job.started = time.perf_counter()
+            try:
+                job.result = self._run(index, job)
+            except Exception as e:
+                print(f"OCR error: {e}")
+                job.error = e
+            job.finished = time.perf_counter()
+            job.image = None
+
+            with self._cond:
+                self._in_flight -= 1
+                if job.error is not None:
+                    self.errors += 1
+                    continue
+                self.completed += 1
+                self._latency.append(job.latency_ms)
+                if job.seq < self._published_seq:
+                    # A newer frame finished first; this result would go backwards in time
+                    self.discarded += 1
+                    continue
+                self._published_seq = job.seq
+                self._ready = job
+
+    def metrics(self):
+        """{"queue_depth", "in_flight", "submitted", "completed", "dropped", "discarded", "p50_ms", "p95_ms", "age_p50_ms", "age_p95_ms"}"""
+        with self._cond:
+            stats = {
+                "workers": self.workers,
+                "queue_depth": 1 if self._slot is not None else 0,
+                "in_flight": self._in_flight,
+                "submitted": self.submitted,
+                "completed": self.completed,
+                "dropped": self.dropped,
+                "discarded": self.discarded,
+                "errors": self.errors,
+            }
+            latency = list(self._latency)
+            age = list(self._age)
+        stats["p50_ms"], stats["p95_ms"] = _percentiles(latency)
+        stats["age_p50_ms"], stats["age_p95_ms"] = _percentiles(age)
+        return stats
+
+
+def _percentiles(samples):
+    if not samples:
+        return 0.0, 0.0
+    p50, p95 = np.percentile(samples, [50, 95])
+    return float(p50), float(p95)
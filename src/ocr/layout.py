@@ -0,0 +1,138 @@
+"""
+Recognition-only OCR on a cached text layout.
+
+The summon window is a fixed table, so the text-detection boxes found once
+stay valid until the list scrolls, the ROI changes size or the recognizer
+starts returning low confidences. Until then every call crops the cached
+boxes and runs only the recognizer, skipping det (and cls).
+"""
+
+import threading
+import time
+
+import numpy as np
+
+from ocr.batch import recognize_batch
+
+REDETECT_INTERVAL = 5.0    # Seconds before the layout is re-detected regardless
+MIN_CONFIDENCE = 0.6       # Recognition score below which a row counts as misaligned
+LOW_CONF_FRACTION = 0.25   # Fraction of misaligned rows that triggers re-detection
+
+
+class LayoutCachedOcr:
+    """Drop-in wrapper for RapidOCR: engine(img) -> (result, elapse), det boxes cached per ROI shape."""
+
+    def __init__(self, engine, redetect_interval=REDETECT_INTERVAL, min_confidence=MIN_CONFIDENCE,
+                 low_conf_fraction=LOW_CONF_FRACTION, detector=None):
+        self.engine = engine
+        self.detector = detector  # Optional img -> quads replacement for the detection network
+        self.redetect_interval = redetect_interval
+        self.min_confidence = min_confidence
+        self.low_conf_fraction = low_conf_fraction
+        self.detections = 0
+        self.rec_only = 0
+        self.redetect_reasons = {"initial": 0, "empty": 0, "shape": 0, "interval": 0, "invalidated": 0, "confidence": 0}
+        self._boxes = None
+        self._shape = None
+        self._detected_at = 0.0
+        self._invalidated = False
+        self._lock = threading.Lock()
+
+    def invalidate(self):
+        """Force detection on the next call (list scrolled, ROI moved)."""
+        with self._lock:
+            self._invalidated = True
+
+    def __call__(self, image, *args, **kwargs):
+        engine = self.engine
+        h, w = image.shape[:2]
+        if args or kwargs or not getattr(engine, "use_text_det", True) or h <= engine.min_height \
+                or (engine.width_height_ratio != -1 and w / h > engine.width_height_ratio):
+            # RapidOCR would not run detection on this input either
+            return engine(image, *args, **kwargs)
+
+        img = engine.load_img(image)
+        reason = self._redetect_reason(img.shape)
+        if reason is None:
+            with self._lock:
+                boxes = self._boxes
+            result, elapse, low_conf = self._recognize(img, boxes)
+            if not low_conf:
+                self.rec_only += 1
+                return result, elapse
+            reason = "confidence"
+        return self._detect(img, reason)
+
+    def _redetect_reason(self, shape):
+        with self._lock:
+            if self._boxes is None:
+                return "initial"
+            if not len(self._boxes):
+                return "empty"
+            if self._shape != shape:
+                return "shape"
+            if self._invalidated:
+                return "invalidated"
+            if time.monotonic() - self._detected_at > self.redetect_interval:
+                return "interval"
+        return None
+
+    def _detect(self, img, reason):
+        engine = self.engine
+        self.detections += 1
+        self.redetect_reasons[reason] += 1
+        if self.detector is not None:
+            start = time.perf_counter()
+            dt_boxes = self.detector(img)
+            det_elapse = time.perf_counter() - start
+        else:
+            dt_boxes, det_elapse = engine.text_detector(img)
+        if dt_boxes is None or len(dt_boxes) < 1:
+            boxes = []
+        else:
+            boxes = engine.sorted_boxes(dt_boxes)
+        with self._lock:
+            self._boxes = boxes
+            self._shape = img.shape
+            self._detected_at = time.monotonic()
+            self._invalidated = False
+        if not boxes:
+            return None, None
+
+        crops = engine.get_crop_img_list(img, boxes)
+        cls_elapse = 0.0
+        if engine.use_angle_cls:
+            crops, _, cls_elapse = engine.text_cls(crops)
+        rec_res, rec_elapse = engine.text_recognizer(crops)
+        self._on_layout_read(img, boxes, rec_res)
+        return self._finish(boxes, rec_res, [det_elapse, cls_elapse, rec_elapse])
+
+    def _on_layout_read(self, img, boxes, rec_res):
+        """Hook: a fresh detection was fully recognized."""
+        pass
+
+    def _recognize(self, img, boxes):
+        engine = self.engine
+        crops = engine.get_crop_img_list(img, boxes)
+        # All rows in one session call instead of rec_batch_num-sized groups
+        rec_res, rec_elapse = recognize_batch(engine, crops)
+        scores = np.array([float(score) for _, score in rec_res]) if rec_res else np.zeros(0)
+        low_conf = bool(len(scores)) and np.mean(scores < self.min_confidence) > self.low_conf_fraction
+        result, elapse = self._finish(boxes, rec_res, [0.0, 0.0, rec_elapse])
+        return result, elapse, low_conf
+
+    def _finish(self, boxes, rec_res, elapse):
+        filter_boxes, filter_rec_res = self.engine.filter_boxes_rec_by_score(boxes, rec_res)
+        result = [[box.tolist(), rec[0], str(rec[1])] for box, rec in zip(filter_boxes, filter_rec_res)]
+        if result:
+            return result, elapse
+        return None, None
+
+    def stats(self):
+        total = self.detections + self.rec_only
+        return {"detections": self.detections, "rec_only": self.rec_only,
+                "rec_only_rate": self.rec_only / total if total else 0.0,
+                "redetect_reasons": dict(self.redetect_reasons)}
+
+    def __getattr__(self, name):
+        return getattr(self.engine, name)
@@ -0,0 +1,122 @@
+"""
+Indexed fuzzy matching of OCR lines against known map names.
+
+Names are normalized once (case, Polish diacritics, whitespace) and split
+into a base name and the trailing version number ("Mroczna Krypta V3" ->
+"mroczna krypta", 3). A trigram index narrows every OCR line to the few names
+it shares trigrams with, so Levenshtein runs on candidates only, and the
+matches of a whole OCR result are memoized per result version: a frame that
+reuses the same OCR result costs one dictionary lookup per map.
+"""
+
+import re
+import threading
+import unicodedata
+
+import Levenshtein
+
+MIN_RATIO = 0.6            # Lowest ratio any caller asks for; weaker pairs are not stored
+SHORT_TEXT = 4             # Texts with fewer trigrams than this are compared with every name
+
+_FOLD = str.maketrans({"ł": "l", "Ł": "l"})  # Not decomposed by NFKD
+_NUMBER = re.compile(r"\d+")
+_VERSION_SUFFIX = re.compile(r"\s*\bv\s*\d+\s*$")
+
+
+def normalize_text(text):
+    """Lowercase, strip diacritics and punctuation, collapse whitespace."""
+    text = unicodedata.normalize("NFKD", text.translate(_FOLD).lower())
+    text = "".join(c if c.isalnum() or c.isspace() else " " for c in text if not unicodedata.combining(c))
+    return " ".join(text.split())
+
+
+def split_version(text):
+    """(normalized text, last number in it or None)."""
+    norm = normalize_text(text)
+    numbers = _NUMBER.findall(norm)
+    return norm, numbers[-1] if numbers else None
+
+
+def trigrams(norm):
+    padded = f"  {norm} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class MapNameMatcher:
+    """Matches OCR text to a fixed vocabulary of names; version numbers must agree exactly."""
+
+    def __init__(self, names, min_ratio=MIN_RATIO):
+        self.names = list(dict.fromkeys(names))
+        self.min_ratio = min_ratio
+        self._entries = {}     # name -> (normalized, version)
+        self._index = {}       # trigram -> {name}
+        for name in self.names:
+            norm, version = split_version(name)
+            self._entries[name] = (norm, version)
+            for gram in trigrams(_VERSION_SUFFIX.sub("", norm)):
+                self._index.setdefault(gram, set()).add(name)
+        self._memo_version = None
+        self._memo = {}        # name -> [(line index, ratio)] for the memoized result
+        self._lock = threading.Lock()
+        self.lookups = 0
+        self.memo_hits = 0
+
+    def _candidates(self, norm):
+        grams = trigrams(norm)
+        if len(grams) < SHORT_TEXT:
+            return self.names
+        found = set()
+        for gram in grams:
+            found |= self._index.get(gram, set())
+        return found
+
+    def match(self, text, min_ratio=None):
+        """[(name, ratio)] for one text, best first; names with a different version are skipped."""
+        min_ratio = self.min_ratio if min_ratio is None else min_ratio
+        self.lookups += 1
+        norm, version = split_version(text)
+        if not norm:
+            return []
+        matches = []
+        for name in self._candidates(norm):
+            name_norm, name_version = self._entries[name]
+            if name_version is not None and name_version != version:
+                continue
+            ratio = Levenshtein.ratio(norm, name_norm)
+            if ratio > min_ratio:
+                matches.append((name, ratio))
+        matches.sort(key=lambda m: m[1], reverse=True)
+        return matches
+
+    def best(self, text, min_ratio=None):
+        """(name, ratio) of the best match, or (None, 0.0)."""
+        matches = self.match(text, min_ratio)
+        return matches[0] if matches else (None, 0.0)
+
+    def _index_result(self, result, version):
+        with self._lock:
+            if version is not None and version == self._memo_version:
+                self.memo_hits += 1
+                return self._memo
+        memo = {}
+        for i, (_, text, _) in enumerate(result or []):
+            for name, ratio in self.match(text):
+                memo.setdefault(name, []).append((i, ratio))
+        with self._lock:
+            self._memo_version = version
+            self._memo = memo
+        return memo
+
+    def find(self, name, result, version, min_ratio=None):
+        """
+        OCR lines of result matching name, as [(box, text, conf, ratio)] in line order.
+        version identifies the OCR result (same version = same texts); None disables memoization.
+        """
+        min_ratio = self.min_ratio if min_ratio is None else min_ratio
+        if not result:
+            return []
+        memo = self._index_result(result, version)
+        return [(*result[i], ratio) for i, ratio in memo.get(name, []) if ratio > min_ratio]
+
+    def stats(self):
+        return {"names": len(self.names), "lookups": self.lookups, "memo_hits": self.memo_hits}
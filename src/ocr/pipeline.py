@@ -0,0 +1,38 @@
+"""
+Assembly of the OCR pipeline from the worker config.
+
+Shared by the in-process executor and the OCR service processes, so both
+run the same layout/incremental/cache wrappers around RapidOCR.
+"""
+
+from ocr.cache import CachedOcr, OcrCache, DEFAULT_CACHE_SIZE, DEFAULT_CACHE_TTL
+from ocr.incremental import IncrementalRowOcr
+from ocr.layout import LayoutCachedOcr
+from vision.row_segmenter import cell_quads
+
+
+def build_ocr_pipeline(engine, config):
+    """
+    Wrap a RapidOCR engine according to config. Returns (pipeline, layout_ocr, ocr_cache);
+    layout_ocr and ocr_cache are None when the corresponding stage is disabled.
+
+    ocr_mode "layout": keep the text-detection boxes of the summon table and run
+    recognition only until a scroll, resize or low confidence; "incremental" additionally
+    re-reads only the rows whose pixels changed; "full" runs det+cls+rec.
+    ocr_row_source "segmenter" replaces the detection network with projection-profile cells.
+    """
+    mode = config.get("ocr_mode", "full")
+    detector = cell_quads if config.get("ocr_row_source", "det") == "segmenter" else None
+    layout_ocr = None
+    if mode == "layout":
+        layout_ocr = LayoutCachedOcr(engine, detector=detector)
+    elif mode == "incremental":
+        layout_ocr = IncrementalRowOcr(engine, detector=detector)
+    pipeline = layout_ocr if layout_ocr is not None else engine
+
+    # Identical-looking ROIs (e.g. same map after a channel switch) reuse the previous OCR result
+    cache_size = config.get("ocr_cache_size", DEFAULT_CACHE_SIZE)
+    ocr_cache = OcrCache(cache_size, config.get("ocr_cache_ttl", DEFAULT_CACHE_TTL)) if cache_size else None
+    if ocr_cache is not None:
+        pipeline = CachedOcr(pipeline, ocr_cache)
+    return pipeline, layout_ocr, ocr_cache
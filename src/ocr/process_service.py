@@ -0,0 +1,195 @@
+"""
+Out-of-process OCR service.
+
+RapidOCR's Python-side pre/post-processing holds the GIL, so running it in
+threads next to the capture loop makes frame pacing jittery. Here each OCR
+worker is a separate process: frames are handed over through a
+SharedFrameRing (no pickling of pixels) and results come back as plain
+lists through a pipe. Crashed processes are restarted on the next job.
+
+OcrProcessExecutor keeps the OcrExecutor interface (submit / poll /
+metrics, latest-wins slot, out-of-order discard), so the worker loop does
+not care where OCR runs.
+"""
+
+import multiprocessing as mp
+import threading
+import time
+
+import numpy as np
+
+from capture.shm_ring import SharedFrameRing
+from ocr.executor import OcrExecutor, DEFAULT_OCR_WORKERS
+
+DEFAULT_START_METHOD = "spawn"   # fork is unsafe next to Qt and capture threads
+RESULT_POLL = 0.1                # Seconds between liveness checks while waiting for a result
+STOP_TIMEOUT = 2.0
+RING_SLOTS = 2
+
+# Config keys forwarded to the service processes
+OCR_CONFIG_KEYS = ("ocr_backend", "ocr_mode", "ocr_row_source", "ocr_cache_size", "ocr_cache_ttl")
+
+
+def _default_engine(config):
+    from vision.engines import get_ocr_engine
+    return get_ocr_engine(config.get("ocr_backend", "CPU"))
+
+
+def run_ocr_process(conn, config, engine_factory=None):
+    """
+    Service process entry point. Messages on conn:
+    ("ocr", ring_name, frame_seq) -> ("result", result, run_ms) or ("error", message),
+    ("invalidate", scope) with scope "layout" or "all", ("stop",).
+    """
+    from ocr.pipeline import build_ocr_pipeline
+
+    engine = (engine_factory or _default_engine)(config)
+    pipeline, layout_ocr, ocr_cache = build_ocr_pipeline(engine, config)
+    ring = None
+    try:
+        while True:
+            try:
+                msg = conn.recv()
+            except (EOFError, OSError):
+                break
+            if msg[0] == "stop":
+                break
+            if msg[0] == "invalidate":
+                if layout_ocr is not None:
+                    layout_ocr.invalidate()
+                if msg[1] == "all" and ocr_cache is not None:
+                    ocr_cache.invalidate()
+                continue
+
+            _, ring_name, frame_seq = msg
+            try:
+                if ring is None or ring.name != ring_name:
+                    if ring is not None:
+                        ring.close()
+                    ring = SharedFrameRing.attach(ring_name)
+                entry = ring.read(frame_seq)
+                if entry is None:
+                    raise RuntimeError(f"frame {frame_seq} no longer in ring")
+                start = time.perf_counter()
+                result, _ = pipeline(entry[2])
+                run_ms = (time.perf_counter() - start) * 1000.0
+                if not ring.is_valid(frame_seq):
+                    raise RuntimeError(f"frame {frame_seq} overwritten during OCR")
+                conn.send(("result", result, run_ms))
+            except Exception as e:
+                conn.send(("error", f"{type(e).__name__}: {e}"))
+    finally:
+        if ring is not None:
+            ring.close()
+        conn.close()
+
+
+class OcrProcessExecutor(OcrExecutor):
+    """OcrExecutor whose workers forward frames to dedicated OCR processes."""
+
+    def __init__(self, config, workers=DEFAULT_OCR_WORKERS, name="ocr-proc",
+                 start_method=DEFAULT_START_METHOD, engine_factory=None):
+        super().__init__(None, workers=workers, name=name)
+        self.config = {k: config[k] for k in OCR_CONFIG_KEYS if k in config}
+        self.engine_factory = engine_factory
+        self.restarts = 0
+        self._ctx = mp.get_context(start_method)
+        self._procs = [None] * self.workers     # (process, conn, send_lock) per worker
+        self._procs_lock = threading.Lock()
+        self._rings = [None] * self.workers     # One ring per process: a job never shares slots
+
+    def start(self):
+        if self.running:
+            return self
+        for i in range(self.workers):
+            self._ensure_process(i)
+        return super().start()
+
+    def shutdown(self, timeout=STOP_TIMEOUT):
+        super().shutdown(timeout)
+        with self._procs_lock:
+            procs, self._procs = self._procs, [None] * self.workers
+        for entry in procs:
+            if entry is None:
+                continue
+            proc, conn, send_lock = entry
+            try:
+                with send_lock:
+                    conn.send(("stop",))
+            except Exception:
+                pass
+            proc.join(timeout)
+            if proc.is_alive():
+                proc.terminate()
+            conn.close()
+        for i, ring in enumerate(self._rings):
+            if ring is not None:
+                ring.close()
+                ring.unlink()
+            self._rings[i] = None
+
+    def invalidate(self, scope="layout"):
+        """Forward a layout ("layout") or layout + result cache ("all") invalidation to every process."""
+        with self._procs_lock:
+            procs = [entry for entry in self._procs if entry is not None]
+        for proc, conn, send_lock in procs:
+            try:
+                with send_lock:
+                    conn.send(("invalidate", scope))
+            except Exception as e:
+                print(f"OCR service invalidate error: {e}")
+
+    def _ensure_process(self, index):
+        with self._procs_lock:
+            entry = self._procs[index]
+            if entry is not None and entry[0].is_alive():
+                return entry
+            if entry is not None:
+                # Crashed since the last job
+                self.restarts += 1
+                print(f"OCR service process {index} exited ({entry[0].exitcode}); restarting")
+                entry[1].close()
+            parent_conn, child_conn = self._ctx.Pipe()
+            proc = self._ctx.Process(target=run_ocr_process, args=(child_conn, self.config, self.engine_factory),
+                                     daemon=True, name=f"{self.name}-{index}")
+            proc.start()
+            child_conn.close()
+            entry = self._procs[index] = (proc, parent_conn, threading.Lock())
+            return entry
+
+    def _write_frame(self, index, image):
+        """Copy image into worker index's ring (re-created larger if needed). Returns (ring name, seq)."""
+        frame = np.ascontiguousarray(image)
+        shape = frame.shape if frame.ndim == 3 else frame.shape + (1,)
+        ring = self._rings[index]
+        if ring is None or shape[2] != ring.max_shape[2] \
+                or shape[0] > ring.max_shape[0] or shape[1] > ring.max_shape[1]:
+            if ring is not None:
+                max_shape = (max(shape[0], ring.max_shape[0]), max(shape[1], ring.max_shape[1]), shape[2])
+                ring.close()
+                ring.unlink()
+            else:
+                max_shape = shape
+            # One job in flight per process, so two slots are never lapped while being read
+            ring = self._rings[index] = SharedFrameRing.create(max_shape, slots=RING_SLOTS)
+        return ring.name, ring.write(frame)
+
+    def _run(self, index, job):
+        ring_name, frame_seq = self._write_frame(index, job.image)
+        proc, conn, send_lock = self._ensure_process(index)
+        with send_lock:
+            conn.send(("ocr", ring_name, frame_seq))
+        while not conn.poll(RESULT_POLL):
+            if not proc.is_alive():
+                raise RuntimeError(f"OCR service process {index} died")
+            if not self.running:
+                raise RuntimeError("OCR service shutting down")
+        msg = conn.recv()
+        if msg[0] == "error":
+            raise RuntimeError(msg[1])
+        return msg[1]
+
+    def metrics(self):
+        stats = super().metrics()
+        stats["restarts"] = self.restarts
+        return stats
@@ -0,0 +1,44 @@
+"""
+Cached accept/reject decisions for small text crops.
+
+Template hits that still need a text check (e.g. "Dostępny" rows) are
+recognized in one batch; each decision is cached under the crop's row hash,
+so rows whose pixels did not change are not recognized again.
+"""
+
+from ocr.batch import recognize_batch
+from ocr.cache import perceptual_hash
+from ocr.incremental import ROW_HASH_CELL, ROW_HASH_SHIFT
+
+
+def verify_crops(engine, crops, accept, cache=None):
+    """
+    accept(text) decision for every crop. Cached decisions are reused; only the
+    remaining crops are recognized, in one recognize_batch call, and cached.
+    Empty crops are rejected without recognition. If recognition fails the
+    pending crops are rejected and nothing is cached. Returns [bool] in input order.
+    """
+    decisions = [None] * len(crops)
+    keys = [None] * len(crops)
+    for i, crop in enumerate(crops):
+        if crop is None or not crop.size:
+            decisions[i] = False
+        elif cache is not None:
+            keys[i] = perceptual_hash(crop, ROW_HASH_CELL, ROW_HASH_SHIFT)
+            decisions[i] = cache.get(keys[i])
+
+    # Only crops with new pixels pay for recognition
+    pending = [i for i, decision in enumerate(decisions) if decision is None]
+    if pending:
+        try:
+            texts, elapsed = recognize_batch(engine, [crops[i] for i in pending])
+        except Exception as e:
+            # If OCR fails, reject the matches for safety (not cached)
+            print(f"Status verification error: {e}")
+            return [bool(decision) for decision in decisions]
+        cost_ms = elapsed * 1000.0 / len(pending)
+        for i, (text, _) in zip(pending, texts):
+            decisions[i] = bool(accept(text))
+            if keys[i] is not None:
+                cache.put(keys[i], decisions[i], cost_ms)
+    return decisions
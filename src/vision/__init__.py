@@ -0,0 +1,4 @@
+"""
+Vision helpers for KoniuBot.
+Contains the image-processing building blocks used by the detection workers.
+"""
@@ -0,0 +1,89 @@
+"""
+Cheap frame-change detection over the summon-window ROI.
+
+The ROI is reduced to per-block means and compared with the last frame that
+was reported as changed, so slow drifts still accumulate into a change.
+"""
+
+import time
+
+import cv2
+import numpy as np
+
+BLOCK_SIZE = 16            # px per block side
+CHANGE_THRESHOLD = 2.0     # Mean intensity delta (0-255) that marks a block as changed
+MAX_UNCHANGED_AGE = 1.0    # Force a refresh after this many seconds without change
+
+
+class ChangeDetector:
+    """Block-mean diff between consecutive frames with a changed-blocks mask."""
+
+    def __init__(self, block_size=BLOCK_SIZE, threshold=CHANGE_THRESHOLD, max_unchanged_age=MAX_UNCHANGED_AGE):
+        self.block_size = block_size
+        self.threshold = threshold
+        self.max_unchanged_age = max_unchanged_age
+        self.changed_mask = None
+        self.frames = 0
+        self.unchanged = 0
+        self._reference = None
+        self._reference_time = 0.0
+        self._frame_shape = None
+
+    def reset(self):
+        """Forget the reference frame; the next update() reports a change."""
+        self._reference = None
+        self.changed_mask = None
+
+    def update(self, frame):
+        """Compare frame with the reference. Returns True if anything changed."""
+        self.frames += 1
+        h, w = frame.shape[:2]
+        cols = max(1, -(-w // self.block_size))
+        rows = max(1, -(-h // self.block_size))
+        blocks = cv2.resize(frame, (cols, rows), interpolation=cv2.INTER_AREA).astype(np.int16)
+
+        now = time.time()
+        if (self._reference is None or self._reference.shape != blocks.shape
+                or now - self._reference_time > self.max_unchanged_age):
+            mask = np.ones((rows, cols), dtype=bool)
+        else:
+            diff = np.abs(blocks - self._reference)
+            if diff.ndim == 3:
+                diff = diff.max(axis=2)
+            mask = diff > self.threshold
+
+        self.changed_mask = mask
+        self._frame_shape = (h, w)
+        if not mask.any():
+            self.unchanged += 1
+            return False
+
+        self._reference = blocks
+        self._reference_time = now
+        return True
+
+    def region_changed(self, x, y, w, h):
+        """Whether any block overlapping the pixel rect changed in the last update()."""
+        if self.changed_mask is None:
+            return True
+        b = self.block_size
+        rows, cols = self.changed_mask.shape
+        r1, r2 = max(0, int(y) // b), min(rows, -(-int(y + h) // b))
+        c1, c2 = max(0, int(x) // b), min(cols, -(-int(x + w) // b))
+        if r2 <= r1 or c2 <= c1:
+            return False
+        return bool(self.changed_mask[r1:r2, c1:c2].any())
+
+    def changed_boxes(self):
+        """Changed blocks as (x, y, w, h) pixel rects, one per block."""
+        if self.changed_mask is None or self._frame_shape is None:
+            return []
+        b = self.block_size
+        h, w = self._frame_shape
+        return [(int(c) * b, int(r) * b, min(b, w - int(c) * b), min(b, h - int(r) * b))
+                for r, c in zip(*np.nonzero(self.changed_mask))]
+
+    @property
+    def hit_rate(self):
+        """Fraction of frames reported as unchanged (work that could be skipped)."""
+        return self.unchanged / self.frames if self.frames else 0.0
@@ -0,0 +1,78 @@
+"""
+Process-wide cache of the heavy inference engines.
+
+Workers bound to different game clients share one RapidOCR instance per OCR
+backend and one YOLO model per weights file instead of each loading its own.
+"""
+
+import os
+import threading
+
+_engines = {}
+_engines_lock = threading.Lock()
+
+
+class SharedModel:
+    """Serializes calls into a model that is not safe to run from several threads (YOLO predictor)."""
+
+    def __init__(self, model):
+        self.model = model
+        self.lock = threading.Lock()
+
+    def __call__(self, *args, **kwargs):
+        with self.lock:
+            return self.model(*args, **kwargs)
+
+    def __getattr__(self, name):
+        return getattr(self.model, name)
+
+
+def _get_or_create(key, factory):
+    # Loading happens under the lock so concurrent workers never load the same engine twice
+    with _engines_lock:
+        engine = _engines.get(key)
+        if engine is None:
+            engine = _engines[key] = factory()
+        return engine
+
+
+def get_ocr_engine(backend="CPU"):
+    """Shared RapidOCR for "CPU", "GPU (CUDA)" or "GPU (DirectML)", falling back to CPU."""
+    return _get_or_create(("ocr", backend), lambda: _create_ocr(backend))
+
+
+def _create_ocr(backend):
+    from rapidocr_onnxruntime import RapidOCR
+
+    if backend == "GPU (CUDA)":
+        print("Initializing OCR with GPU (CUDA)...")
+        try:
+            return RapidOCR(det_use_cuda=True, cls_use_cuda=True, rec_use_cuda=True)
+        except Exception as e:
+            print(f"Failed to init GPU (CUDA) OCR: {e}. Falling back to CPU.")
+            return RapidOCR()
+    if backend == "GPU (DirectML)":
+        print("Initializing OCR with GPU (DirectML)...")
+        try:
+            # DirectML is often enabled via det_use_dml=True in recent versions
+            # If not supported by installed version, it might throw or ignore.
+            return RapidOCR(det_use_dml=True, cls_use_dml=True, rec_use_dml=True)
+        except Exception as e:
+            print(f"Failed to init GPU (DirectML) OCR: {e}. Falling back to CPU.")
+            return RapidOCR()
+    print("Initializing OCR with CPU...")
+    return RapidOCR()
+
+
+def get_yolo_model(path):
+    """Shared, call-serialized YOLO model for a weights file."""
+    def load():
+        from ultralytics import YOLO
+        return SharedModel(YOLO(path))
+    return _get_or_create(("yolo", os.path.abspath(path)), load)
+
+
+def loaded_engines():
+    """Keys of the engines loaded so far, e.g. [("ocr", "CPU"), ("yolo", path)]."""
+    with _engines_lock:
+        return list(_engines)
@@ -0,0 +1,108 @@
+"""
+Frame-versioned result bus.
+
+OCR, YOLO and template-match outputs are published tagged with the id of the
+frame they were computed from, the window geometry version and the ROI that
+frame was cropped with. Consumers ask for the latest result of a kind that is
+no older than N frames; if the ROI has moved since, ROI-relative coordinates
+are shifted onto the current ROI.
+"""
+
+import threading
+import time
+
+
+class BusResult:
+    """A published result and the frame it describes."""
+
+    __slots__ = ("kind", "value", "frame_id", "geometry_version", "roi", "timestamp")
+
+    def __init__(self, kind, value, frame_id, geometry_version, roi=None, timestamp=None):
+        self.kind = kind
+        self.value = value
+        self.frame_id = frame_id
+        self.geometry_version = geometry_version
+        self.roi = roi
+        self.timestamp = time.time() if timestamp is None else timestamp
+
+
+def shift_ocr_result(result, dx, dy):
+    """RapidOCR [(box, text, conf)] with every box point moved by (dx, dy)."""
+    return [([[x + dx, y + dy] for x, y in box], text, conf) for box, text, conf in result]
+
+
+def shift_match(match, dx, dy):
+    """_find_with_template ((x, y, w, h), conf) moved by (dx, dy)."""
+    rect, conf = match
+    if rect is None:
+        return match
+    x, y, w, h = rect
+    return (x + dx, y + dy, w, h), conf
+
+
+# Coordinate remappers by kind prefix (text before ":"); kinds without one are not remapped
+REMAPPERS = {
+    "ocr": shift_ocr_result,
+    "template": shift_match,
+}
+
+
+class ResultBus:
+    """Latest result per kind, tagged with source frame id, geometry version and ROI."""
+
+    def __init__(self):
+        self._results = {}
+        self._lock = threading.Lock()
+
+    def publish(self, kind, value, frame_id, geometry_version=None, roi=None, timestamp=None):
+        """Publish a result unless a newer frame's result of the same kind is already there."""
+        entry = BusResult(kind, value, frame_id, geometry_version, dict(roi) if roi else None, timestamp)
+        with self._lock:
+            current = self._results.get(kind)
+            if current is not None and current.frame_id > frame_id:
+                return False
+            self._results[kind] = entry
+            return True
+
+    def latest(self, kind, frame_id=None, max_age_frames=None, unchanged_since=None,
+               geometry_version=None, roi=None, scale=1.0):
+        """
+        Latest result of kind as a BusResult, or None if there is none or it is
+        older than max_age_frames relative to frame_id. Results from frames at
+        or after unchanged_since describe the current pixels and never age out.
+        A different geometry_version rejects the result; a different roi shifts
+        ROI-relative coordinates (multiplied by scale) onto the current ROI.
+        """
+        with self._lock:
+            entry = self._results.get(kind)
+        if entry is None:
+            return None
+        if geometry_version is not None and entry.geometry_version is not None \
+                and entry.geometry_version != geometry_version:
+            return None
+        if max_age_frames is not None and frame_id is not None:
+            fresh = unchanged_since is not None and entry.frame_id >= unchanged_since
+            if not fresh and frame_id - entry.frame_id > max_age_frames:
+                return None
+
+        if roi is None or entry.roi is None:
+            return entry
+        dx = (entry.roi["left"] - roi["left"]) * scale
+        dy = (entry.roi["top"] - roi["top"]) * scale
+        remap = REMAPPERS.get(kind.split(":")[0])
+        if (dx == 0 and dy == 0) or remap is None or entry.value is None:
+            return entry
+        return BusResult(kind, remap(entry.value, dx, dy), entry.frame_id, entry.geometry_version,
+                         dict(roi), entry.timestamp)
+
+    def clear(self, kind=None):
+        """Forget results of one kind (or all), e.g. after scrolling the list."""
+        with self._lock:
+            if kind is None:
+                self._results.clear()
+            else:
+                self._results.pop(kind, None)
+
+    def kinds(self):
+        with self._lock:
+            return list(self._results)
@@ -0,0 +1,107 @@
+"""
+Projection-profile segmentation of the summon window.
+
+The boss/map list is evenly spaced bright text on a dark background. After an
+Otsu threshold of the CLAHE-processed ROI, the horizontal projection (ink per
+pixel row) separates the text rows and, inside each row, the vertical
+projection separates the columns. Both are a single cv2.reduce, so a whole
+ROI segments in a fraction of a millisecond.
+"""
+
+import cv2
+import numpy as np
+
+MIN_INK = 2                # Bright pixels a pixel row/column needs to count as text
+ROW_GAP = 2                # Row runs closer than this are one row (accents, descenders)
+MIN_ROW_HEIGHT = 6         # Shorter runs are noise
+COLUMN_GAP = 12            # Gap between words of one cell is smaller than this
+PAD = 2                    # px added around every box
+MAX_INK_FRACTION = 0.5     # More "text" than background means the threshold found no text
+BAND_MARGIN = 4            # px above/below a row searched for a template
+
+
+class RowBox:
+    """A text row and its column (cell) boxes, all (x, y, w, h) in image coordinates."""
+
+    __slots__ = ("rect", "columns")
+
+    def __init__(self, rect, columns):
+        self.rect = rect
+        self.columns = columns
+
+    def __repr__(self):
+        return f"RowBox({self.rect}, {len(self.columns)} columns)"
+
+
+def _runs(mask, gap):
+    """(start, end) of True runs in a 1-D mask, runs separated by fewer than gap False merged."""
+    padded = np.concatenate(([False], mask, [False]))
+    edges = np.flatnonzero(padded[1:] != padded[:-1]).tolist()
+    runs = []
+    for start, end in zip(edges[::2], edges[1::2]):
+        if runs and start - runs[-1][1] < gap:
+            runs[-1][1] = end
+        else:
+            runs.append([start, end])
+    return runs
+
+
+def segment_rows(image, bright_text=True, min_ink=MIN_INK, row_gap=ROW_GAP, min_row_height=MIN_ROW_HEIGHT,
+                 column_gap=COLUMN_GAP, pad=PAD):
+    """
+    Segment a (CLAHE-processed) ROI into text rows and columns.
+    Returns [RowBox] top to bottom; empty if the image has no text-like rows.
+    """
+    if image is None or image.size == 0:
+        return []
+    gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY) if image.ndim == 3 else image
+    mode = cv2.THRESH_BINARY if bright_text else cv2.THRESH_BINARY_INV
+    _, binary = cv2.threshold(gray, 0, 1, mode | cv2.THRESH_OTSU)
+
+    h, w = binary.shape
+    row_ink = cv2.reduce(binary, 1, cv2.REDUCE_SUM, dtype=cv2.CV_32S).ravel()
+    if row_ink.sum() > MAX_INK_FRACTION * h * w:
+        return []
+    rows = []
+    for y0, y1 in _runs(row_ink >= min_ink, row_gap):
+        if y1 - y0 < min_row_height:
+            continue
+        col_ink = cv2.reduce(binary[y0:y1], 0, cv2.REDUCE_SUM, dtype=cv2.CV_32S).ravel()
+        spans = _runs(col_ink >= 1, column_gap)
+        if not spans:
+            continue
+        top, bottom = max(0, y0 - pad), min(h, y1 + pad)
+        columns = [(max(0, x0 - pad), top, min(w, x1 + pad) - max(0, x0 - pad), bottom - top) for x0, x1 in spans]
+        left = columns[0][0]
+        right = columns[-1][0] + columns[-1][2]
+        rows.append(RowBox((left, top, right - left, bottom - top), columns))
+    return rows
+
+
+def row_bands(rows, template_h, img_h, margin=BAND_MARGIN):
+    """[y0, y1) bands around rows, each tall enough for a template_h match."""
+    bands = []
+    for row in rows:
+        _, ry, _, rh = row.rect
+        band_h = max(rh, template_h) + 2 * margin
+        y0 = max(0, ry + rh // 2 - band_h // 2)
+        y1 = min(img_h, y0 + band_h)
+        if y1 - y0 < template_h:
+            continue
+        # Merge only when the bands would test the same positions; touching bands stay separate
+        if bands and y0 <= bands[-1][1] - template_h:
+            bands[-1][1] = max(bands[-1][1], y1)
+        else:
+            bands.append([y0, y1])
+    return bands
+
+
+def to_quads(rects):
+    """(x, y, w, h) boxes as RapidOCR-style float32 quads (clockwise from top-left)."""
+    return np.array([[[x, y], [x + w, y], [x + w, y + h], [x, y + h]] for x, y, w, h in rects],
+                    dtype=np.float32).reshape(-1, 4, 2)
+
+
+def cell_quads(image, **kwargs):
+    """Detector replacement: every column box of every row as a RapidOCR quad."""
+    return to_quads([col for row in segment_rows(image, **kwargs) for col in row.columns])
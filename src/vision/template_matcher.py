@@ -0,0 +1,301 @@
+"""
+Template matching over the processed summon-window ROI.
+
+MultiTemplateMatcher scores a whole set of cached templates (all map:*
+templates of the priority list) against one frame in a single pass: the
+search image is prepared once and every template is matched only inside the
+bands around the text rows found by the row segmenter, instead of the full
+ROI once per lookup.
+
+pyramid_match searches a 2x/4x downsampled image first and re-scores only
+the top candidates at full resolution, so the reported quality (and thus
+the 0.85/0.90 thresholds) is always the full-resolution one. The pyramid
+level is chosen per template key pattern (PyramidLevels).
+
+LocationPredictor remembers where each template was last found (and how well)
+per window geometry version; the next lookup tries a small window around that
+spot and falls back to the full search unless the window scores as well as
+the remembered match. A neighbouring near-duplicate row (e.g. "V4" next to
+"V3") clears the threshold but not the remembered quality.
+
+estimate_scale finds the factor by which templates captured at another
+window size / UI scale have to be resized to match the current frame; it is
+run once per geometry and the result is cached in the TemplateStore.
+"""
+
+import fnmatch
+import functools
+
+import cv2
+import numpy as np
+
+ANCHOR_SLACK = 4           # px a template may sit off a cell's left edge / row centre
+WIDTH_TOLERANCE = 0.15     # A cell is a candidate if its width is within 15% (min 8 px) of the template's
+PYRAMID_TOP_K = 3          # Coarse candidates re-scored at full resolution
+MIN_COARSE_SIZE = 6        # px; templates smaller than this when downsampled are matched at full resolution
+REFINE_MARGIN = 2          # px around a coarse candidate (on top of the downsampling factor)
+PREDICT_MARGIN = 12        # px around the last match location tried before the full search
+PREDICT_EPSILON = 0.01     # A predicted hit must score within this of the remembered quality
+SCALE_RANGE = (0.5, 2.0)   # Template scale factors searched by estimate_scale
+SCALE_STEP = 0.05          # Coarse scale grid
+SCALE_REFINE_STEP = 0.01   # Fine grid around the best coarse scale
+MIN_SCALED_SIZE = 4        # px; smaller rescaled templates are not tried
+
+
+def to_search_image(image, template):
+    """Image in the template's colour layout (templates are cached grayscale)."""
+    if len(template.shape) == 2 and len(image.shape) == 3:
+        return cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+    return image
+
+
+def best_match(search_img, template, bands=None):
+    """
+    Best TM_SQDIFF_NORMED location of template, searched in the given [y0, y1)
+    bands (whole image if None). Returns ((x, y, w, h), quality) with quality = 1 - sqdiff,
+    or (None, 0.0) if the template does not fit anywhere.
+    """
+    h, w = template.shape[:2]
+    best_rect, best_quality = None, 0.0
+    for y0, y1 in bands or [(0, search_img.shape[0])]:
+        region = search_img[y0:y1]
+        if region.shape[0] < h or region.shape[1] < w:
+            continue
+        res = cv2.matchTemplate(region, template, cv2.TM_SQDIFF_NORMED)
+        min_val, _, min_loc, _ = cv2.minMaxLoc(res)
+        if best_rect is None or 1.0 - min_val > best_quality:
+            best_rect, best_quality = (min_loc[0], min_loc[1] + y0, w, h), 1.0 - min_val
+    return best_rect, best_quality
+
+
+def cell_anchors(rows):
+    """(x, y_center, width) of every segmented cell: text templates start at a cell's left edge."""
+    return [(col[0], col[1] + col[3] // 2, col[2]) for row in rows for col in row.columns]
+
+
+def anchored_match(search_img, template, anchors, slack=ANCHOR_SLACK):
+    """
+    Best match of template with its left edge within slack px of an anchor's x and its
+    centre within slack px of the anchor's y. Only cells about as wide as the template
+    (the same text) are tried. Same return value as best_match.
+    """
+    h, w = template.shape[:2]
+    img_h, img_w = search_img.shape[:2]
+    tolerance = max(8, int(w * WIDTH_TOLERANCE))
+    best_rect, best_quality = None, 0.0
+    for ax, ay, aw in anchors:
+        if abs(aw - w) > tolerance:
+            continue
+        x0, y0 = max(0, ax - slack), max(0, ay - h // 2 - slack)
+        x1, y1 = min(img_w, ax + w + slack), min(img_h, ay - h // 2 + h + slack)
+        if x1 - x0 < w or y1 - y0 < h:
+            continue
+        res = cv2.matchTemplate(search_img[y0:y1, x0:x1], template, cv2.TM_SQDIFF_NORMED)
+        min_val, _, min_loc, _ = cv2.minMaxLoc(res)
+        if best_rect is None or 1.0 - min_val > best_quality:
+            best_rect, best_quality = (min_loc[0] + x0, min_loc[1] + y0, w, h), 1.0 - min_val
+    return best_rect, best_quality
+
+
+def downsample(img, factor, cache=None):
+    """img shrunk by factor (INTER_AREA); cache is an optional {factor: image} dict for one frame."""
+    if cache is not None and factor in cache:
+        return cache[factor]
+    h, w = img.shape[:2]
+    small = cv2.resize(img, (max(1, w // factor), max(1, h // factor)), interpolation=cv2.INTER_AREA)
+    if cache is not None:
+        cache[factor] = small
+    return small
+
+
+def pyramid_match(search_img, template, level, top_k=PYRAMID_TOP_K, cache=None):
+    """
+    Coarse-to-fine best_match: match at 1/2**level resolution, then re-score the top_k
+    coarse candidates at full resolution. Falls back to best_match for level 0 or when the
+    downsampled template would be too small. Same return value as best_match.
+    """
+    h, w = template.shape[:2]
+    factor = 2 ** level
+    if level <= 0 or min(h, w) // factor < MIN_COARSE_SIZE:
+        return best_match(search_img, template)
+    img_h, img_w = search_img.shape[:2]
+    if img_h < h or img_w < w:
+        return None, 0.0
+
+    small_img = downsample(search_img, factor, cache)
+    small_t = downsample(template, factor)
+    res = cv2.matchTemplate(small_img, small_t, cv2.TM_SQDIFF_NORMED)
+    sh, sw = small_t.shape[:2]
+    best_rect, best_quality = None, 0.0
+    for _ in range(top_k):
+        _, _, (cx, cy), _ = cv2.minMaxLoc(res)
+        # Suppress this candidate so the next one is elsewhere
+        res[max(0, cy - sh // 2):cy + sh // 2 + 1, max(0, cx - sw // 2):cx + sw // 2 + 1] = 1.0
+
+        margin = factor + REFINE_MARGIN
+        x0, y0 = max(0, cx * factor - margin), max(0, cy * factor - margin)
+        x1, y1 = min(img_w, cx * factor + w + margin), min(img_h, cy * factor + h + margin)
+        fine = cv2.matchTemplate(search_img[y0:y1, x0:x1], template, cv2.TM_SQDIFF_NORMED)
+        min_val, _, min_loc, _ = cv2.minMaxLoc(fine)
+        if best_rect is None or 1.0 - min_val > best_quality:
+            best_rect, best_quality = (min_loc[0] + x0, min_loc[1] + y0, w, h), 1.0 - min_val
+    return best_rect, best_quality
+
+
+def rescale(template, scale):
+    """template resized by scale (INTER_AREA when shrinking, INTER_LINEAR when enlarging)."""
+    if abs(scale - 1.0) < 1e-3:
+        return np.ascontiguousarray(template)
+    h, w = template.shape[:2]
+    size = (max(1, int(round(w * scale))), max(1, int(round(h * scale))))
+    interpolation = cv2.INTER_AREA if scale < 1.0 else cv2.INTER_LINEAR
+    return cv2.resize(np.ascontiguousarray(template), size, interpolation=interpolation)
+
+
+def estimate_scale(search_img, template, threshold, hints=(), scale_range=SCALE_RANGE):
+    """
+    Scale factor at which template best matches search_img. The hint scales (e.g. the window
+    size / DPI ratio) and 1.0 are tried first; only if none reaches threshold is the coarse
+    grid over scale_range searched. The best candidate is refined on a finer grid.
+    Returns (scale, quality), scale None if no scale reaches threshold.
+    """
+    img_h, img_w = search_img.shape[:2]
+    h, w = template.shape[:2]
+    tried = {}
+
+    def score(scale):
+        scale = round(scale, 3)
+        if scale not in tried:
+            tried[scale] = 0.0
+            if min(h, w) * scale >= MIN_SCALED_SIZE and h * scale <= img_h and w * scale <= img_w:
+                tried[scale] = best_match(search_img, rescale(template, scale))[1]
+        return tried[scale]
+
+    lo, hi = scale_range
+    best = max([1.0] + [s for s in hints if lo <= s <= hi], key=score)
+    if score(best) < threshold:
+        best = max(np.arange(lo, hi + 1e-9, SCALE_STEP), key=score)
+    for scale in np.arange(best - SCALE_STEP, best + SCALE_STEP + 1e-9, SCALE_REFINE_STEP):
+        score(scale)
+    scale, quality = max(tried.items(), key=lambda item: item[1])
+    return (float(scale) if quality >= threshold else None), quality
+
+
+class PyramidLevels:
+    """Pyramid level per template key from {fnmatch pattern: level}, e.g. {"map:*": 1, "status:*": 0}."""
+
+    def __init__(self, patterns=None):
+        self.patterns = dict(patterns or {})
+        self._resolved = {}
+
+    def __call__(self, key):
+        level = self._resolved.get(key)
+        if level is None:
+            level = next((lvl for pattern, lvl in self.patterns.items() if fnmatch.fnmatchcase(key, pattern)), 0)
+            self._resolved[key] = level
+        return level
+
+
+class LocationPredictor:
+    """Last match location per (template key, geometry version) with hit/miss and saved-area counters."""
+
+    def __init__(self, margin=PREDICT_MARGIN, epsilon=PREDICT_EPSILON):
+        self.margin = margin
+        self.epsilon = epsilon
+        self.hits = 0
+        self.misses = 0
+        self.saved_px = 0      # Search positions not evaluated thanks to a hit
+        self._locations = {}   # (key, geometry_version) -> (x, y, quality)
+
+    def forget(self, key=None):
+        """Drop the remembered location of key (all keys if None), e.g. after a scroll or channel switch."""
+        if key is None:
+            self._locations.clear()
+        else:
+            self._locations = {k: v for k, v in self._locations.items() if k[0] != key}
+
+    def match(self, search_img, template, key, geometry_version, threshold, fallback):
+        """
+        Try the predicted window first; on a miss call fallback() (the full search). A window
+        hit counts only if it reaches threshold and scores within epsilon of the remembered
+        quality, so a weaker look-alike in the window never wins over the full search.
+        Returns ((x, y, w, h), quality) like best_match and remembers hits at or above threshold.
+        """
+        h, w = template.shape[:2]
+        img_h, img_w = search_img.shape[:2]
+        location = self._locations.get((key, geometry_version))
+        if location is not None:
+            px, py, expected = location
+            x0, y0 = max(0, px - self.margin), max(0, py - self.margin)
+            x1, y1 = min(img_w, px + w + self.margin), min(img_h, py + h + self.margin)
+            if x1 - x0 >= w and y1 - y0 >= h:
+                res = cv2.matchTemplate(search_img[y0:y1, x0:x1], template, cv2.TM_SQDIFF_NORMED)
+                min_val, _, min_loc, _ = cv2.minMaxLoc(res)
+                quality = 1.0 - min_val
+                if quality >= threshold and quality >= expected - self.epsilon:
+                    self.hits += 1
+                    self.saved_px += (img_w - w + 1) * (img_h - h + 1) - res.size
+                    rect = (min_loc[0] + x0, min_loc[1] + y0, w, h)
+                    self._locations[(key, geometry_version)] = (rect[0], rect[1], quality)
+                    return rect, quality
+        self.misses += 1
+        rect, quality = fallback()
+        if rect is not None and quality >= threshold:
+            self._locations[(key, geometry_version)] = (rect[0], rect[1], quality)
+        else:
+            self._locations.pop((key, geometry_version), None)
+        return rect, quality
+
+    @property
+    def hit_rate(self):
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def stats(self):
+        return {"hits": self.hits, "misses": self.misses, "hit_rate": self.hit_rate,
+                "saved_px": self.saved_px, "locations": len(self._locations)}
+
+
+class MultiTemplateMatcher:
+    """Matches many templates against one frame, sharing the search image and candidate rows."""
+
+    def __init__(self, levels=None, predictor=None):
+        self.levels = levels if levels is not None else PyramidLevels()
+        self.predictor = predictor
+        self.frames = 0
+        self.template_calls = 0
+
+    def match(self, image, templates, threshold, rows=None, geometry_version=0):
+        """
+        templates: {key: template}. rows: RowBox list from segment_rows (None = whole image,
+        tried at the predicted location first when a LocationPredictor is attached).
+        Returns [(key, (x, y, w, h), quality)] for every template reaching threshold, best first.
+        """
+        self.frames += 1
+        anchors = cell_anchors(rows) if rows else None
+        hits = []
+        search_imgs = {}       # Converted once per template layout (gray / colour)
+        pyramids = {}          # Downsampled search images per layout, shared by the templates
+        for key, template in templates.items():
+            search_img = search_imgs.get(template.ndim)
+            if search_img is None:
+                search_img = search_imgs[template.ndim] = to_search_image(image, template)
+            try:
+                if anchors:
+                    rect, quality = anchored_match(search_img, template, anchors)
+                else:
+                    full_search = functools.partial(pyramid_match, search_img, template, self.levels(key),
+                                                    cache=pyramids.setdefault(template.ndim, {}))
+                    if self.predictor is not None:
+                        rect, quality = self.predictor.match(search_img, template, key, geometry_version,
+                                                             threshold, full_search)
+                    else:
+                        rect, quality = full_search()
+            except Exception as e:
+                print(f"Template match error for {key}: {e}")
+                continue
+            self.template_calls += 1
+            if rect is not None and quality >= threshold:
+                hits.append((key, rect, quality))
+        hits.sort(key=lambda hit: hit[2], reverse=True)
+        return hits
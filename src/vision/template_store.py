@@ -0,0 +1,403 @@
+"""
+On-disk template store.
+
+Every template is its own .npy file, opened lazily with mmap_mode="r" the
+first time it is looked up. index.json records per key the file, source
+window resolution, capture time, hit count, last match confidence and last
+use. The store is bounded by template count and total bytes; the least
+recently used templates are evicted (file and index entry) first.
+
+Templates are partitioned by window size and DPI ("1280x720@96"): text
+captured at one client resolution or UI scale does not match at another.
+The mapping interface works on the active partition (set_partition); other
+partitions stay on disk as sources for rescaled templates, together with the
+scale factor measured between two partitions.
+
+A root directory has exactly one writer per process: open_template_store()
+hands every worker (one per game client) a TemplateStore with its own active
+partition over the same shared index and files, so clients learn from each
+other instead of overwriting each other's index.json.
+
+TemplateStore is a MutableMapping, so it can stand in for the plain
+dynamic_templates dict; root=None keeps everything in memory.
+"""
+
+import collections
+import json
+import os
+import re
+import threading
+import time
+import zlib
+from collections.abc import MutableMapping
+
+import numpy as np
+
+INDEX_FILE = "index.json"
+INDEX_VERSION = 2
+MAX_TEMPLATES = 256
+MAX_BYTES = 32 * 1024 * 1024   # Total template pixels kept on disk
+MAX_LOADED = 64                # Templates kept open (memory-mapped) at once
+INDEX_FLUSH_INTERVAL = 5.0     # Seconds between index rewrites caused by puts/hits
+DEFAULT_PARTITION = "default"  # Templates of unknown geometry (legacy cache, no window yet)
+
+_stores = {}                   # abspath(root) -> _StoreFiles shared by every TemplateStore on that root
+_stores_lock = threading.Lock()
+
+
+def partition_key(size, dpi=96):
+    """Partition name for a (width, height) window at dpi, e.g. "1280x720@96"."""
+    if not size:
+        return DEFAULT_PARTITION
+    return f"{int(size[0])}x{int(size[1])}@{int(dpi)}"
+
+
+def parse_partition(partition):
+    """((width, height), dpi) of a partition name, or (None, None) for DEFAULT_PARTITION."""
+    match = re.fullmatch(r"(\d+)x(\d+)@(\d+)", partition)
+    if not match:
+        return None, None
+    w, h, dpi = map(int, match.groups())
+    return (w, h), dpi
+
+
+def _file_name(partition, key):
+    """Fresh file name per put: a mapped file is never overwritten in place (Windows cannot replace it)."""
+    safe = re.sub(r"[^0-9A-Za-z_-]+", "_", key).strip("_")[:40] or "template"
+    crc = zlib.crc32(f"{partition}/{key}".encode("utf-8"))
+    return f"{safe}_{crc:08x}_{time.time_ns() % 10 ** 12:012d}.npy"
+
+
+def open_template_store(root, max_templates=MAX_TEMPLATES, max_bytes=MAX_BYTES, max_loaded=MAX_LOADED):
+    """
+    TemplateStore on root sharing the index and files with every other store opened on the
+    same root in this process (the limits of the first opener apply).
+    """
+    key = os.path.abspath(root)
+    with _stores_lock:
+        files = _stores.get(key)
+        if files is None:
+            files = _stores[key] = _StoreFiles(root, max_templates, max_bytes, max_loaded)
+    return TemplateStore(files=files)
+
+
+class _StoreFiles:
+    """Index, scale table and loaded arrays of one store root (shared by its TemplateStore views)."""
+
+    def __init__(self, root, max_templates, max_bytes, max_loaded):
+        self.root = root
+        self.max_templates = max_templates
+        self.max_bytes = max_bytes
+        self.max_loaded = max_loaded
+        self.loads = 0
+        self.evictions = 0
+        self.index = {}                             # partition -> {key -> metadata dict}
+        self.scales = {}                            # "source>target" partition -> template scale factor
+        self.loaded = collections.OrderedDict()     # (partition, key) -> array, most recently used last
+        self.lock = threading.RLock()
+        self.dirty = False
+        self.flushed_at = time.monotonic()
+        self.last_stamp = 0.0
+        if root is not None:
+            os.makedirs(root, exist_ok=True)
+            self.read_index()
+
+    def read_index(self):
+        path = os.path.join(self.root, INDEX_FILE)
+        if not os.path.exists(path):
+            return
+        try:
+            index_mtime = os.path.getmtime(path)
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("version", 1) < 2:
+                partitions = {DEFAULT_PARTITION: data.get("templates", {})}
+            else:
+                partitions = data.get("partitions", {})
+                self.scales = data.get("scales", {})
+            # Entries whose file vanished are dropped
+            for partition, entries in partitions.items():
+                entries = {k: v for k, v in entries.items() if os.path.exists(os.path.join(self.root, v["file"]))}
+                if entries:
+                    self.index[partition] = entries
+        except Exception as e:
+            print(f"Failed to read template index: {e}")
+            self.index = {}
+            return
+        # Files left behind by replaced or evicted templates that were still mapped at the time.
+        # Only files older than the index: newer ones may belong to a writer that has not flushed yet.
+        referenced = {entry["file"] for entries in self.index.values() for entry in entries.values()}
+        for name in os.listdir(self.root):
+            if name.endswith(".npy") and name not in referenced:
+                try:
+                    if os.path.getmtime(os.path.join(self.root, name)) < index_mtime:
+                        self.remove_file({"file": name})
+                except OSError:
+                    pass
+
+    def flush(self, force=True):
+        with self.lock:
+            if self.root is None or not self.dirty:
+                return
+            if not force and time.monotonic() - self.flushed_at < INDEX_FLUSH_INTERVAL:
+                return
+            data = {"version": INDEX_VERSION, "partitions": self.index, "scales": self.scales}
+            path = os.path.join(self.root, INDEX_FILE)
+            tmp = path + ".tmp"
+            try:
+                with open(tmp, "w", encoding="utf-8") as f:
+                    json.dump(data, f, ensure_ascii=False, indent=1)
+                os.replace(tmp, path)
+                self.dirty = False
+                self.flushed_at = time.monotonic()
+            except Exception as e:
+                print(f"Failed to write template index: {e}")
+
+    def stamp(self):
+        """Strictly increasing wall-clock time, so LRU order survives coarse clocks."""
+        self.last_stamp = max(time.time(), self.last_stamp + 1e-6)
+        return self.last_stamp
+
+    def load(self, partition, key):
+        entry = self.index.get(partition, {})[key]
+        array = self.loaded.get((partition, key))
+        if array is None:
+            array = np.load(os.path.join(self.root, entry["file"]), mmap_mode="r")
+            self.loads += 1
+            self.remember((partition, key), array)
+        self.loaded.move_to_end((partition, key))
+        entry["last_used"] = self.stamp()
+        return array
+
+    def remember(self, slot, array):
+        self.loaded[slot] = array
+        while len(self.loaded) > self.max_loaded:
+            self.loaded.popitem(last=False)
+
+    def evict(self):
+        slots = sorted((entry["last_used"], partition, key) for partition, entries in self.index.items()
+                       for key, entry in entries.items())
+        total = sum(self.index[partition][key]["bytes"] for _, partition, key in slots)
+        count = len(slots)
+        for _, partition, key in slots:
+            if count <= self.max_templates and total <= self.max_bytes:
+                break
+            entry = self.index[partition].pop(key)
+            if not self.index[partition]:
+                del self.index[partition]
+            self.loaded.pop((partition, key), None)
+            self.remove_file(entry)
+            total -= entry["bytes"]
+            count -= 1
+            self.evictions += 1
+
+    def remove_file(self, entry):
+        if self.root is None:
+            return
+        try:
+            os.remove(os.path.join(self.root, entry["file"]))
+        except OSError:
+            pass
+
+
+class TemplateStore(MutableMapping):
+    """Lazily loaded, size-bounded template cache backed by one .npy per template."""
+
+    def __init__(self, root=None, max_templates=MAX_TEMPLATES, max_bytes=MAX_BYTES, max_loaded=MAX_LOADED,
+                 files=None):
+        self._files = files if files is not None else _StoreFiles(root, max_templates, max_bytes, max_loaded)
+        self.partition = DEFAULT_PARTITION
+
+    @property
+    def root(self):
+        return self._files.root
+
+    # --- Index ---
+
+    def flush(self, force=True):
+        """Write index.json if anything changed (always when force, else at most every INDEX_FLUSH_INTERVAL)."""
+        self._files.flush(force)
+
+    def metadata(self, key, partition=None):
+        """Copy of the index entry for key (active partition if None), or None."""
+        files = self._files
+        with files.lock:
+            entry = files.index.get(partition or self.partition, {}).get(key)
+            return dict(entry) if entry is not None else None
+
+    # --- Partitions ---
+
+    def set_partition(self, partition):
+        """
+        Make partition the active one. Templates of DEFAULT_PARTITION (legacy cache, captured
+        before any geometry was known) are adopted by the first real partition activated.
+        """
+        files = self._files
+        with files.lock:
+            if partition != DEFAULT_PARTITION and partition not in files.index \
+                    and DEFAULT_PARTITION in files.index:
+                files.index[partition] = files.index.pop(DEFAULT_PARTITION)
+                for slot in [slot for slot in files.loaded if slot[0] == DEFAULT_PARTITION]:
+                    files.loaded[(partition, slot[1])] = files.loaded.pop(slot)
+                files.dirty = True
+            self.partition = partition
+
+    def partitions(self):
+        """{partition: template count}."""
+        files = self._files
+        with files.lock:
+            return {partition: len(entries) for partition, entries in files.index.items()}
+
+    def source_partition(self, key):
+        """
+        Best other partition holding key to rescale from: same DPI first, then the closest
+        window size, then the most hits. None if no other partition has it.
+        """
+        files = self._files
+        with files.lock:
+            size, dpi = parse_partition(self.partition)
+            candidates = []
+            for partition, entries in files.index.items():
+                if partition == self.partition or key not in entries:
+                    continue
+                p_size, p_dpi = parse_partition(partition)
+                if size and p_size:
+                    distance = abs(np.log((p_size[0] * p_size[1]) / (size[0] * size[1])))
+                else:
+                    distance = float("inf")
+                candidates.append((p_dpi != dpi, distance, -entries[key]["hits"], partition))
+            return min(candidates)[3] if candidates else None
+
+    def get_in(self, partition, key):
+        """Template key of another partition (loaded lazily); KeyError if missing."""
+        with self._files.lock:
+            return self._files.load(partition, key)
+
+    def scale(self, source, target=None):
+        """Cached template scale factor from partition source to target (active if None), or None."""
+        files = self._files
+        with files.lock:
+            return files.scales.get(f"{source}>{target or self.partition}")
+
+    def set_scale(self, source, scale, target=None):
+        files = self._files
+        with files.lock:
+            files.scales[f"{source}>{target or self.partition}"] = float(scale)
+            files.dirty = True
+
+    # --- Mapping interface (active partition) ---
+
+    def __contains__(self, key):
+        with self._files.lock:
+            return key in self._files.index.get(self.partition, {})
+
+    def __len__(self):
+        with self._files.lock:
+            return len(self._files.index.get(self.partition, {}))
+
+    def __iter__(self):
+        with self._files.lock:
+            return iter(list(self._files.index.get(self.partition, {})))
+
+    def __getitem__(self, key):
+        with self._files.lock:
+            return self._files.load(self.partition, key)
+
+    def __setitem__(self, key, image):
+        self.put(key, image)
+
+    def __delitem__(self, key):
+        files = self._files
+        with files.lock:
+            entry = files.index.get(self.partition, {}).pop(key)
+            files.loaded.pop((self.partition, key), None)
+            files.remove_file(entry)
+            files.dirty = True
+
+    def loaded_items(self):
+        """[(key, array)] of the active partition's loaded templates, without loading others."""
+        with self._files.lock:
+            return [(key, array) for (partition, key), array in self._files.loaded.items()
+                    if partition == self.partition]
+
+    # --- Store operations ---
+
+    def put(self, key, image, resolution=None, **extra):
+        """
+        Store image under key in the active partition (replacing it), recording the source
+        window resolution (w, h) and any extra metadata (e.g. scale / derived_from of rescaled templates).
+        """
+        image = np.ascontiguousarray(image)
+        files = self._files
+        with files.lock:
+            partition = self.partition
+            entries = files.index.setdefault(partition, {})
+            old = entries.get(key)
+            entry = {
+                "file": _file_name(partition, key),
+                "shape": list(image.shape),
+                "dtype": str(image.dtype),
+                "bytes": int(image.nbytes),
+                "resolution": list(resolution) if resolution else None,
+                "captured_at": time.time(),
+                "last_used": files.stamp(),
+                "hits": old["hits"] if old else 0,
+                "last_confidence": old.get("last_confidence") if old else None,
+            }
+            entry.update(extra)
+            if files.root is not None:
+                path = os.path.join(files.root, entry["file"])
+                tmp = path[:-len(".npy")] + ".tmp.npy"
+                np.save(tmp, image)
+                os.replace(tmp, path)
+                files.loaded.pop((partition, key), None)
+                if old:
+                    files.remove_file(old)
+                files.remember((partition, key), np.load(path, mmap_mode="r"))
+            else:
+                files.loaded[(partition, key)] = image
+            entries[key] = entry
+            files.dirty = True
+            files.evict()
+        files.flush(force=False)
+
+    def record_hit(self, key, confidence):
+        """Count a successful match of key and remember its confidence."""
+        files = self._files
+        with files.lock:
+            entry = files.index.get(self.partition, {}).get(key)
+            if entry is None:
+                return
+            entry["hits"] += 1
+            entry["last_confidence"] = float(confidence)
+            entry["last_used"] = files.stamp()
+            files.dirty = True
+
+    def migrate_pickle(self, path, resolution=None):
+        """Import a legacy dynamic_templates.pkl once; the pickle is renamed to *.migrated. Returns the count."""
+        # Under the shared lock: workers of several clients may start at once
+        with self._files.lock:
+            if not os.path.exists(path):
+                return 0
+            try:
+                import pickle
+                with open(path, "rb") as f:
+                    legacy = pickle.load(f)
+                for key, image in legacy.items():
+                    if key not in self:
+                        self.put(key, image, resolution)
+                os.replace(path, path + ".migrated")
+                self.flush()
+                return len(legacy)
+            except Exception as e:
+                print(f"Failed to migrate template pickle: {e}")
+                return 0
+
+    def stats(self):
+        files = self._files
+        with files.lock:
+            entries = [entry for part in files.index.values() for entry in part.values()]
+            return {"partition": self.partition, "partitions": len(files.index),
+                    "templates": len(files.index.get(self.partition, {})), "total": len(entries),
+                    "loaded": len(files.loaded), "bytes": sum(e["bytes"] for e in entries),
+                    "loads": files.loads, "evictions": files.evictions}
@@ -0,0 +1,80 @@
+import time
+
+import numpy as np
+
+from capture.capture_hub import CaptureHub
+from capture.frame_source import ReplayFrameSource, save_recording
+
+
+def make_hub(tmp_path, count=5):
+    path = tmp_path / "session.npz"
+    frames = [np.full((40, 60, 3), i, dtype=np.uint8) for i in range(count)]
+    save_recording(path, frames)
+    return CaptureHub(ReplayFrameSource(str(path)))
+
+
+def test_subscribers_share_read_only_frames_with_own_regions(tmp_path):
+    hub = make_hub(tmp_path)
+    full = hub.subscribe("full")
+    roi = hub.subscribe("roi", {"left": 10, "top": 5, "width": 20, "height": 10})
+    hub.start()
+    try:
+        frame = full.get(timeout=2.0)
+        assert frame is not None
+        assert not frame.image.flags.writeable
+        assert full.view(frame).shape == (40, 60, 3)
+
+        roi_frame = roi.get(timeout=2.0)
+        view = roi.view(roi_frame)
+        assert view.shape == (10, 20, 3)
+        assert np.shares_memory(view, roi_frame.image)
+    finally:
+        hub.stop()
+
+
+def test_slow_subscriber_counts_drops(tmp_path):
+    hub = make_hub(tmp_path)
+    slow = hub.subscribe("slow")
+    hub.start()
+    try:
+        time.sleep(0.2)
+        frame = slow.get(timeout=1.0)
+        stats = hub.stats()["slow"]
+        assert stats["dropped"] > 0
+        assert frame.seq <= hub.latest.seq
+    finally:
+        hub.stop()
+
+
+def test_paced_hub_reports_achieved_fps(tmp_path):
+    path = tmp_path / "session.npz"
+    save_recording(path, [np.zeros((20, 20, 3), dtype=np.uint8)] * 3)
+    hub = CaptureHub(ReplayFrameSource(str(path)), target_fps=20)
+    sub = hub.subscribe("worker")
+    hub.start()
+    try:
+        for _ in range(8):
+            assert sub.get(timeout=1.0) is not None
+        fps = hub.fps_stats()
+        assert fps["target_fps"] == 20
+        assert 10 < fps["achieved_fps"] < 30
+    finally:
+        hub.stop()
+
+
+def test_subscriber_reuses_last_frame_when_source_goes_static(tmp_path):
+    path = tmp_path / "session.npz"
+    save_recording(path, [np.full((20, 20, 3), i, dtype=np.uint8) for i in range(2)])
+    hub = CaptureHub(ReplayFrameSource(str(path), loop=False))   # Stops producing after 2 frames
+    sub = hub.subscribe("worker")
+    hub.start()
+    try:
+        time.sleep(0.2)
+        frame = sub.get_or_last(timeout=1.0)
+        assert frame is not None
+        assert sub.get(timeout=0.2) is None                       # Nothing new is published
+        for _ in range(3):
+            assert sub.get_or_last(timeout=0.05) is frame         # Ticks keep running on it
+        assert hub.running
+    finally:
+        hub.stop()
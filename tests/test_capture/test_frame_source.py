@@ -0,0 +1,138 @@
+import json
+
+import cv2
+import numpy as np
+import pytest
+
+from capture.frame_source import MssFrameSource, ReplayFrameSource, create_frame_source, save_recording
+from capture.window_frame import WindowFrame
+
+
+def make_frames(count, h=40, w=60):
+    return [np.full((h, w, 3), i * 10, dtype=np.uint8) for i in range(count)]
+
+
+def test_replay_npz_serves_frames_in_order(tmp_path):
+    path = tmp_path / "session.npz"
+    save_recording(path, make_frames(3), timestamps=[1.0, 1.5, 2.0])
+
+    with ReplayFrameSource(str(path), loop=False) as source:
+        assert source.get_window_rect() == (0, 0, 60, 40)
+        values = []
+        while True:
+            frame = source.grab(source.get_window_rect())
+            if frame is None:
+                break
+            values.append(int(frame[0, 0, 0]))
+            assert source.last_timestamp in (1.0, 1.5, 2.0)
+
+    assert values == [0, 10, 20]
+    assert source.exhausted
+
+
+def test_replay_crops_region_relative_to_origin(tmp_path):
+    frame = np.zeros((40, 60, 3), dtype=np.uint8)
+    frame[10:20, 30:40] = 255
+    path = tmp_path / "session.npz"
+    save_recording(path, [frame])
+
+    with ReplayFrameSource(str(path), origin=(100, 200)) as source:
+        crop = source.grab((130, 210, 140, 220))
+
+    assert crop.shape == (10, 10, 3)
+    assert crop.min() == 255
+
+
+def test_replay_directory_uses_timestamp_index(tmp_path):
+    for i, frame in enumerate(make_frames(2)):
+        cv2.imwrite(str(tmp_path / f"frame_{i}.png"), frame)
+    (tmp_path / "timestamps.json").write_text(json.dumps({"frame_0.png": 5.0, "frame_1.png": 5.2}))
+
+    source = create_frame_source({"capture_backend": "replay", "replay_path": str(tmp_path), "replay_loop": False})
+    with source:
+        rect = source.get_window_rect()
+        assert source.grab(rect)[0, 0, 0] == 0
+        assert source.grab(rect)[0, 0, 0] == 10
+        assert source.last_timestamp == pytest.approx(5.2)
+
+
+def test_unknown_backend_is_rejected():
+    with pytest.raises(ValueError):
+        create_frame_source({"capture_backend": "vnc"})
+
+
+def test_grab_window_crops_are_views_of_one_grab(tmp_path):
+    frame = np.zeros((40, 60, 3), dtype=np.uint8)
+    frame[10:20, 30:40] = 255
+    path = tmp_path / "session.npz"
+    save_recording(path, [frame], timestamps=[3.0])
+
+    with ReplayFrameSource(str(path), origin=(100, 200)) as source:
+        window = source.grab_window()
+
+    assert window.window_rect == (100, 200, 160, 240) and window.timestamp == 3.0
+    crop = window.crop({"left": 30, "top": 10, "width": 10, "height": 10})
+    assert crop.shape == (10, 10, 3) and crop.min() == 255
+    assert np.shares_memory(crop, window.image)
+
+
+def test_window_crop_is_clamped_to_the_frame():
+    window = WindowFrame(np.zeros((40, 60, 3), dtype=np.uint8), (0, 0, 60, 40), 0.0)
+
+    assert window.crop({"left": -5, "top": 30, "width": 20, "height": 50}).shape == (10, 15, 3)
+    assert window.crop({"left": 70, "top": 0, "width": 10, "height": 10}) is None
+    assert window.crop({"left": 10, "top": 10, "width": 0, "height": 5}) is None
+
+
+class FakeShot:
+    def __init__(self, width, height, value):
+        self.width, self.height = width, height
+        self.raw = bytearray(np.full((height, width, 4), value, dtype=np.uint8).tobytes())
+
+
+class FakeMss:
+    """Stands in for mss.mss(): grab() returns a BGRA shot of the requested size."""
+
+    def __init__(self):
+        self.grabs = 0
+
+    def grab(self, monitor):
+        self.grabs += 1
+        return FakeShot(monitor["width"], monitor["height"], self.grabs * 10)
+
+    def close(self):
+        pass
+
+
+def _mss_source(reuse_buffer):
+    source = MssFrameSource(reuse_buffer=reuse_buffer)
+    source.sct = FakeMss()
+    source.is_open = True
+    return source
+
+
+def test_mss_reuses_one_bgr_buffer_per_size():
+    source = _mss_source(reuse_buffer=True)
+
+    first = source.grab((0, 0, 60, 40))
+    first_value = int(first[0, 0, 0])
+    second = source.grab((0, 0, 60, 40))
+    assert second is first and second.shape == (40, 60, 3)
+    assert first_value == 10 and int(second[0, 0, 0]) == 20   # Same buffer, overwritten in place
+    assert source.stats.allocations == 1
+
+    resized = source.grab((0, 0, 80, 30))
+    assert resized is not first and resized.shape == (30, 80, 3)
+    assert source.stats.allocations == 2
+
+    stats = source.stats.snapshot()
+    assert stats["frames"] == 3 and stats["grab_ms"] >= 0.0 and stats["convert_ms"] >= 0.0
+
+
+def test_mss_without_reuse_allocates_every_frame():
+    source = _mss_source(reuse_buffer=False)
+
+    first = source.grab((0, 0, 60, 40))
+    second = source.grab((0, 0, 60, 40))
+    assert second is not first and int(first[0, 0, 0]) == 10
+    assert source.stats.allocations == 2 and source.stats.frames == 2
@@ -0,0 +1,38 @@
+import numpy as np
+import pytest
+
+from capture.shm_ring import SharedFrameRing
+
+
+@pytest.fixture
+def ring():
+    ring = SharedFrameRing.for_window(rect=(0, 0, 8, 6), slots=2)
+    yield ring
+    ring.close()
+    ring.unlink()
+
+
+def test_attached_reader_sees_written_frames_without_copy(ring):
+    frame = np.full((6, 8, 3), 7, dtype=np.uint8)
+    seq = ring.write(frame, timestamp=1.5)
+
+    reader = SharedFrameRing.attach(ring.name)
+    got_seq, timestamp, view = reader.read()
+    assert (got_seq, timestamp) == (seq, 1.5)
+    assert view.shape == (6, 8, 3) and not view.flags.writeable
+    assert np.array_equal(view, frame)
+    del view
+    reader.close()
+
+
+def test_lapped_slot_is_reported_invalid(ring):
+    first = ring.write(np.zeros((6, 8, 3), dtype=np.uint8))
+    ring.write(np.zeros((4, 4, 3), dtype=np.uint8))
+    assert ring.is_valid(first)
+    ring.write(np.ones((6, 8, 3), dtype=np.uint8))
+    assert not ring.is_valid(first)
+    assert ring.read(first) is None
+    assert ring.read()[2].shape == (6, 8, 3)
+
+    with pytest.raises(ValueError):
+        ring.write(np.zeros((7, 8, 3), dtype=np.uint8))
@@ -0,0 +1,134 @@
+import time
+
+import numpy as np
+import pytest
+
+from capture.frame_source import FrameSource, create_frame_source
+from capture.supervisor import CaptureSupervisor
+
+
+class FlakyFrameSource(FrameSource):
+    """Fake backend that raises on open()/grab() according to a script."""
+
+    def __init__(self, name, grab_failures=0, open_failures=0, always_fail=False):
+        super().__init__()
+        self.name = name
+        self.grab_failures = grab_failures
+        self.open_failures = open_failures
+        self.always_fail = always_fail
+        self.opens = 0
+        self.grabs = 0
+
+    def open(self):
+        self.opens += 1
+        if self.open_failures:
+            self.open_failures -= 1
+            raise RuntimeError(f"{self.name} device lost")
+        super().open()
+
+    def get_window_rect(self):
+        return (0, 0, 8, 8)
+
+    def grab(self, region):
+        self.grabs += 1
+        if self.always_fail or self.grab_failures:
+            self.grab_failures = max(0, self.grab_failures - 1)
+            raise RuntimeError(f"{self.name} access lost")
+        self.last_timestamp = time.time()
+        return np.zeros((8, 8, 3), dtype=np.uint8)
+
+
+def test_backoff_spaces_out_reinit_attempts():
+    backend = FlakyFrameSource("fake", always_fail=True)
+    supervisor = CaptureSupervisor([backend], backoff_base=0.05, backoff_max=1.0)
+    supervisor.open()
+
+    for _ in range(50):
+        assert supervisor.grab((0, 0, 8, 8)) is None
+    # First failure closes the device; further grabs wait out the backoff instead of hammering it
+    assert backend.grabs == 1
+    assert supervisor.health()["backoff"] > 0
+
+    time.sleep(0.06)
+    assert supervisor.grab((0, 0, 8, 8)) is None
+    assert supervisor.reinit_count == 1
+    assert supervisor.consecutive_failures == 2
+    assert supervisor.health()["backoff"] > 0.05  # Doubled
+
+
+def test_recovers_after_transient_failure():
+    backend = FlakyFrameSource("fake", grab_failures=1, open_failures=0)
+    supervisor = CaptureSupervisor([backend], backoff_base=0.0)
+    supervisor.open()
+
+    assert supervisor.grab((0, 0, 8, 8)) is None
+    assert supervisor.grab((0, 0, 8, 8)) is not None
+    health = supervisor.health()
+    assert health["reinit_count"] == 1
+    assert health["failover_count"] == 0
+    assert health["time_to_first_frame"] is not None
+
+
+def test_fails_over_to_next_backend():
+    primary = FlakyFrameSource("dxcam", always_fail=True)
+    fallback = FlakyFrameSource("mss")
+    supervisor = CaptureSupervisor([primary, fallback], backoff_base=0.0, failover_threshold=3)
+    supervisor.open()
+
+    frames = [supervisor.grab_window() for _ in range(6)]
+    assert supervisor.name == "mss"
+    assert frames[-1] is not None and frames[-1].image.shape == (8, 8, 3)
+    assert not primary.is_open
+    health = supervisor.health()
+    assert health["failover_count"] == 1
+    assert health["reinit_count"] >= 2
+
+
+def test_open_skips_dead_backend_and_raises_when_none_work():
+    supervisor = CaptureSupervisor([FlakyFrameSource("dxcam", open_failures=1), FlakyFrameSource("mss")])
+    supervisor.open()
+    assert supervisor.name == "mss"
+
+    dead = CaptureSupervisor([FlakyFrameSource("dxcam", open_failures=5)])
+    with pytest.raises(RuntimeError):
+        dead.open()
+
+
+def test_factory_adds_default_fallbacks():
+    source = create_frame_source({"capture_backend": "dxcam"})
+    assert [b.name for b in source.backends] == ["dxcam", "mss"]
+    bare = create_frame_source({"capture_backend": "mss", "capture_supervised": False})
+    assert not isinstance(bare, CaptureSupervisor)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_backoff_keeps_growing_when_every_backend_fails(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(time, "monotonic", clock)
+    primary = FlakyFrameSource("dxcam", always_fail=True)
+    fallback = FlakyFrameSource("mss", always_fail=True)
+    supervisor = CaptureSupervisor([primary, fallback], backoff_base=0.25, backoff_max=8.0,
+                                   failure_window=1e6, failover_threshold=3)
+    supervisor.open()
+
+    delays = []
+    for _ in range(12):
+        supervisor.grab((0, 0, 8, 8))
+        delays.append(supervisor.health()["backoff"])
+        clock.now += 100.0                            # Wait out every backoff
+    assert supervisor.failover_count >= 3
+    assert delays[2] == 0.0                           # First switch to the untried mss is immediate
+    later = delays[3:]
+    assert later == sorted(later)                     # Failovers no longer reset the delay
+    assert later[-1] == 8.0
+
+    fallback.always_fail = primary.always_fail = False
+    assert supervisor.grab((0, 0, 8, 8)) is not None
+    assert supervisor.chain_failures == 0
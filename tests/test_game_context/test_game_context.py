@@ -0,0 +1,133 @@
+import time
+
+from game_context import DEFAULT_CLIENT_ID, GameContext, GameContextRegistry, WindowBackend
+
+
+class FakeWindowBackend(WindowBackend):
+    """In-memory window table standing in for user32."""
+
+    def __init__(self):
+        self.windows = {}   # pid -> (hwnd, rect)
+        self.calls = {"find_window": 0, "is_window": 0, "get_window_rect": 0}
+
+    def find_window(self, pid):
+        self.calls["find_window"] += 1
+        entry = self.windows.get(pid)
+        return entry[0] if entry else None
+
+    def is_window(self, hwnd):
+        self.calls["is_window"] += 1
+        return any(h == hwnd for h, _ in self.windows.values())
+
+    def get_window_rect(self, hwnd):
+        self.calls["get_window_rect"] += 1
+        for h, rect in self.windows.values():
+            if h == hwnd:
+                return rect
+        return None
+
+
+def test_rect_is_cached_until_ttl_or_invalidate():
+    backend = FakeWindowBackend()
+    backend.windows[42] = (7, (0, 0, 800, 600))
+    context = GameContext(backend=backend, geometry_ttl=60.0)
+    context.set_process(42)
+
+    for _ in range(10):
+        assert context.get_window_rect() == (0, 0, 800, 600)
+    assert backend.calls["get_window_rect"] == 1
+
+    backend.windows[42] = (7, (10, 0, 810, 600))
+    assert context.get_window_rect() == (0, 0, 800, 600)
+    context.invalidate()
+    assert context.get_window_rect() == (10, 0, 810, 600)
+
+
+def test_version_only_changes_on_real_moves_and_notifies_listeners():
+    backend = FakeWindowBackend()
+    backend.windows[1] = (5, (0, 0, 100, 100))
+    context = GameContext(backend=backend, geometry_ttl=0.0)
+    events = []
+    context.add_geometry_listener(lambda rect, version: events.append((rect, version)))
+    context.set_process(1)
+
+    context.get_window_rect()
+    version = context.geometry_version
+    for _ in range(5):
+        context.get_window_rect()
+    assert context.geometry_version == version
+
+    backend.windows[1] = (5, (0, 0, 200, 100))
+    context.get_window_rect()
+    assert context.geometry_version == version + 1
+    assert events[-1] == ((0, 0, 200, 100), version + 1)
+
+
+def test_dpi_is_read_with_each_geometry_change():
+    backend = FakeWindowBackend()
+    backend.windows[1] = (5, (0, 0, 100, 100))
+    context = GameContext(backend=backend, geometry_ttl=0.0)
+    context.set_process(1)
+    context.get_window_rect()
+    assert context.dpi == 96
+
+    # Moved to a 150% monitor: the window is resized and the listener sees the new DPI
+    backend.get_window_dpi = lambda hwnd: 144
+    seen = []
+    context.add_geometry_listener(lambda rect, version: seen.append(context.dpi))
+    backend.windows[1] = (5, (0, 0, 150, 150))
+    context.get_window_rect()
+    assert seen == [144]
+
+
+def test_lost_window_is_rescanned_at_most_once_per_ttl():
+    backend = FakeWindowBackend()
+    context = GameContext(backend=backend, geometry_ttl=0.05)
+    context.set_process(9)
+    scans = backend.calls["find_window"]
+
+    for _ in range(20):
+        assert context.get_window_rect() is None
+    assert backend.calls["find_window"] == scans + 1
+
+    backend.windows[9] = (3, (0, 0, 10, 10))
+    time.sleep(0.06)
+    assert context.get_window_rect() == (0, 0, 10, 10)
+
+
+def test_registry_tracks_each_client_separately():
+    backend = FakeWindowBackend()
+    backend.windows[100] = (1, (0, 0, 800, 600))
+    backend.windows[200] = (2, (800, 0, 1600, 600))
+    registry = GameContextRegistry(backend=backend)
+
+    first = registry.register(100)
+    second = registry.register(200)
+    assert first != second
+    assert registry.get(first).get_window_rect() == (0, 0, 800, 600)
+    assert registry.get(second).get_window_rect() == (800, 0, 1600, 600)
+    assert registry.get(None) is registry.get(DEFAULT_CLIENT_ID)
+    assert registry.get(None).get_window_rect() is None
+
+    registry.remove(first)
+    assert first not in registry.client_ids()
+
+
+def test_registry_deduplicates_clients_by_process():
+    backend = FakeWindowBackend()
+    backend.windows[10] = (100, (0, 0, 800, 600))
+    backend.windows[20] = (200, (800, 0, 1600, 600))
+    registry = GameContextRegistry(backend=backend)
+
+    first = registry.register(10)
+    second = registry.register(20)
+    assert registry.register(10) == first               # Same process keeps its client
+    assert first != second
+
+    registry.get().set_process(20)                      # Default follows the latest launch
+    assert registry.resolve(None) == second
+    assert registry.resolve(DEFAULT_CLIENT_ID) == second
+    assert registry.resolve(first) == first
+
+    registry.get().set_process(30)                      # Not launched through the registry
+    assert registry.resolve(None) is None
@@ -0,0 +1,39 @@
+import numpy as np
+
+from ocr.batch import recognize_batch
+
+
+class FakeRecognizer:
+    def __init__(self):
+        self.batches = []
+
+    def resize_norm_img(self, img, max_wh_ratio):
+        # Encode the crop's mean so the fake decoder can tell crops apart
+        out = np.zeros((3, 8, int(8 * max_wh_ratio)), dtype=np.float32)
+        out[0, 0, 0] = img.mean()
+        return out
+
+    def session(self, batch):
+        self.batches.append(batch.shape)
+        return [batch]
+
+    def postprocess_op(self, preds):
+        return [(f"crop{int(p[0, 0, 0])}", 0.9) for p in preds]
+
+
+class FakeEngine:
+    def __init__(self):
+        self.text_recognizer = FakeRecognizer()
+
+
+def test_all_crops_resolved_in_one_padded_batch_in_input_order():
+    engine = FakeEngine()
+    crops = [np.full((10, 10 * (i + 1)), i, dtype=np.uint8) for i in range(5)]
+    crops.insert(2, np.zeros((0, 10), dtype=np.uint8))
+
+    results, _ = recognize_batch(engine, crops)
+
+    assert [t for t, _ in results] == ["crop0", "crop1", "", "crop2", "crop3", "crop4"]
+    assert results[2] == ("", 0.0)
+    # One session call, every crop padded to the widest aspect ratio (5:1)
+    assert engine.text_recognizer.batches == [(5, 3, 8, 40)]
@@ -0,0 +1,67 @@
+import time
+
+import numpy as np
+
+from ocr.cache import CachedOcr, OcrCache, perceptual_hash
+
+
+class CountingOcr:
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self, image):
+        self.calls += 1
+        time.sleep(0.005)
+        return [([[0, 0], [1, 0], [1, 1], [0, 1]], "Dolina Orków", "0.97")], None
+
+
+def roi(seed=0):
+    """Dark table with a few bright text rows, like the preprocessed summon window."""
+    rng = np.random.default_rng(seed)
+    image = np.full((120, 200), 40, dtype=np.uint8)
+    for row in range(3):
+        x = int(rng.integers(0, 60))
+        image[10 + row * 30:22 + row * 30, x:x + 100] = 200
+    return image
+
+
+def test_noise_maps_to_same_key_but_changed_text_does_not():
+    image = roi()
+    noisy = image.copy()
+    noisy[::7, ::5] ^= 1  # Low-bit noise
+    changed = image.copy()
+    changed[100:112, 40:120] = 200  # A new text row
+
+    assert perceptual_hash(image) == perceptual_hash(noisy)
+    assert perceptual_hash(image) != perceptual_hash(changed)
+
+
+def test_hits_report_saved_time_and_respect_ttl_and_invalidation():
+    engine = CountingOcr()
+    cache = OcrCache(size=2, ttl=0.2)
+    ocr = CachedOcr(engine, cache)
+
+    first, _ = ocr(roi())
+    again, _ = ocr(roi())
+    assert again == first and engine.calls == 1
+    assert cache.hit_rate == 0.5 and cache.saved_ms > 0
+
+    cache.invalidate()
+    ocr(roi())
+    assert engine.calls == 2
+
+    time.sleep(0.25)
+    ocr(roi())
+    assert engine.calls == 3
+
+    # LRU bound
+    ocr(roi(1))
+    ocr(roi(2))
+    assert cache.stats()["entries"] == 2
+
+
+def test_rejections_are_cached_like_any_result():
+    cache = OcrCache(size=4, ttl=60.0)
+    cache.put("timer-row", False, 12.0)
+    assert cache.get("timer-row") is False
+    assert cache.stats()["saved_ms"] == 12.0
@@ -0,0 +1,75 @@
+import threading
+import time
+
+import numpy as np
+
+from ocr.executor import OcrExecutor
+
+
+class FakeOcr:
+    """RapidOCR-shaped engine: returns ([(box, text, score)], elapse) after a delay."""
+
+    def __init__(self, delay=0.02, delays=None):
+        self.delay = delay
+        self.delays = delays or {}
+        self.seen = []
+        self.lock = threading.Lock()
+
+    def __call__(self, image):
+        value = int(image[0, 0])
+        with self.lock:
+            self.seen.append(value)
+        time.sleep(self.delays.get(value, self.delay))
+        return [([[0, 0], [1, 0], [1, 1], [0, 1]], str(value), "0.99")], None
+
+
+def wait_for(executor, count, timeout=2.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if executor.completed + executor.errors >= count:
+            return
+        time.sleep(0.005)
+
+
+def frame(value):
+    return np.full((4, 4), value, dtype=np.uint8)
+
+
+def test_latest_wins_drops_superseded_frames():
+    engine = FakeOcr(delay=0.05)
+    executor = OcrExecutor(engine, workers=1).start()
+    try:
+        executor.submit(frame(0), tag=0)
+        while not engine.seen:
+            time.sleep(0.001)
+        for i in range(1, 5):
+            executor.submit(frame(i), tag=i)
+        wait_for(executor, 2)
+        job = executor.poll()
+        assert job.tag == 4 and job.result[0][1] == "4"
+        # The first frame was already running; frames 1-3 were replaced in the slot
+        assert engine.seen == [0, 4]
+        stats = executor.metrics()
+        assert stats["dropped"] == 3
+        assert stats["queue_depth"] == 0
+        assert stats["p95_ms"] >= stats["p50_ms"] > 0
+        assert stats["age_p50_ms"] > 0
+        assert executor.poll() is None
+    finally:
+        executor.shutdown()
+
+
+def test_out_of_order_results_are_discarded():
+    # Frame 1 is slow, frame 2 is fast: with two workers 2 finishes first
+    engine = FakeOcr(delays={1: 0.15, 2: 0.01})
+    executor = OcrExecutor(engine, workers=2).start()
+    try:
+        executor.submit(frame(1))
+        time.sleep(0.03)
+        executor.submit(frame(2))
+        wait_for(executor, 2)
+        assert executor.poll().result[0][1] == "2"
+        assert executor.discarded == 1
+        assert executor.poll() is None
+    finally:
+        executor.shutdown()
@@ -0,0 +1,110 @@
+import numpy as np
+
+from ocr.incremental import IncrementalRowOcr
+from ocr.layout import LayoutCachedOcr
+
+
+class FakeRecognizer:
+    """RapidOCR TextRecognizer internals used by recognize_batch."""
+
+    def __init__(self, owner):
+        self.owner = owner
+
+    def __call__(self, crops):
+        self.owner.rec_calls += 1
+        return [(f"row{i}", self.owner.score) for i in range(len(crops))], 0.01
+
+    def resize_norm_img(self, img, max_wh_ratio):
+        return np.zeros((3, 8, int(8 * max_wh_ratio)), dtype=np.float32)
+
+    def session(self, batch):
+        self.owner.rec_calls += 1
+        return [batch]
+
+    def postprocess_op(self, preds):
+        return [(f"row{i}", self.owner.score) for i in range(len(preds))]
+
+
+class FakeRapidOcr:
+    """Exposes the RapidOCR sub-components LayoutCachedOcr drives."""
+
+    use_text_det = True
+    use_angle_cls = False
+    min_height = 30
+    width_height_ratio = 8
+    text_score = 0.5
+
+    def __init__(self, rows=3, score=0.9):
+        self.rows = rows
+        self.score = score
+        self.det_calls = 0
+        self.rec_calls = 0
+        self.text_recognizer = FakeRecognizer(self)
+
+    def load_img(self, img):
+        return np.dstack([img] * 3) if img.ndim == 2 else img
+
+    def text_detector(self, img):
+        self.det_calls += 1
+        boxes = [np.array([[0, y], [50, y], [50, y + 10], [0, y + 10]], dtype=np.float32)
+                 for y in range(0, self.rows * 20, 20)]
+        return np.array(boxes), 0.1
+
+    def sorted_boxes(self, boxes):
+        return list(boxes)
+
+    def get_crop_img_list(self, img, boxes):
+        return [img[int(b[0][1]):int(b[2][1]), int(b[0][0]):int(b[2][0])] for b in boxes]
+
+    def filter_boxes_rec_by_score(self, boxes, rec_res):
+        kept = [(b, r) for b, r in zip(boxes, rec_res) if r[1] >= self.text_score]
+        return [b for b, _ in kept], [r for _, r in kept]
+
+
+def test_detection_reused_until_invalidated_or_resized():
+    engine = FakeRapidOcr()
+    ocr = LayoutCachedOcr(engine, redetect_interval=60.0)
+    image = np.zeros((100, 200), dtype=np.uint8)
+
+    first, _ = ocr(image)
+    for _ in range(4):
+        result, _ = ocr(image)
+        assert result == first
+    assert engine.det_calls == 1 and engine.rec_calls == 5
+
+    ocr.invalidate()
+    ocr(image)
+    ocr(np.zeros((120, 200), dtype=np.uint8))
+    assert engine.det_calls == 3
+    assert ocr.stats()["redetect_reasons"]["invalidated"] == 1
+    assert ocr.stats()["redetect_reasons"]["shape"] == 1
+
+
+def test_low_confidence_triggers_redetection_in_same_call():
+    engine = FakeRapidOcr()
+    ocr = LayoutCachedOcr(engine, redetect_interval=60.0)
+    image = np.zeros((100, 200), dtype=np.uint8)
+    ocr(image)
+
+    engine.score = 0.3  # Text moved out of the cached boxes
+    ocr(image)
+    assert engine.det_calls == 2
+    assert ocr.stats()["redetect_reasons"]["confidence"] == 1
+
+
+def test_incremental_rereads_only_changed_rows():
+    engine = FakeRapidOcr(rows=4)
+    ocr = IncrementalRowOcr(engine, redetect_interval=60.0)
+    image = np.zeros((100, 200), dtype=np.uint8)
+    ocr(image)
+    assert ocr.stats()["rows_recognized"] == 4
+
+    ocr(image)
+    assert ocr.stats()["rows_reused"] == 4
+
+    image[22:28, 10:30] = 255  # Only row 1 changes
+    result, _ = ocr(image)
+    stats = ocr.stats()
+    assert stats["rows_recognized"] == 5 and stats["rows_reused"] == 7
+    assert len(result) == 4 and len(ocr.row_table()) == 4
+    assert engine.det_calls == 1
@@ -0,0 +1,26 @@
+from ocr.map_matcher import MapNameMatcher, normalize_text
+
+MAPS = ["Dolina Orków", "Góra Sohan", "Grota Wygnańców V2", "Grota Wygnańców V3", "Mroczna Krypta V1"]
+
+
+def test_normalization_and_version_must_agree():
+    matcher = MapNameMatcher(MAPS)
+    assert normalize_text("  Grota  Wygnańców,V3 ") == "grota wygnancow v3"
+    assert matcher.best("Dolina Orkow")[0] == "Dolina Orków"
+    assert matcher.best("GROTA WYGNANCOW V3")[0] == "Grota Wygnańców V3"
+    assert [name for name, _ in matcher.match("Grota Wygnańców V3")] == ["Grota Wygnańców V3"]
+    assert matcher.best("Mroczna Krypta")[0] is None
+    assert matcher.best("Pustynia")[0] is None
+
+
+def test_result_matches_are_memoized_per_version():
+    matcher = MapNameMatcher(MAPS)
+    result = [([[0, 0]], "Góra Sohan", "0.9"), ([[0, 20]], "Grota Wygnancow V2", "0.9")]
+
+    lines = matcher.find("Grota Wygnańców V2", result, version=7)
+    assert [text for _, text, _, _ in lines] == ["Grota Wygnancow V2"]
+    lookups = matcher.lookups
+    assert matcher.find("Góra Sohan", result, version=7)[0][1] == "Góra Sohan"
+    assert matcher.lookups == lookups and matcher.memo_hits == 1
+    assert matcher.find("Góra Sohan", result, version=7, min_ratio=0.99) == [
+        ([[0, 0]], "Góra Sohan", "0.9", 1.0)]
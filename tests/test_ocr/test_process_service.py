@@ -0,0 +1,50 @@
+import os
+import time
+
+import numpy as np
+
+from ocr.process_service import OcrProcessExecutor
+
+
+class MeanOcr:
+    """Reports the frame mean; a frame of 255s kills the process."""
+
+    def __call__(self, image):
+        if image.min() == 255:
+            os._exit(3)
+        return [([[0, 0], [1, 0], [1, 1], [0, 1]], f"mean{int(image.mean())}", "0.99")], None
+
+
+def mean_ocr(config):
+    return MeanOcr()
+
+
+def wait_for_job(executor, timeout=30.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        job = executor.poll()
+        if job is not None:
+            return job
+        time.sleep(0.01)
+    raise AssertionError("no OCR result")
+
+
+def test_frames_round_trip_and_crashed_process_is_restarted():
+    executor = OcrProcessExecutor({"ocr_cache_size": 0}, workers=1, engine_factory=mean_ocr).start()
+    try:
+        executor.submit(np.full((40, 60), 7, dtype=np.uint8), "first")
+        job = wait_for_job(executor)
+        assert job.tag == "first" and job.result[0][1] == "mean7"
+
+        executor.submit(np.full((40, 60), 255, dtype=np.uint8), "crash")
+        deadline = time.time() + 30.0
+        while executor.metrics()["errors"] == 0 and time.time() < deadline:
+            time.sleep(0.01)
+
+        # Larger frame than the ring was sized for: the ring grows, the process is respawned
+        executor.submit(np.full((80, 90, 3), 9, dtype=np.uint8), "after")
+        job = wait_for_job(executor)
+        assert job.result[0][1] == "mean9"
+        assert executor.metrics()["restarts"] == 1
+    finally:
+        executor.shutdown()
@@ -0,0 +1,69 @@
+import numpy as np
+
+from ocr.cache import OcrCache
+from ocr.verify import verify_crops
+
+
+class FakeRecognizer:
+    """Reads a crop's fill value back as its text; fail=True raises like a broken session."""
+
+    def __init__(self):
+        self.seen = []
+        self.fail = False
+
+    def resize_norm_img(self, img, max_wh_ratio):
+        out = np.zeros((3, 8, 8), dtype=np.float32)
+        out[0, 0, 0] = img[0, 0, 0]
+        return out
+
+    def session(self, batch):
+        if self.fail:
+            raise RuntimeError("session failed")
+        self.seen.append([int(p[0, 0, 0]) for p in batch])
+        return [batch]
+
+    def postprocess_op(self, preds):
+        return [("Dostepny" if p[0, 0, 0] >= 100 else "12m 30s", 0.9) for p in preds]
+
+
+class FakeEngine:
+    def __init__(self):
+        self.text_recognizer = FakeRecognizer()
+
+
+def _crop(value):
+    return np.full((10, 40), value, dtype=np.uint8)
+
+
+def _accept(text):
+    return text == "Dostepny"
+
+
+def test_only_uncached_crops_are_recognized():
+    engine, cache = FakeEngine(), OcrCache(size=8, ttl=60.0)
+    assert verify_crops(engine, [_crop(200), _crop(20)], _accept, cache) == [True, False]
+
+    # Both decisions (accept and reject) are reused; only the new row goes to the recognizer
+    assert verify_crops(engine, [_crop(20), _crop(150), _crop(200)], _accept, cache) == [False, True, True]
+    assert engine.text_recognizer.seen == [[200, 20], [150]]
+
+
+def test_empty_crops_are_rejected_without_recognition():
+    engine, cache = FakeEngine(), OcrCache(size=8, ttl=60.0)
+    empty = np.zeros((0, 40), dtype=np.uint8)
+
+    assert verify_crops(engine, [empty, _crop(200)], _accept, cache) == [False, True]
+    assert engine.text_recognizer.seen == [[200]]
+    assert cache.stats()["entries"] == 1
+
+
+def test_recognition_errors_reject_pending_crops_and_are_not_cached():
+    engine, cache = FakeEngine(), OcrCache(size=8, ttl=60.0)
+    verify_crops(engine, [_crop(200)], _accept, cache)
+
+    engine.text_recognizer.fail = True
+    assert verify_crops(engine, [_crop(200), _crop(150)], _accept, cache) == [True, False]
+    assert cache.stats()["entries"] == 1
+
+    engine.text_recognizer.fail = False
+    assert verify_crops(engine, [_crop(150)], _accept, cache) == [True]
@@ -0,0 +1,81 @@
+import numpy as np
+
+import vision.change_detector as change_detector
+from vision.change_detector import ChangeDetector
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def _frame(value=50, h=64, w=96):
+    return np.full((h, w, 3), value, dtype=np.uint8)
+
+
+def test_static_frames_are_skipped_and_changes_reported(monkeypatch):
+    monkeypatch.setattr(change_detector.time, "time", FakeClock())
+    detector = ChangeDetector()
+
+    assert detector.update(_frame())                 # First frame: no reference yet
+    assert not detector.update(_frame())
+    assert not detector.update(_frame())
+    changed = _frame()
+    changed[20:30, 40:60] = 200
+    assert detector.update(changed)
+    assert detector.unchanged == 2 and detector.hit_rate == 0.5
+
+
+def test_changed_region_maps_to_blocks(monkeypatch):
+    monkeypatch.setattr(change_detector.time, "time", FakeClock())
+    detector = ChangeDetector(block_size=16)
+    detector.update(_frame())
+    changed = _frame()
+    changed[20:30, 40:60] = 200                      # Blocks rows 1, cols 2-3
+    detector.update(changed)
+
+    assert detector.changed_boxes() == [(32, 16, 16, 16), (48, 16, 16, 16)]
+    assert detector.region_changed(35, 18, 5, 5)
+    assert not detector.region_changed(0, 0, 16, 16)
+    assert not detector.region_changed(0, 48, 96, 16)
+    assert not detector.region_changed(200, 200, 10, 10)   # Outside the frame
+
+
+def test_slow_drift_accumulates_against_the_reference(monkeypatch):
+    monkeypatch.setattr(change_detector.time, "time", FakeClock())
+    detector = ChangeDetector(threshold=2.0)
+    detector.update(_frame(50))
+
+    # +1 per frame never exceeds the threshold frame-to-frame, but does against the reference
+    results = [detector.update(_frame(50 + step)) for step in (1, 2, 3)]
+    assert results == [False, False, True]
+    assert not detector.update(_frame(54))          # Reference moved to 53
+
+
+def test_unchanged_frames_are_refreshed_after_max_age(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(change_detector.time, "time", clock)
+    detector = ChangeDetector(max_unchanged_age=1.0)
+    detector.update(_frame())
+
+    clock.now += 0.9
+    assert not detector.update(_frame())
+    clock.now += 0.2                                 # 1.1 s since the last reported change
+    assert detector.update(_frame())
+    assert detector.changed_mask.all()
+    assert not detector.update(_frame())
+
+
+def test_reset_and_resize_force_a_change(monkeypatch):
+    monkeypatch.setattr(change_detector.time, "time", FakeClock())
+    detector = ChangeDetector()
+    detector.update(_frame())
+
+    detector.reset()
+    assert detector.region_changed(0, 0, 1, 1)       # No mask: everything counts as changed
+    assert detector.changed_boxes() == []
+    assert detector.update(_frame())
+    assert detector.update(_frame(h=80))             # Different block grid
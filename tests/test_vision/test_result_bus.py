@@ -0,0 +1,32 @@
+from vision.result_bus import ResultBus
+
+ROI = {"left": 100, "top": 150, "width": 550, "height": 300}
+BOX = [[10, 20], [60, 20], [60, 40], [10, 40]]
+
+
+def test_old_results_are_rejected_unless_pixels_are_unchanged():
+    bus = ResultBus()
+    bus.publish("ocr", [(BOX, "Dolina Orków", "0.95")], frame_id=10, geometry_version=1, roi=ROI)
+
+    assert bus.latest("ocr", frame_id=12, max_age_frames=5) is not None
+    assert bus.latest("ocr", frame_id=20, max_age_frames=5) is None
+    # Frames 11-20 were identical to frame 10, so the result still describes them
+    assert bus.latest("ocr", frame_id=20, max_age_frames=5, unchanged_since=10) is not None
+    assert bus.latest("ocr", frame_id=12, geometry_version=2) is None
+
+    # A late result from an older frame does not replace a newer one
+    assert not bus.publish("ocr", [], frame_id=9)
+    assert bus.latest("ocr").frame_id == 10
+
+
+def test_coordinates_follow_the_roi():
+    bus = ResultBus()
+    bus.publish("ocr", [(BOX, "Dostępny", "0.9")], frame_id=1, roi=ROI)
+    bus.publish("template:map:x", ((10, 20, 50, 20), 0.97), frame_id=1, roi=ROI)
+
+    moved = dict(ROI, left=90, top=160)
+    box, text, _ = bus.latest("ocr", roi=moved).value[0]
+    assert box[0] == [20, 10] and text == "Dostępny"
+    rect, conf = bus.latest("template:map:x", roi=moved).value
+    assert rect == (20, 10, 50, 20) and conf == 0.97
+    assert bus.latest("ocr", roi=ROI).value[0][0] is BOX
@@ -0,0 +1,28 @@
+import cv2
+import numpy as np
+
+from vision.row_segmenter import cell_quads, segment_rows
+
+
+def _table(rows=6):
+    img = np.full((rows * 26 + 20, 400), 25, dtype=np.uint8)
+    for i in range(rows):
+        y = 20 + i * 26
+        cv2.putText(img, f"Map {i}", (10, y), cv2.FONT_HERSHEY_SIMPLEX, 0.5, 200, 1)
+        cv2.putText(img, "Dostepny", (250, y), cv2.FONT_HERSHEY_SIMPLEX, 0.5, 200, 1)
+    return img
+
+
+def test_rows_and_columns_follow_the_table():
+    rows = segment_rows(_table())
+    assert len(rows) == 6
+    assert all(len(row.columns) == 2 for row in rows)
+    tops = [row.rect[1] for row in rows]
+    assert all(b - a == 26 for a, b in zip(tops, tops[1:]))
+    assert rows[0].columns[1][0] >= 240
+    assert cell_quads(_table()).shape == (12, 4, 2)
+
+
+def test_blank_or_flat_images_have_no_rows():
+    assert segment_rows(np.zeros((50, 50), dtype=np.uint8)) == []
+    assert segment_rows(np.full((50, 50), 200, dtype=np.uint8)) == []
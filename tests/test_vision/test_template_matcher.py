@@ -0,0 +1,91 @@
+import cv2
+import numpy as np
+
+from vision.row_segmenter import segment_rows
+from vision.template_matcher import (LocationPredictor, MultiTemplateMatcher, PyramidLevels, best_match,
+                                     estimate_scale, pyramid_match)
+
+NAMES = ["Dolina Orkow", "Gora Sohan", "Pustynia", "Loch Pajakow", "Czerwony Las"]
+
+
+def _row_image(names):
+    img = np.full((len(names) * 26 + 16, 400), 25, dtype=np.uint8)
+    for i, name in enumerate(names):
+        cv2.putText(img, name, (10, 26 + i * 26), cv2.FONT_HERSHEY_SIMPLEX, 0.5, 200, 1)
+    return img
+
+
+def _template(name):
+    (w, h), base = cv2.getTextSize(name, cv2.FONT_HERSHEY_SIMPLEX, 0.5, 1)
+    return _row_image([name])[26 - h - 2:26 + base + 2, 8:10 + w + 2].copy()
+
+
+def test_single_pass_ranks_visible_templates_like_full_search():
+    roi = _row_image(NAMES[:3])
+    templates = {f"map:{name}": _template(name) for name in NAMES}
+    matcher = MultiTemplateMatcher()
+
+    hits = matcher.match(roi, templates, 0.85, segment_rows(roi))
+
+    assert {key for key, _, _ in hits} == {"map:Dolina Orkow", "map:Gora Sohan", "map:Pustynia"}
+    assert [q for _, _, q in hits] == sorted((q for _, _, q in hits), reverse=True)
+    for key, rect, quality in hits:
+        full_rect, full_quality = best_match(roi, templates[key])
+        assert rect == full_rect and abs(quality - full_quality) < 1e-6
+
+
+def test_pyramid_search_reports_the_full_resolution_match():
+    roi = _row_image(NAMES)
+    levels = PyramidLevels({"map:*": 1, "status:*": 0})
+    assert levels("map:Gora Sohan") == 1 and levels("status:dostepny") == 0
+
+    for name in NAMES:
+        template = _template(name)
+        rect, quality = pyramid_match(roi, template, 1, cache={})
+        full_rect, full_quality = best_match(roi, template)
+        assert rect == full_rect and abs(quality - full_quality) < 1e-4
+
+
+def test_predicted_location_is_tried_before_the_full_search():
+    roi = _row_image(NAMES)
+    template = _template("Pustynia")
+    predictor = LocationPredictor()
+    full_calls = []
+
+    def full_search():
+        full_calls.append(1)
+        return best_match(roi, template)
+
+    first = predictor.match(roi, template, "map:Pustynia", 1, 0.85, full_search)
+    second = predictor.match(roi, template, "map:Pustynia", 1, 0.85, full_search)
+    assert second[0] == first[0] and len(full_calls) == 1
+    assert predictor.stats()["hits"] == 1 and predictor.saved_px > 0
+
+    # Rows moved (list scrolled): the old spot misses and the full search takes over
+    moved = np.roll(roi, 52, axis=0)
+    rect, _ = predictor.match(moved, template, "map:Pustynia", 1, 0.85, lambda: best_match(moved, template))
+    assert rect[1] == first[0][1] + 52 and predictor.misses == 2
+
+
+def test_near_duplicate_row_in_the_predicted_window_does_not_win():
+    rows = [f"Mroczna Krypta V{i}" for i in range(1, 6)]
+    roi = _row_image(rows)
+    template = _template("Mroczna Krypta V3")
+    predictor = LocationPredictor()
+    first, _ = predictor.match(roi, template, "map:V3", 1, 0.85, lambda: best_match(roi, template))
+
+    # Scrolled by one row: "V4" now sits where "V3" was and still clears 0.85
+    scrolled = _row_image(rows[1:])
+    rect, quality = predictor.match(scrolled, template, "map:V3", 1, 0.85, lambda: best_match(scrolled, template))
+    assert rect == best_match(scrolled, template)[0] and rect[1] == first[1] - 26
+    assert quality > 0.99 and predictor.hits == 0
+
+
+def test_estimate_scale_recovers_resized_ui():
+    template = _template("Gora Sohan")
+    resized = cv2.resize(_row_image(NAMES), None, fx=1.5, fy=1.5, interpolation=cv2.INTER_LINEAR)
+
+    scale, quality = estimate_scale(resized, template, 0.85, hints=(1.5,))
+
+    assert abs(scale - 1.5) <= 0.02 and quality >= 0.85
+    assert estimate_scale(_row_image(["Pustynia"]), template, 0.85)[0] is None
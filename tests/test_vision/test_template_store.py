@@ -0,0 +1,88 @@
+import os
+import pickle
+
+import numpy as np
+
+from vision.template_store import TemplateStore, open_template_store, partition_key
+
+
+def test_templates_persist_lazily_with_index_metadata(tmp_path):
+    root = str(tmp_path / "store")
+    store = TemplateStore(root)
+    img = np.arange(60, dtype=np.uint8).reshape(6, 10)
+    store.put("map:Krypta", img, (1280, 720))
+    store.record_hit("map:Krypta", 0.97)
+    store.flush()
+
+    reopened = TemplateStore(root)
+    assert "map:Krypta" in reopened
+    assert reopened.loaded_items() == []
+    loaded = reopened["map:Krypta"]
+    assert isinstance(loaded, np.memmap)
+    assert np.array_equal(loaded, img)
+    meta = reopened.metadata("map:Krypta")
+    assert meta["resolution"] == [1280, 720] and meta["hits"] == 1 and meta["last_confidence"] == 0.97
+
+
+def test_lru_eviction_and_pickle_migration(tmp_path):
+    legacy = tmp_path / "dynamic_templates.pkl"
+    with open(legacy, "wb") as f:
+        pickle.dump({f"map:{i}": np.full((4, 4), i, dtype=np.uint8) for i in range(3)}, f)
+
+    store = TemplateStore(str(tmp_path / "store"), max_templates=3)
+    assert store.migrate_pickle(str(legacy)) == 3
+    assert not legacy.exists() and os.path.exists(str(legacy) + ".migrated")
+
+    store["map:0"]                      # Touch: map:1 becomes least recently used
+    store.put("map:3", np.zeros((4, 4), dtype=np.uint8))
+    assert sorted(store) == ["map:0", "map:2", "map:3"]
+    assert len([n for n in os.listdir(store.root) if n.endswith(".npy")]) == 3
+
+
+def test_partitions_by_geometry_with_cached_scale(tmp_path):
+    store = TemplateStore(str(tmp_path / "store"))
+    store.put("map:Krypta", np.zeros((4, 4), dtype=np.uint8))    # Legacy: geometry unknown
+    store.set_partition(partition_key((1280, 720), 96))
+    assert "map:Krypta" in store                                  # Adopted by the first real geometry
+
+    store.set_partition(partition_key((1920, 1080), 96))
+    assert "map:Krypta" not in store
+    assert store.source_partition("map:Krypta") == "1280x720@96"
+    store.set_scale("1280x720@96", 1.5)
+    store.flush()
+
+    reopened = TemplateStore(store.root)
+    reopened.set_partition("1920x1080@96")
+    assert reopened.scale("1280x720@96") == 1.5
+    assert reopened.get_in("1280x720@96", "map:Krypta").shape == (4, 4)
+
+
+def test_stores_on_one_root_share_the_index(tmp_path):
+    root = str(tmp_path / "store")
+    first, second = open_template_store(root), open_template_store(root)
+    first.set_partition("1280x720@96")
+    second.set_partition("1920x1080@96")        # Each client keeps its own active partition
+
+    first.put("map:A", np.zeros((4, 4), dtype=np.uint8))
+    second.put("map:B", np.ones((4, 4), dtype=np.uint8))
+    first.put("map:A2", np.ones((4, 4), dtype=np.uint8))
+    del first["map:A2"]
+    second.flush()                               # Either writer flushes the shared index
+
+    reopened = TemplateStore(root)
+    assert reopened.partitions() == {"1280x720@96": 1, "1920x1080@96": 1}
+    reopened.set_partition("1920x1080@96")
+    assert reopened["map:B"].max() == 1
+
+
+def test_opening_a_root_keeps_files_of_an_unflushed_writer(tmp_path):
+    root = str(tmp_path / "store")
+    writer = TemplateStore(root)
+    writer.put("map:A", np.zeros((4, 4), dtype=np.uint8))
+    writer.flush()
+    os.utime(os.path.join(root, "index.json"), (1, 1))   # Index older than the next put
+    writer.put("map:B", np.ones((4, 4), dtype=np.uint8))  # Not flushed yet
+
+    TemplateStore(root)
+    assert np.array_equal(writer["map:B"], np.ones((4, 4), dtype=np.uint8))
+    assert len([n for n in os.listdir(root) if n.endswith(".npy")]) == 2